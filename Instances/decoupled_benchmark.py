@@ -0,0 +1,50 @@
+"""Script that compares the 'decoupled' and 'numerical' methods of
+te_pair.TE_Pair.solve_te_pair over a range of currents."""
+
+# distribution modules
+import numpy as np
+import os
+import sys
+import time
+
+# User Defined Modules
+cmd_folder = os.path.dirname(os.path.abspath('../Modules/hx.py'))
+if cmd_folder not in sys.path:
+    sys.path.insert(0, cmd_folder)
+import te_pair
+reload(te_pair)
+
+te_bench = te_pair.TE_Pair()
+te_bench.Ntype.material = 'MgSi'
+te_bench.Ptype.material = 'HMS'
+te_bench.length = 3.56e-4
+te_bench.leg_area_ratio = 0.745
+te_bench.fill_fraction = 3.1e-2
+te_bench.T_h_conv = 800.
+te_bench.T_c_conv = 300.
+te_bench.U_hot = 0.3
+te_bench.U_cold = 8.
+
+currents = [0.1, 5., 13., 30., 60., 100., 200., 300., 500.]
+methods = ['numerical', 'decoupled']
+repeats = 5
+
+print "\n%8s %10s %8s %10s %12s %10s" % (
+    'I (A)', 'method', 'legs', 'time (s)', 'P (W)', 'max error'
+    )
+
+for current in currents:
+    te_bench.I = current
+    te_bench.set_constants()
+
+    for method in methods:
+        te_bench.method = method
+        t0 = time.time()
+        for i in range(repeats):
+            te_bench.solve_te_pair()
+        t1 = (time.time() - t0) / repeats
+
+        print "%8.1f %10s %8d %10.4f %12.5g %10.2g" % (
+            current, method, te_bench.leg_integrations, t1,
+            te_bench.P * 1000., te_bench.error_norm
+            )
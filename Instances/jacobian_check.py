@@ -0,0 +1,117 @@
+"""Script that checks the analytic leg Jacobian against finite
+differences and compares solve time with and without it."""
+
+# distribution modules
+import numpy as np
+import os
+import sys
+import time
+
+# User Defined Modules
+cmd_folder = os.path.dirname(os.path.abspath('../Modules/hx.py'))
+if cmd_folder not in sys.path:
+    sys.path.insert(0, cmd_folder)
+import leg
+reload(leg)
+import te_pair
+reload(te_pair)
+
+materials = [
+    'HMS', 'MgSi', 'typical BiTe n-type', 'ex1 n-type', 'ex1 p-type',
+    'ex2 n-type', 'ex2 p-type', 'constant BiTe p-type'
+    ]
+T_array = np.linspace(350., 750., 5)
+
+for material in materials:
+    leg_check = leg.Leg()
+    leg_check.material = material
+    leg_check.I = 34.3
+    leg_check.area = (2.e-3) ** 2
+    leg_check.set_constants()
+
+    error_max = 0.
+
+    for T in T_array:
+        Tq = np.array([T, 1.e6, 0., 0., 0.])
+        jac = leg_check.get_jacobian(Tq, 0.)
+        jac_fd = np.zeros((5, 5))
+        for j in range(5):
+            dTq = 1.e-6 * np.abs(Tq[j]) + 1.e-8
+            Tq_plus = Tq.copy()
+            Tq_minus = Tq.copy()
+            Tq_plus[j] += dTq
+            Tq_minus[j] -= dTq
+            jac_fd[:, j] = (
+                (np.array(leg_check.get_dTq_dx(Tq_plus, 0.)) -
+                np.array(leg_check.get_dTq_dx(Tq_minus, 0.))) / (2. *
+                dTq)
+                )
+        error = (
+            np.abs(jac - jac_fd) / (np.abs(jac_fd).max(axis=1)[:,
+            np.newaxis] + 1.e-30)
+            )
+        error_max = max(error_max, error.max())
+
+    print material, "max relative Jacobian error:", error_max
+
+te_check = te_pair.TE_Pair()
+te_check.Ntype.material = 'MgSi'
+te_check.Ptype.material = 'HMS'
+te_check.I = 34.3
+te_check.length = 3.18e-4
+te_check.leg_area_ratio = 0.74
+te_check.fill_fraction = 3.01e-2
+te_check.T_h_conv = 800.
+te_check.T_c_conv = 300.
+te_check.U_hot = 2.
+te_check.U_cold = 8.
+
+for use_jacobian in [False, True]:
+    te_check.use_jacobian = use_jacobian
+    te_check.set_constants()
+    t0 = time.time()
+    for i in range(20):
+        te_check.solve_te_pair()
+    t1 = time.time() - t0
+    print "\nuse_jacobian =", use_jacobian
+    print "power:", te_check.P * 1000., "W"
+    print "T_h:", te_check.T_h, "K"
+    print "time per solve:", t1 / 20., "s"
+
+# exact Jacobian of the pair boundary condition errors from forward
+# sensitivities vs. central finite differences
+te_check.use_jacobian = False
+for integrator in ['odeint', 'rk4']:
+    te_check.integrator = integrator
+    te_check.set_constants()
+    te_check.use_sensitivity = False
+    te_check.solve_te_pair()
+
+    knob_arr = te_check.fsolve_output * np.array([1.1, 0.9, 0.98])
+    te_check.jac_knobs = None
+    jac = te_check.get_error_jacobian(knob_arr)
+    jac_fd = np.zeros((3, 3))
+    for j in range(3):
+        dknob = 1.e-6 * np.abs(knob_arr[j])
+        knob_plus = knob_arr.copy()
+        knob_minus = knob_arr.copy()
+        knob_plus[j] += dknob
+        knob_minus[j] -= dknob
+        jac_fd[:, j] = (
+            (te_check.get_error(knob_plus) - te_check.get_error(knob_minus))
+            / (2. * dknob)
+            )
+    error = np.abs(jac - jac_fd) / np.abs(jac_fd).max(axis=1)[:, np.newaxis]
+    print "\nintegrator =", integrator
+    print "max relative pair Jacobian error:", error.max()
+
+    for use_sensitivity in [False, True]:
+        te_check.use_sensitivity = use_sensitivity
+        t0 = time.time()
+        for i in range(20):
+            te_check.solve_te_pair()
+        t1 = time.time() - t0
+        print "use_sensitivity =", use_sensitivity
+        print "residual evaluations:", te_check.nfev
+        print "exact Jacobian evaluations:", te_check.njev
+        print "time per solve:", t1 / 20., "s"
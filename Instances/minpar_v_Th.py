@@ -32,8 +32,11 @@ te_minpar.leg_area_ratio = area_ratio
 
 te_minpar.set_leg_areas()
 
+SIZE = 10
+T_h_conv = np.linspace(550, 800., SIZE)
+
 te_minpar.T_c_conv = 300.  # cold side convection temperature (K)
-te_minpar.T_h_conv = 800.
+te_minpar.T_h_conv = T_h_conv[0]
 
 te_minpar.U_cold = 8.
 # cold side overall heat transfer coeffcient (kW / (m ** 2 * K))
@@ -42,26 +45,21 @@ te_minpar.U_hot = 2.
 
 te_minpar.optimize()
 
-SIZE = 10
-current = np.zeros(SIZE)
-fill_fraction = np.zeros(SIZE)
-length = np.zeros(SIZE)
-area_ratio = np.zeros(SIZE)
-power = np.zeros(SIZE)
-
-T_h_conv = np.linspace(550, 800., SIZE)
+conditions = np.zeros([SIZE, 4])
+conditions[:, 0] = T_h_conv
+conditions[:, 1] = te_minpar.T_c_conv
+conditions[:, 2] = te_minpar.U_hot
+conditions[:, 3] = te_minpar.U_cold
 
-for i in range(SIZE):
-    te_minpar.T_h_conv = T_h_conv[i]
-    print "\nT_h_conv =", T_h_conv[i]
+te_minpar.optimize_path(conditions, segments=2, processes=2)
+# each of two processes starts from the optimum at T_h_conv[0] and
+# continues it along one half of the path
 
-    te_minpar.optimize()
+length, fill_fraction, current, area_ratio = te_minpar.path_xmin.T
+power = te_minpar.path_P
 
-    current[i] = te_minpar.I
-    fill_fraction[i] = te_minpar.fill_fraction
-    length[i] = te_minpar.length
-    area_ratio[i] = te_minpar.leg_area_ratio
-    power[i] = te_minpar.P
+print "\noptimization time per T_h_conv (s):", te_minpar.path_time
+print "total wall time (s):", te_minpar.path_wall_time
 
 data_dir = '../output/minpar_v_Th/'
 
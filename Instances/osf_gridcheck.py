@@ -67,6 +67,7 @@ hx_osf_gridcheck.apar_list.append(['self', 'exh', 'enh', 'l'])
 hx_osf_gridcheck.apar_list.append(['self', 'exh', 'enh', 'spacing'])
 
 hx_osf_gridcheck.solve_hx()
+power_net_odeint = hx_osf_gridcheck.power_net
 
 # grid independence check
 for i in np.arange(5, 40, 5):
@@ -76,4 +77,31 @@ for i in np.arange(5, 40, 5):
 
     print "for", hx_osf_gridcheck.te_pair.nodes, " nodes, power output is = "
     print "power net:", hx_osf_gridcheck.power_net * 1000., 'W'
+
+# Fixed step integration, for which nodes sets accuracy and cost.
+# The error in power relative to odeint can be used to pick the
+# cheapest number of nodes that meets a given accuracy.
+hx_osf_gridcheck.te_pair.integrator = 'rk4'
+
+for i in np.arange(3, 13, 1):
+
+    hx_osf_gridcheck.te_pair.nodes = i
+    time_rk4 = time.clock()
+    hx_osf_gridcheck.solve_hx()
+    time_rk4 = time.clock() - time_rk4
+
+    hx_osf_gridcheck.te_pair.set_integrator_error()
+
+    print "\nfor", i, "rk4 nodes:"
+    print "power net:", hx_osf_gridcheck.power_net * 1000., 'W'
+    print "power net error relative to odeint:", (
+        hx_osf_gridcheck.power_net / power_net_odeint - 1.
+        )
+    print "last node TE power error relative to odeint:", (
+        hx_osf_gridcheck.te_pair.P_int_error
+        )
+    print "solve time:", time_rk4, 's'
+
+hx_osf_gridcheck.te_pair.integrator = 'odeint'
+hx_osf_gridcheck.te_pair.nodes = 10
     
@@ -0,0 +1,30 @@
+"""Script that ranks n-type / p-type material pairs for an exhaust
+temperature band."""
+
+# distribution modules
+import time
+import os
+import sys
+import numpy as np
+
+# local user modules
+cmd_folder = os.path.dirname(os.path.abspath('../Modules/hx.py'))
+if cmd_folder not in sys.path:
+    sys.path.insert(0, cmd_folder)
+import screening
+reload(screening)
+
+t0 = time.clock()
+
+pair_screen = screening.PairScreen()
+
+pair_screen.T_h = np.linspace(550., 800., 11)
+# hot side temperatures (K) in the exhaust band of interest
+pair_screen.T_c = np.linspace(300., 360., 4)
+# cold side temperatures (K)
+pair_screen.rank_by = 'eta_max'
+
+pair_screen.screen()
+pair_screen.print_table(rows=15)
+
+print "\nElapsed time solving pair screen =", time.clock() - t0, "s"
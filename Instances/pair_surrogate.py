@@ -0,0 +1,94 @@
+"""Script that builds a surrogate.PairSurrogate around a heat exchanger
+design, saves it, and compares heat exchanger solutions with and
+without it."""
+
+# distribution modules
+import numpy as np
+import os
+import sys
+import time
+
+# User Defined Modules
+cmd_folder = os.path.dirname(os.path.abspath('../Modules/hx.py'))
+if cmd_folder not in sys.path:
+    sys.path.insert(0, cmd_folder)
+import hx
+reload(hx)
+import surrogate
+reload(surrogate)
+
+surrogate_file = 'pair_surrogate.npz'
+margin = 0.1
+# relative widening of the surrogate bounds beyond the input range
+# of the exact heat exchanger solution
+
+hx_sur = hx.HX()
+hx_sur.width = 20. * 2.54e-2
+hx_sur.exh.height = 2.5 * 2.54e-2
+hx_sur.cool.height = 1. * 2.54e-2
+hx_sur.length = 20. * 2.54e-2
+
+hx_sur.te_pair.I = 13.
+hx_sur.te_pair.length = 3.56e-4
+hx_sur.te_pair.leg_area_ratio = 0.745
+hx_sur.te_pair.fill_fraction = 3.1e-2
+hx_sur.te_pair.set_leg_areas()
+hx_sur.te_pair.Ntype.material = 'MgSi'
+hx_sur.te_pair.Ptype.material = 'HMS'
+
+hx_sur.type = 'counter'
+hx_sur.exh.T_inlet = 800.
+hx_sur.cool.T_inlet_set = 300.
+hx_sur.cool.T_outlet = 310.
+hx_sur.set_mdot_charge()
+
+t0 = time.time()
+hx_sur.solve_hx()
+t_exact = time.time() - t0
+power_exact = hx_sur.te_pair.power_total
+Qdot_exact = hx_sur.Qdot_total
+
+pair_sur = surrogate.PairSurrogate()
+pair = hx_sur.te_pair
+J = pair.I / pair.Ptype.area
+node_inputs = np.array([
+    [hx_sur.exh.T_nodes.min(), hx_sur.exh.T_nodes.max()],
+    [hx_sur.cool.T_nodes.min(), hx_sur.cool.T_nodes.max()],
+    [hx_sur.U_hot_nodes.min(), hx_sur.U_hot_nodes.max()],
+    [hx_sur.U_cold_nodes.min(), hx_sur.U_cold_nodes.max()],
+    [J, J],
+    [pair.length, pair.length],
+    [pair.fill_fraction, pair.fill_fraction],
+    [pair.leg_area_ratio, pair.leg_area_ratio]
+    ])
+pair_sur.bounds = (
+    node_inputs + margin * np.abs(node_inputs.mean(axis=1))[:, None] *
+    np.array([-1., 1.])
+    )
+
+print "\nBuilding surrogate from", pair_sur.samples, "pair solutions..."
+t0 = time.time()
+pair_sur.build(pair)
+print "build time (s):", time.time() - t0
+print "converged samples:", pair_sur.X.shape[0]
+print "median leave-one-out error:", np.median(pair_sur.loo_error_max)
+pair_sur.save(surrogate_file)
+
+hx_sur.surrogate = surrogate.PairSurrogate()
+hx_sur.surrogate.load(surrogate_file)
+
+print "\n%8s %8s %10s %12s %12s" % (
+    'tol', 'nodes', 'time (s)', 'P (kW)', 'Qdot (kW)'
+    )
+print "%8s %8d %10.4f %12.6g %12.6g" % (
+    'exact', 0, t_exact, power_exact, Qdot_exact
+    )
+
+for tol in [1.e-3, 3.e-3, 1.e-2]:
+    hx_sur.surrogate.tol = tol
+    t0 = time.time()
+    hx_sur.solve_hx()
+    print "%8.0e %8d %10.4f %12.6g %12.6g" % (
+        tol, hx_sur.surrogate_nodes.sum(), time.time() - t0,
+        hx_sur.te_pair.power_total, hx_sur.Qdot_total
+        )
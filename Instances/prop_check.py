@@ -13,23 +13,19 @@ if cmd_folder not in sys.path:
     sys.path.insert(0, cmd_folder)
 import leg
 reload(leg)
+import mat_prop
 
 prop_check = leg.Leg()
 
 prop_check.material = 'HMS'
 
 prop_check.T_array = np.linspace(300, 900, 100.)
-prop_check.alpha_T = np.zeros(prop_check.T_array.size)
-prop_check.k_T = np.zeros(prop_check.T_array.size)
-prop_check.sigma_T = np.zeros(prop_check.T_array.size)
+(prop_check.alpha_T, prop_check.k_T, rho_T, prop_check.sigma_T, ZT_T) = (
+    mat_prop.get_properties(prop_check.material, prop_check.T_array)
+    )
 
-for i in range(prop_check.T_array.size):
-
-    prop_check.set_TEproperties(prop_check.T_array[i])
-
-    prop_check.alpha_T[i] = prop_check.alpha
-    prop_check.k_T[i]     = prop_check.k
-    prop_check.sigma_T[i] = prop_check.sigma
+prop_fit = mat_prop.get_property_fit(prop_check.material)
+mat_prop.print_table_errors()
 
 # Plot configuration
 FONTSIZE = 14
@@ -46,7 +42,7 @@ plt.close()
 plt.figure('Seebeck')
 
 plt.plot(prop_check.T_array, prop_check.alpha_T * 1.e6)
-plt.plot(prop_check.alpha_raw[:, 0], prop_check.alpha_raw[:, 1],
+plt.plot(prop_fit.alpha_raw[:, 0], prop_fit.alpha_raw[:, 1],
          marker='x')
 plt.xlabel('Temperature (K)')
 plt.ylabel('Seebeck Coeff (V/K)')
@@ -55,7 +51,7 @@ plt.grid()
 plt.figure('k')
 
 plt.plot(prop_check.T_array, prop_check.k_T)
-plt.plot(prop_check.k_raw[:, 0], prop_check.k_raw[:, 1], marker='x')
+plt.plot(prop_fit.k_raw[:, 0], prop_fit.k_raw[:, 1], marker='x')
 plt.xlabel('Temperature (K)')
 plt.ylabel(r'Thermal Conductivity ($\frac{W}{mK})')
 plt.grid()
@@ -63,14 +59,14 @@ plt.grid()
 plt.figure('Sigma')
 
 plt.plot(prop_check.T_array, prop_check.sigma_T * 1.e-4)
-plt.plot(prop_check.sigma_raw[:, 0], prop_check.sigma_raw[:, 1],
+plt.plot(prop_fit.sigma_raw[:, 0], prop_fit.sigma_raw[:, 1],
          marker='x')
 plt.xlabel('Temperature (K)')
 plt.ylabel(r'$\sigma$')
 plt.grid()
 
 # plt.plot(prop_check.T_array, prop_check.sigma_T * 1.e-4)
-# plt.plot(1/prop_check.sigma_raw[:, 0], 1/prop_check.sigma_raw[:, 1],
+# plt.plot(1/prop_fit.sigma_raw[:, 0], 1/prop_fit.sigma_raw[:, 1],
 #          marker='x')
 # plt.xlabel('Temperature (K)')
 # plt.ylabel(r'$\sigma$')
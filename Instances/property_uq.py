@@ -0,0 +1,69 @@
+"""Script that propagates material property uncertainty through a
+heat exchanger with Monte Carlo realizations of the property fits."""
+
+# distribution modules
+import time
+import os
+import sys
+
+# local user modules
+cmd_folder = os.path.dirname(os.path.abspath('../Modules/hx.py'))
+if cmd_folder not in sys.path:
+    sys.path.insert(0, cmd_folder)
+import hx
+reload(hx)
+import uq
+reload(uq)
+
+t0 = time.clock()
+
+leg_area = (0.002)**2
+
+area_ratio = 0.745
+fill_fraction = 3.10e-2
+leg_length = 3.56e-4
+current = 13.0
+
+hx_uq = hx.HX()
+
+hx_uq.width = 20. * 2.54e-2
+hx_uq.exh.height = 2.5 * 2.54e-2
+hx_uq.cool.height = 1. * 2.54e-2
+hx_uq.length = 20. * 2.54e-2
+
+hx_uq.te_pair.I = current
+hx_uq.te_pair.length = leg_length
+hx_uq.te_pair.leg_area_ratio = area_ratio
+hx_uq.te_pair.fill_fraction = fill_fraction
+
+hx_uq.te_pair.set_leg_areas()
+
+hx_uq.te_pair.Ntype.material = 'MgSi'
+hx_uq.te_pair.Ptype.material = 'HMS'
+
+hx_uq.type = 'counter'
+
+hx_uq.exh.T_inlet = 800.
+hx_uq.cool.T_inlet_set = 300.
+hx_uq.cool.T_outlet = 310.
+
+hx_uq.set_mdot_charge()
+
+property_uq = uq.PropertyUQ(hx_uq)
+property_uq.realizations = 200
+property_uq.rel_std = 0.05
+# relative standard deviation of raw property data
+property_uq.sampling = 'perturb'
+property_uq.seed = 0
+
+property_uq.solve_hx()
+
+for name in ['power_net', 'power_total', 'effectiveness']:
+    stats = property_uq.stats[name]
+    print name, "mean =", stats['mean'], "std =", stats['std']
+    print "  percentiles", property_uq.percentiles, "=", stats['percentiles']
+
+print "unconverged pair solves:", (~property_uq.converged_nodes).sum()
+print "realizations left out of statistics:", property_uq.unconverged
+
+print "\nElapsed time solving property UQ =", time.clock() - t0, "s"
@@ -26,26 +26,26 @@ te_pair.length = length
 te_pair.Ntype.material = 'MgSi'
 te_pair.Ptype.material = 'HMS'
 
-te_pair.Ptype.node = 0
-te_pair.Ntype.node = 0
-te_pair.T_c = 300.
-
-te_pair.Ntype.area = te_pair.Ptype.area * area_ratio
-te_pair.area_void = 0.
-te_pair.method = 'numerical'
+te_pair.leg_area_ratio = area_ratio
+te_pair.fill_fraction = 1.
+# no void area
+te_pair.T_c_conv = 300.
+te_pair.U_hot = 1.e4
+te_pair.U_cold = 1.e4
+# convection coefficients (kW/m^2-K) large enough that the leg end
+# temperatures are those of the hot and cold reservoirs
 te_pair.set_constants()
 
 current_array = np.linspace(0.5, 15, 16)
 T_array = np.linspace(450, 800, 15)
-power = np.zeros([current_array.size, T_array.size])
 
-for i in range(current_array.size):
-    te_pair.I = current_array[i]
-    for j in range(T_array.size):
-        te_pair.T_h_goal = T_array[j]
-        te_pair.set_constants()
-        te_pair.solve_te_pair()
-        power[i,j] = te_pair.P 
+t0 = time.time()
+te_pairs = te_pair.solve_te_pairs(
+    {'I': current_array[:, np.newaxis], 'T_h_conv': T_array}
+    )
+print "solved", te_pairs.pairs, "pairs in", time.time() - t0, "s"
+print "unconverged pairs:", (~te_pairs.converged).sum()
+power = te_pairs.P.reshape(te_pairs.shape)
 
 # Plot configuration
 FONTSIZE = 15
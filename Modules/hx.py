@@ -50,10 +50,12 @@ class HX(object):
     get_minpar
     init_arrays
     optimize
+    set_R_parasitic
     set_availability
     set_constants
     set_convection
     set_mdot_charge
+    set_telemetry_summary
     setup
     solve_hx
     solve_node
@@ -133,6 +135,25 @@ class HX(object):
         self.T0 = 300.
         # temperature (K) at restricted dead state
         self.equal_width = True
+        self.warm_start = 'linear'
+        # starting point of te_pair.solve_te_pair at each node after
+        # the first.  'linear' extrapolates the converged knobs of the
+        # previous two nodes, 'previous' uses those of the previous
+        # node, and None uses the lumped analytic guess at every node.
+        # Sets te_pair.knob_guess, which is read when te_pair.method is
+        # 'numerical', as the fsolve starting point, or 'decoupled', as
+        # the starting values of its bracketed roots.  The default
+        # 'linear' changes the starting point, and so possibly the
+        # converged solution within tolerance, of scripts written
+        # before warm starts; set None to start every node as before.
+        self.surrogate = None
+        # optional surrogate.PairSurrogate instance.  If set,
+        # solve_node uses it instead of te_pair.solve_te_pair wherever
+        # its inputs are in range and its error estimate is within
+        # its tolerance.
+        self.telemetry = False
+        # if True, solve_hx stores solver telemetry of te_pair at
+        # every node and sets self.telemetry_summary
 
         self.apar_list = [
             ['self', 'te_pair', 'leg_area_ratio'],
@@ -190,6 +211,25 @@ class HX(object):
         self.te_pair.q_h_nodes = np.zeros(self.nodes)
         self.te_pair.q_c_nodes = np.zeros(self.nodes)
         self.te_pair.error_nodes = np.zeros([3, self.nodes])
+        self.te_pair.knobs_nodes = np.zeros([3, self.nodes])
+        self.te_pair.nfev_nodes = np.zeros(self.nodes)
+        self.te_pair.njev_nodes = np.zeros(self.nodes)
+        # fsolve residual and Jacobian evaluations of te_pair at each
+        # node.  These are zero at nodes solved by 'bvp', 'decoupled',
+        # or the surrogate.  See set_telemetry_summary for cost
+        # fields that compare across methods.
+        self.surrogate_nodes = np.zeros(self.nodes, dtype=bool)
+        self.te_pair.fallback_nodes = np.zeros(self.nodes, dtype=int)
+        self.te_pair.fidelity_nodes = np.zeros(self.nodes, dtype=object)
+        self.te_pair.converged_nodes = np.zeros(self.nodes, dtype=bool)
+
+        if self.telemetry == True:
+            self.te_pair.leg_integrations_nodes = np.zeros(self.nodes)
+            self.te_pair.rhs_calls_nodes = np.zeros(self.nodes)
+            self.te_pair.solve_ier_nodes = np.zeros(self.nodes, dtype=int)
+            self.te_pair.solve_mesg_nodes = np.zeros(self.nodes, dtype=object)
+            self.te_pair.solve_time_nodes = np.zeros(self.nodes)
+            self.te_pair.error_norm_nodes = np.zeros(self.nodes)
         self.te_pair.T_c_nodes = np.zeros(self.nodes)
         self.te_pair.T_h_nodes = np.zeros(self.nodes)
         self.te_pair.h_nodes = np.zeros(self.nodes)
@@ -299,6 +339,16 @@ class HX(object):
         # heat transfer coefficient (kW/m^-K) between TE cold side and
         # coolant
 
+    def set_R_parasitic(self):
+
+        """Sets thermal resistance between TE legs and fluids."""
+
+        self.R_parasitic = (self.plate.R_thermal + self.R_interconnect +
+        self.R_substrate + self.R_contact + self.R_extra)
+        # R_parasitic (m^2-K/kW) includes plate resistance from module
+        # platewall, resistance of interconnect and ceramic substrate
+        # and all the contact resistances
+
     def solve_node(self, i):
 
         """Solves for performance of streamwise slice of HX.
@@ -306,8 +356,15 @@ class HX(object):
         Methods:
 
         self.set_convection
+        self.surrogate.set_te_pair_values
         self.te_pair.solve_te_pair
 
+        Sets self.te_pair.knob_guess from the converged knobs of
+        previous nodes according to self.warm_start.  Knobs of nodes
+        whose solve did not converge are not used.  If
+        self.surrogate is set and applies, te_pair.solve_te_pair is
+        skipped and self.used_surrogate is True.
+
         """
 
         self.te_pair.T_h_conv = self.exh.T
@@ -324,7 +381,24 @@ class HX(object):
         self.te_pair.U_hot = self.U_hot
         self.te_pair.U_cold = self.U_cold
 
-        self.te_pair.solve_te_pair()
+        knobs_nodes = self.te_pair.knobs_nodes
+        converged_nodes = self.te_pair.converged_nodes
+        if i == 0 or self.warm_start is None or not converged_nodes[i - 1]:
+            self.te_pair.knob_guess = None
+        elif (self.warm_start == 'linear' and i > 1 and
+              converged_nodes[i - 2]):
+            self.te_pair.knob_guess = (
+                2. * knobs_nodes[:, i - 1] - knobs_nodes[:, i - 2]
+                )
+        else:
+            self.te_pair.knob_guess = knobs_nodes[:, i - 1]
+
+        self.used_surrogate = (
+            self.surrogate is not None and
+            self.surrogate.set_te_pair_values(self.te_pair)
+            )
+        if not self.used_surrogate:
+            self.te_pair.solve_te_pair()
         self.q_h = self.te_pair.q_h
         self.q_c = self.te_pair.q_c
 
@@ -341,20 +415,17 @@ class HX(object):
 
         self.init_arrays
         self.set_constants
+        self.set_R_parasitic
         self.solve_node
         self.store_node_values
+        self.set_telemetry_summary
         self.set_availability
 
         """
 
         self.init_arrays()
         self.set_constants()
-
-        self.R_parasitic = (self.plate.R_thermal + self.R_interconnect +
-        self.R_substrate + self.R_contact + self.R_extra)
-        # R_parasitic (m^2-K/kW) includes plate resistance from module
-        # platewall, resistance of interconnect and ceramic substrate
-        # and all the contact resistances
+        self.set_R_parasitic()
 
         self.exh.node_length = self.node_length
         self.exh.T = self.exh.T_inlet
@@ -381,6 +452,17 @@ class HX(object):
                 self.cool.T = (self.cool.T - self.te_pair.q_c * self.area
                     / self.cool.C)
 
+        self.te_pair.knob_guess = None
+        self.te_pair.nfev_total = np.nansum(self.te_pair.nfev_nodes)
+        self.te_pair.njev_total = np.nansum(self.te_pair.njev_nodes)
+        # total number of fsolve residual and exact Jacobian
+        # evaluations.  Zero for the 'bvp' and 'decoupled' methods,
+        # so it does not rank the cost of different methods.
+        self.converged = self.te_pair.converged_nodes.all()
+        # False if any node did not converge, even with fallbacks
+        if self.telemetry == True:
+            self.set_telemetry_summary()
+
         # defining HX outlet/inlet temperatures (K)
         self.exh.T_outlet = self.exh.T
         if self.type == 'parallel':
@@ -485,6 +567,38 @@ class HX(object):
         self.cool.mdot)
         # availability (kJ/kg) of coolant
 
+    def set_telemetry_summary(self):
+
+        """Sets summary of te_pair solver telemetry over all nodes.
+
+        Sets self.telemetry_summary, a dict with the totals of
+        te_pair.nfev_nodes, leg_integrations_nodes, rhs_calls_nodes,
+        and solve_time_nodes, the largest final error norm, the
+        slowest node, and the indices of nodes that needed a solver
+        fallback or did not converge.  Requires self.telemetry to
+        have been True during solve_hx.
+
+        'nfev' counts only fsolve residual evaluations, so it is zero
+        for nodes solved by 'bvp', 'decoupled', or the surrogate.
+        'leg_integrations' counts the leg integrations of every
+        shooting method, 'numerical' and 'decoupled' alike, and is the
+        cost to compare between them.  'rhs_calls' also counts the
+        leg derivative evaluations of 'bvp'.
+
+        """
+
+        te_pair = self.te_pair
+        self.telemetry_summary = {
+            'nfev': np.nansum(te_pair.nfev_nodes),
+            'leg_integrations': np.nansum(te_pair.leg_integrations_nodes),
+            'rhs_calls': np.nansum(te_pair.rhs_calls_nodes),
+            'solve_time': np.nansum(te_pair.solve_time_nodes),
+            'error_norm_max': te_pair.error_norm_nodes.max(),
+            'slowest_node': te_pair.solve_time_nodes.argmax(),
+            'fallback_nodes': np.flatnonzero(te_pair.fallback_nodes > 0),
+            'unconverged_nodes': np.flatnonzero(te_pair.solve_ier_nodes != 1)
+            }
+
     def store_node_values(self, i):
 
         """Stores values of parameters of interest in node i.
@@ -501,6 +615,25 @@ class HX(object):
         self.te_pair.q_h_nodes[i] = self.te_pair.q_h
         self.te_pair.q_c_nodes[i] = self.te_pair.q_c
         self.te_pair.error_nodes[:, i] = self.te_pair.error
+        self.te_pair.knobs_nodes[:, i] = [
+            self.te_pair.Ntype.q_h, self.te_pair.Ptype.q_h,
+            self.te_pair.T_h
+            ]
+        self.te_pair.nfev_nodes[i] = self.te_pair.nfev
+        self.te_pair.njev_nodes[i] = self.te_pair.njev
+        self.surrogate_nodes[i] = self.used_surrogate
+        self.te_pair.fallback_nodes[i] = self.te_pair.fallback_level
+        self.te_pair.fidelity_nodes[i] = self.te_pair.fidelity
+        self.te_pair.converged_nodes[i] = self.te_pair.solve_ier == 1
+        if self.telemetry == True:
+            self.te_pair.leg_integrations_nodes[i] = (
+                self.te_pair.leg_integrations
+                )
+            self.te_pair.rhs_calls_nodes[i] = self.te_pair.rhs_calls
+            self.te_pair.solve_ier_nodes[i] = self.te_pair.solve_ier
+            self.te_pair.solve_mesg_nodes[i] = self.te_pair.solve_mesg
+            self.te_pair.solve_time_nodes[i] = self.te_pair.solve_time
+            self.te_pair.error_norm_nodes[i] = self.te_pair.error_norm
         self.te_pair.T_h_nodes[i] = self.te_pair.T_h
         self.te_pair.T_c_nodes[i] = self.te_pair.T_c
         self.te_pair.power_nodes[i] = self.te_pair.P * self.leg_pairs
@@ -1,16 +1,234 @@
 # Distribution modules
 
 import types
+from collections import OrderedDict
 import numpy as np
-from scipy.integrate import odeint
+from scipy.integrate import odeint, solve_ivp
+from scipy.sparse import diags
 from numpy.testing import assert_approx_equal
-from scipy.optimize import fsolve
+from scipy.optimize import fsolve, brentq
 
 # User defined modules
 import mat_prop
 reload(mat_prop)
 
 
+def rk4(func, y0, t):
+
+    """Returns fixed step fourth order Runge-Kutta solution.
+
+    Inputs:
+
+    func : derivative function with the odeint signature func(y, t)
+    y0 : initial conditions
+    t : array of locations where results are desired.  These are
+    also the integration steps, so cost and accuracy are set by
+    t.size alone.
+
+    Output has the same shape as the output of odeint.
+
+    """
+
+    y = np.zeros((t.size, np.size(y0)))
+    y[0] = y0
+
+    for i in range(t.size - 1):
+        h = t[i + 1] - t[i]
+        k1 = np.array(func(y[i], t[i]))
+        k2 = np.array(func(y[i] + 0.5 * h * k1, t[i] + 0.5 * h))
+        k3 = np.array(func(y[i] + 0.5 * h * k2, t[i] + 0.5 * h))
+        k4 = np.array(func(y[i] + h * k3, t[i + 1]))
+        y[i + 1] = y[i] + h / 6. * (k1 + 2. * k2 + 2. * k3 + k4)
+
+    return y
+
+
+def get_root(func, x0, slope, xtol, max_expansions=50):
+
+    """Returns root of scalar func found by bracketing and brentq.
+
+    Inputs:
+
+    func : scalar function of one scalar
+    x0 : initial guess
+    slope : estimate of the derivative of func.  Only its sign needs
+    to be right.
+    xtol : absolute tolerance of the root
+    max_expansions : maximum number of bracket expansions
+
+    The second point is a 20% overshoot of the Newton step from x0
+    with slope, and the bracket is then expanded by a factor of 1.6
+    at whichever end has the smaller magnitude until func changes
+    sign.  Values of func are stored so that brentq does not
+    evaluate the ends of the bracket again.  Raises ValueError if no
+    sign change is found.
+
+    """
+
+    values = {}
+
+    def get_value(x):
+        if x not in values:
+            values[x] = func(x)
+        return values[x]
+
+    a = x0
+    f_a = get_value(a)
+    if f_a == 0.:
+        return a
+    b = a - 1.2 * f_a / slope
+    f_b = get_value(b)
+
+    expansions = 0
+    while np.sign(f_a) == np.sign(f_b):
+        if expansions == max_expansions:
+            raise ValueError("get_root could not bracket a root.")
+        expansions += 1
+        if abs(f_a) < abs(f_b):
+            a = a + 1.6 * (a - b)
+            f_a = get_value(a)
+        else:
+            b = b + 1.6 * (b - a)
+            f_b = get_value(b)
+
+    return brentq(get_value, a, b, xtol=xtol)
+
+
+class LegCache(object):
+
+    """Class for a bounded LRU cache of leg integrations.
+
+    One instance may be shared by any number of Leg instances by
+    setting leg.cache, or te_pair.cache for both legs of a pair.
+    Integrations are keyed on material, segments, interface
+    resistances and thickness, integrator, property_interp, nodes,
+    number of states, and T_h, q_h, J, length, and area rounded to
+    self.tol relative precision.  self.tol must stay well below the
+    relative step that fsolve uses for finite difference Jacobians
+    (~1.5e-8) or the Jacobian will be corrupted.  Stored
+    integrations are dropped by check_fits when the property fit of
+    a material changes.
+
+    Methods:
+
+    __init__
+    check_fits
+    clear
+    get
+    get_key
+    put
+
+    """
+
+    def __init__(self):
+
+        """Sets limits and zeros counters."""
+
+        self.tol = 1.e-10
+        # relative quantization tolerance for keys
+        self.max_bytes = 50.e6
+        # memory cap (bytes) for stored integration arrays
+        self.clear()
+
+    def clear(self):
+
+        """Empties cache and zeros counters."""
+
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fits = {}
+        # mat_prop.PropertyFit instances, keyed by material, that the
+        # stored integrations used
+
+    def check_fits(self, leg):
+
+        """Clears the cache if a property fit used by leg has changed.
+
+        Inputs:
+
+        leg : Leg instance
+
+        Fits are compared by identity with mat_prop.fit_registry, so
+        a material that is refit, e.g. after its entry in the
+        registry is deleted, does not reuse integrations of the old
+        fit.  Materials without fits are not checked.
+
+        """
+
+        if leg.segments is None:
+            materials = [leg.material]
+        else:
+            materials = [segment[0] for segment in leg.segments]
+
+        for material in materials:
+            if (mat_prop.get_property_setter(material) is not
+                mat_prop.set_properties_v_temp):
+                continue
+            fit = mat_prop.get_property_fit(material)
+            if self.fits.get(material, fit) is not fit:
+                self.clear()
+            self.fits[material] = fit
+
+    def get_key(self, leg):
+
+        """Returns key for the integration leg is about to run.
+
+        Inputs:
+
+        leg : Leg instance with y0, J, length, and area set
+
+        Methods:
+
+        self.check_fits
+
+        """
+
+        self.check_fits(leg)
+
+        digits = int(np.ceil(-np.log10(self.tol)))
+        values = [leg.y0[0], leg.y0[1], leg.J, leg.length, leg.area]
+        key = (
+            (leg.material, str(leg.segments), leg.R_interface,
+             leg.rho_interface, leg.interface_thickness, leg.integrator,
+             leg.property_interp, leg.nodes, leg.y0.size) +
+            tuple(float('%.*e' % (digits, value)) for value in values)
+            )
+
+        return key
+
+    def get(self, key):
+
+        """Returns copy of stored integration or None on a miss."""
+
+        try:
+            y = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.entries[key] = y
+        # reinserted as most recently used
+        self.hits += 1
+
+        return y.copy()
+
+    def put(self, key, y):
+
+        """Stores integration and evicts least recently used entries
+        until memory is under self.max_bytes."""
+
+        self.entries[key] = y.copy()
+        self.nbytes += y.nbytes
+
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            key_old, y_old = self.entries.popitem(last=False)
+            self.nbytes -= y_old.nbytes
+            self.evictions += 1
+
+
 class Leg(object):
 
     """Class for individual TE leg.
@@ -19,14 +237,28 @@ class Leg(object):
 
     __init__
     get_dTq_dx
+    get_dTq_dx_lean
+    get_dTq_dx_sens
+    get_T_c_error
+    get_dy_ds
+    get_jacobian
+    get_jacobian_lean
+    get_y
     set_ZT
     set_constants
+    set_integrator_error
+    set_leg_properties
+    set_segment_layers
     set_power_factor
     set_q_guess
     solve_leg_anal
+    solve_leg_bracket
+    solve_leg_kirchhoff
     solve_leg_once
+    solve_leg_lean
     solve_leg
     get_error
+    set_leg_values
 
     """
 
@@ -42,7 +274,11 @@ class Leg(object):
 
         mat_prop.import_raw_property_data
         mat_prop.set_properties_v_temp
-        mat_prop.set_TEproperties"""
+        mat_prop.set_TEproperties
+        mat_prop.set_property_derivs_v_temp
+        mat_prop.set_TEproperty_derivs
+        mat_prop.get_property_integrals_key
+        mat_prop.set_property_integrals"""
 
         self.I = 0.5  # current (A) in TE leg pair
         self.nodes = 10
@@ -54,6 +290,54 @@ class Leg(object):
         # assumed value for heat capacity (kJ / K)
         self.t_array = np.linspace(0, 5, 10)
         # array of times for transient solution
+        self.t_chunk = 1000
+        # number of rows by which the transient history buffer grows
+        self.transient_tol = 1.e-6
+        # relative and absolute tolerance for transient integration
+        self.use_jacobian = False
+        # if True, odeint uses the analytic Jacobian from
+        # self.get_jacobian rather than finite differences
+        self.T_int = None
+        # temperatures (K) at which property integrals are tabulated
+        # for solve_leg_kirchhoff.  If None, the table grid of the
+        # material's mat_prop.PropertyFit is used, or 100 to 1500 K
+        # for materials without fits.
+        self.integrator = 'odeint'
+        # 'odeint' for adaptive integration or 'rk4' for fixed step
+        # integration with self.nodes points, in which case nodes
+        # sets the accuracy as well as the stored output
+        self.cache = None
+        # optional LegCache instance for reusing integrations
+        self.property_interp = 'cubic'
+        # 'cubic' or 'linear' to interpolate polynomial property fits
+        # from uniform grid tables built once per material by
+        # mat_prop.PropertyFit, or None to evaluate the fits with
+        # np.polyval.  Outside of the 100 to 1500 K tables, the fits
+        # are evaluated either way.
+        self.segments = None
+        # optional list of (material, length fraction) tuples, hot
+        # side first, for a segmented leg.  self.material is then
+        # only used for guesses.  Segmented legs always use odeint
+        # and are not supported by solve_leg_anal,
+        # solve_leg_kirchhoff, solve_leg_transient, or BatchLeg, nor
+        # by te_pair.TE_Pair methods 'analytical', 'bvp', and
+        # 'kirchhoff'.
+        self.R_interface = 0.
+        # thermal contact resistance (m^2-K/W) at each segment
+        # interface
+        self.rho_interface = 0.
+        # electrical contact resistance (Ohm-m^2) at each segment
+        # interface
+        self.interface_thickness = 1.e-6
+        # thickness (m) of the layer that represents each interface
+        self.nfev = 0
+        # number of integrations by get_T_c_error
+        self.integrations = 0
+        # number of integrations of this leg, alone or with another
+        # leg, for solver telemetry.  Reset by te_pair.TE_Pair.solve_te_pair.
+        self.rhs_calls = 0
+        # number of evaluations of get_dTq_dx, get_dTq_dx_lean, and
+        # get_dTq_dx_sens, for solver telemetry
 
         self.set_constants()
 
@@ -66,15 +350,164 @@ class Leg(object):
         self.set_TEproperties = (
             types.MethodType(mat_prop.set_TEproperties, self)
             )
+        self.set_property_derivs_v_temp = (
+            types.MethodType(mat_prop.set_property_derivs_v_temp, self)
+            )
+        self.set_TEproperty_derivs = (
+            types.MethodType(mat_prop.set_TEproperty_derivs, self)
+            )
+        self.get_property_integrals_key = (
+            types.MethodType(mat_prop.get_property_integrals_key, self)
+            )
+        self.set_property_integrals = (
+            types.MethodType(mat_prop.set_property_integrals, self)
+            )
 
     def set_constants(self):
 
-        """Sets attributes that are typically held constant."""
+        """Sets attributes that are typically held constant.
+
+        Methods:
+
+        self.set_segment_layers
+
+        """
 
         self.x = np.linspace(0., self.length, self.nodes)
 
         self.J = self.I / self.area  # (Amps/m^2)
 
+        if self.segments is not None:
+            self.set_segment_layers()
+
+    def set_segment_layers(self):
+
+        """Sets layer boundaries and property evaluators for segments.
+
+        Each segment gets a Leg instance, reused across calls, that
+        holds its material property fits.  If there is any contact
+        resistance, a layer of thickness self.interface_thickness is
+        placed at each interface with zero Seebeck coefficient, k =
+        thickness / R_interface, and rho = rho_interface / thickness.
+        Its temperature and voltage drops and Joule heating then equal
+        those of the contact resistance.  Interface layers take half
+        their thickness from each neighboring segment.
+
+        Integration uses a stretched coordinate in which every layer,
+        however thin, spans one unit, so that odeint resolves the
+        interface layers in a single pass without restarting.
+
+        """
+
+        try:
+            self.segment_legs
+        except AttributeError:
+            self.segment_legs = {}
+
+        fractions = np.array([segment[1] for segment in self.segments])
+        x_ends = np.cumsum(fractions / fractions.sum()) * self.length
+
+        interface = self.R_interface > 0. or self.rho_interface > 0.
+        half = 0.5 * self.interface_thickness
+
+        self.layer_legs = []
+        x_bounds = []
+
+        for i, segment in enumerate(self.segments):
+            material = segment[0]
+            if material not in self.segment_legs:
+                self.segment_legs[material] = Leg()
+                self.segment_legs[material].material = material
+            self.segment_legs[material].property_interp = (
+                self.property_interp
+                )
+            self.layer_legs.append(self.segment_legs[material])
+
+            if i < len(self.segments) - 1:
+                if interface == True:
+                    x_bounds.append(x_ends[i] - half)
+                    self.layer_legs.append(None)
+                    # None marks an interface layer
+                    x_bounds.append(x_ends[i] + half)
+                else:
+                    x_bounds.append(x_ends[i])
+
+        self.x_bounds = np.array(x_bounds)
+        # locations (m) where layers end
+        self.x_edges = np.concatenate(([0.], self.x_bounds, [self.length]))
+        self.dx_layers = np.diff(self.x_edges)
+        # thickness (m) of each layer
+        self.s_edges = np.arange(self.x_edges.size, dtype=float)
+        # layer edges in the stretched coordinate used by get_dy_ds
+
+        if self.R_interface > 0.:
+            self.k_interface = self.interface_thickness / self.R_interface
+        else:
+            self.k_interface = 1.e9
+        self.rho_layer_interface = (
+            self.rho_interface / self.interface_thickness
+            )
+
+    def get_dy_ds(self, y, s, get_dy_dx):
+
+        """Returns derivatives w.r.t. stretched coordinate s.
+
+        Inputs:
+
+        y : state array
+        s : stretched coordinate.  Layer i spans s = i to s = i + 1.
+        get_dy_dx : derivative function w.r.t. x
+
+        Sets self.layer to i, so that set_leg_properties uses the
+        properties of the same layer whose thickness scales the
+        derivatives, including at layer edges.
+
+        """
+
+        i = min(int(s), self.dx_layers.size - 1)
+        self.layer = i
+        # index of the layer in self.layer_legs used by
+        # set_leg_properties
+        x = self.x_edges[i] + (s - i) * self.dx_layers[i]
+
+        return np.array(get_dy_dx(y, x)) * self.dx_layers[i]
+
+    def set_leg_properties(self, T, x):
+
+        """Sets TE properties at temperature T and location x.
+
+        Inputs:
+
+        T : temperature (K)
+        x : location (m) along leg
+
+        Methods:
+
+        self.set_TEproperties(T_props)
+
+        For segmented legs, only the properties of layer self.layer,
+        set by get_dy_ds, are evaluated, and x is not used.
+
+        """
+
+        if self.segments is None:
+            self.set_TEproperties(T)
+
+        else:
+            self.T_props = T
+            layer = self.layer_legs[self.layer]
+
+            if layer is None:
+                self.k = self.k_interface
+                self.alpha = 0.
+                self.rho = self.rho_layer_interface
+
+            else:
+                layer.set_TEproperties(T)
+                self.k = layer.k
+                self.alpha = layer.alpha
+                self.rho = layer.rho
+
     def get_dTq_dx(self, Tq, x):
 
         """Solves node. Returns array of derivatives.
@@ -89,27 +522,32 @@ class Leg(object):
 
         Methods:
 
-        self.set_TEproperties(T_props)
+        self.set_leg_properties(T, x)
 
         If there were a function called solve_node, it would do the
         same thing as this.
 
+        dq_dx is written as rho * J ** 2 + J ** 2 * alpha ** 2 * T / k
+        - J * alpha * q / k, which is rho * J ** 2 * (1 + ZT) - J *
+        alpha * q / k without dividing by rho, so that interface
+        layers of segmented legs with no electrical contact
+        resistance are allowed.
+
         """
 
+        self.rhs_calls += 1
         T = Tq[0]
         q = Tq[1]
 
-        self.set_TEproperties(T)
+        self.set_leg_properties(T, x)
 
         dT_dx = (
             1. / self.k * (self.J * T * self.alpha - q)
             )
 
-        self.set_ZT()
-
         dq_dx = (
-            (self.rho * self.J ** 2. * (1. + self.ZT)) - self.J *
-            self.alpha * q / self.k
+            self.rho * self.J ** 2. + self.J ** 2. * self.alpha ** 2. * T /
+            self.k - self.J * self.alpha * q / self.k
             )
 
         dVs_dx = self.alpha * dT_dx
@@ -124,29 +562,176 @@ class Leg(object):
 
         return dT_dx, dq_dx, dVs_dx, dV_dx, dR_dx
 
+    def get_dTq_dx_lean(self, Tq, x):
+
+        """Returns derivatives of T and q only.
+
+        Inputs:
+
+        Tq : array of T and q
+        x : location (m) along leg
+
+        Methods:
+
+        self.set_leg_properties(T, x)
+
+        Used by root finding iterations, which need only T and q.
+        dq_dx is rho * J ** 2 + J * alpha * dT_dx, which is
+        equivalent to the form in get_dTq_dx.
+
+        """
+
+        self.rhs_calls += 1
+        T = Tq[0]
+        q = Tq[1]
+
+        self.set_leg_properties(T, x)
+
+        dT_dx = (self.J * T * self.alpha - q) / self.k
+        dq_dx = self.rho * self.J ** 2. + self.J * self.alpha * dT_dx
+
+        return dT_dx, dq_dx
+
+    def get_dTq_dx_sens(self, y, x):
+
+        """Returns derivatives of T, q, and their sensitivities.
+
+        Inputs:
+
+        y : array of T, q, and the flattened 2x2 sensitivity matrix
+        x : location (m) along leg
+
+        Methods:
+
+        self.get_jacobian_lean
+
+        Row i, column j of the sensitivity matrix is the derivative of
+        T or q (i) w.r.t. hot side T_h or q_h (j).  It obeys the
+        forward sensitivity equation d(S)/dx = jac * S, where jac is
+        from get_jacobian_lean, which also sets the properties used
+        for dT_dx and dq_dx.
+
+        """
+
+        self.rhs_calls += 1
+        jac = self.get_jacobian_lean(y[:2], x)
+
+        dy_dx = np.empty(6)
+        dy_dx[0] = (self.J * y[0] * self.alpha - y[1]) / self.k
+        dy_dx[1] = self.rho * self.J ** 2. + self.J * self.alpha * dy_dx[0]
+        dy_dx[2:] = np.dot(jac, y[2:].reshape(2, 2)).flatten()
+
+        return dy_dx
+
+    def get_jacobian(self, Tq, x):
+
+        """Returns Jacobian of self.get_dTq_dx w.r.t. Tq.
+
+        Inputs:
+
+        Tq : state array of T, q, Vs, V, R
+        x : location (m) along leg
+
+        Methods:
+
+        self.set_TEproperties(T_props)
+        self.set_TEproperty_derivs(T_props)
+
+        Used as Dfun for odeint when self.use_jacobian is True.  Row i,
+        column j is the derivative of equation i w.r.t. state j.  Only
+        the T and q columns are nonzero because no derivative depends
+        on Vs, V, or R.  dq_dx is written as rho * J ** 2 + J ** 2 *
+        alpha ** 2 * T / k - J * alpha * q / k, which is equivalent to
+        the form in get_dTq_dx.
+
+        """
+
+        T = Tq[0]
+        q = Tq[1]
+
+        self.set_TEproperties(T)
+        self.set_TEproperty_derivs(T)
+
+        J = self.J
+        alpha = self.alpha
+        k = self.k
+        dalpha_dT = self.dalpha_dT
+        dk_dT = self.dk_dT
+
+        dT_dx = (J * T * alpha - q) / k
+
+        jac = np.zeros((5, 5))
+
+        jac[0, 0] = (J * (alpha + T * dalpha_dT) - dT_dx * dk_dT) / k
+        jac[0, 1] = -1. / k
+
+        jac[1, 0] = (
+            self.drho_dT * J ** 2. + J ** 2. * (2. * alpha * dalpha_dT *
+            T + alpha ** 2.) / k - J ** 2. * alpha ** 2. * T * dk_dT / k
+            ** 2. - J * q * (dalpha_dT / k - alpha * dk_dT / k ** 2.)
+            )
+        jac[1, 1] = - J * alpha / k
+
+        jac[2, 0] = dalpha_dT * dT_dx + alpha * jac[0, 0]
+        jac[2, 1] = alpha * jac[0, 1]
+
+        jac[3, 0] = jac[2, 0] + self.drho_dT * J
+        jac[3, 1] = jac[2, 1]
+
+        jac[4, 0] = self.drho_dT / self.area
+
+        return jac
+
+    def get_jacobian_lean(self, Tq, x):
+
+        """Returns Jacobian of self.get_dTq_dx_lean w.r.t. Tq.
+
+        Methods:
+
+        self.get_jacobian
+
+        """
+
+        return self.get_jacobian(np.array([Tq[0], Tq[1], 0., 0., 0.]),
+                                 x)[:2, :2]
+
     def solve_leg(self):
 
         """Solves leg based on specified convection boundary
-        conditions."""
+        conditions.
+
+        Methods:
+
+        self.get_error
+        self.solve_leg_once
+
+        """
+
         self.T_h = self.T_h_conv
         self.T_c = self.T_c_conv
 
         self.fsolve_output = fsolve(self.get_error, x0=self.T_h - 1.)
 
+        # Full solution, including voltage and power, at the converged
+        # hot side temperature.
+        self.T_h = self.fsolve_output[0]
+        self.q_h = self.U_hot * (self.T_h_conv - self.T_h)
+        self.solve_leg_once(self.q_h)
+
     def get_error(self, T_h):
 
         """Returns error in heat flux and temperature convection
         boundary conditions.
 
         Methods:
-        self.solve_leg_once"""
+        self.solve_leg_lean"""
 
         self.T_h = T_h[0]
 
         self.q_h_conv = self.U_hot * (self.T_h_conv - self.T_h)
         self.q_h = self.q_h_conv
 
-        self.solve_leg_once(self.q_h)
+        self.solve_leg_lean(self.q_h)
 
         self.q_c_conv = self.U_cold * (self.T_c - self.T_c_conv)
 
@@ -165,67 +750,195 @@ class Leg(object):
         Inputs:
         q_h - hot side heat flux (W / m^2)
 
+        Methods:
+
+        self.get_y
+        self.set_leg_values
+
         """
 
         self.q_h = q_h
         self.y0 = np.array([self.T_h, self.q_h, 0, 0, 0])
 
-        self.y = odeint(self.get_dTq_dx, y0=self.y0, t=self.x)
+        self.y = self.get_y(self.get_dTq_dx, self.get_jacobian)
 
-        self.T_x = self.y[:, 0]
-        self.q_x = self.y[:, 1]
-        self.Vs_x = self.y[:, 2]
-        self.V_x = self.y[:, 3]
-        self.R_int_x = self.y[:, 4]
+        self.set_leg_values()
 
-        self.T_c = self.T_x[-1]
-        self.q_c = self.q_x[-1]
-        
-        self.Vs = self.Vs_x[0] - self.Vs_x[-1]
-        self.V = self.V_x[0] - self.V_x[-1]
-        self.R_internal = self.R_int_x[-1]
+    def get_y(self, get_dy_dx, get_jac):
 
-        self.P_flux = self.J * self.V
-        self.P = self.P_flux * self.area
-        # Power for the entire leg (W)
+        """Returns integration of get_dy_dx from self.y0 over self.x.
 
-        self.eta = self.P / (self.q_h * self.area)
-        # Efficiency of leg
-        self.R_load = self.V / self.I
+        Inputs:
 
-        # Sanity check.  q_h - q_c should be nearly equal but not
-        # exactly equal to P.  It is not exact because of spatial
-        # asymmetry in electrical resistivity along the leg.  I
-        # imported assert_approx_equal in the front matter to make
-        # this print an error if there is too much disagreement.
+        get_dy_dx : derivative function
+        get_jac : Jacobian of get_dy_dx, used if self.use_jacobian
 
-        self.P_from_heat = (self.q_h - self.q_c) * self.area
+        Uses self.integrator and, if self.cache is set, returns a
+        stored integration when one matches.  Segmented legs are
+        always integrated by odeint over the stretched coordinate of
+        self.get_dy_ds without the analytic Jacobian.
 
-        sig_figs = 3
-        # tolerance in number of sig figs that agree.  Higher number
-        # is stricter aka tighter tolerance.  This may need to be
-        # reduced if you know the code is correct and it is still
-        # printing the error statement.
+        """
 
-        try:
-            assert_approx_equal(self.P, self.P_from_heat, sig_figs)
-        except AssertionError:
-            print "\nPower from q_h - q_c and I  **  2 * R disagree."
-            print "Consider reducing sig_figs under solve_leg_once"
-            print "in leg.py if you think this is an error."
+        if self.cache is not None:
+            key = self.cache.get_key(self)
+            y = self.cache.get(key)
+            if y is not None:
+                return y
 
-    def set_q_guess(self):
+        self.integrations += 1
 
-        """Sets guess for q_c to be used by iterative solutions.
+        if self.segments is not None:
+            s_x = np.interp(self.x, self.x_edges, self.s_edges)
+            y = odeint(self.get_dy_ds, y0=self.y0, t=s_x, args=(get_dy_dx,))
 
-        Methods:
+        elif self.integrator == 'rk4':
+            y = rk4(get_dy_dx, y0=self.y0, t=self.x)
 
-        self.set_TEproperties(T_props)
+        else:
+            if self.use_jacobian == True:
+                Dfun = get_jac
+            else:
+                Dfun = None
 
-        """
+            y = odeint(get_dy_dx, y0=self.y0, t=self.x, Dfun=Dfun)
 
-        self.T_props = 0.5 * (self.T_h + self.T_c)
-        self.set_TEproperties(T_props=self.T_props)
+        if self.cache is not None:
+            self.cache.put(key, y)
+
+        return y
+
+    def set_integrator_error(self):
+
+        """Sets error of fixed step integration relative to odeint.
+
+        Methods:
+
+        self.solve_leg_once
+
+        Integrates the leg from the current self.T_h and self.q_h with
+        both 'rk4' and 'odeint' and sets:
+
+        self.T_c_int_error : cold side temperature difference (K)
+        self.q_c_int_error : relative cold side heat flux difference
+        self.P_int_error : relative power difference
+
+        Results of the 'rk4' integration are left in place.
+
+        """
+
+        integrator = self.integrator
+        q_h = self.q_h
+
+        self.integrator = 'odeint'
+        self.solve_leg_once(q_h)
+        T_c = self.T_c
+        q_c = self.q_c
+        P = self.P
+
+        self.integrator = 'rk4'
+        self.solve_leg_once(q_h)
+
+        self.T_c_int_error = np.abs(self.T_c - T_c)
+        self.q_c_int_error = np.abs((self.q_c - q_c) / q_c)
+        self.P_int_error = np.abs((self.P - P) / P)
+
+        self.integrator = integrator
+
+    def solve_leg_lean(self, q_h):
+
+        """Solves T and q in leg once based on hot side heat flux.
+
+        Inputs:
+        q_h - hot side heat flux (W / m^2)
+
+        Methods:
+
+        self.get_y
+        self.get_dTq_dx_lean
+
+        Sets only self.T_x, self.q_x, self.T_c, and self.q_c.  Voltage,
+        resistance, power, and the energy balance check are left to
+        self.solve_leg_once, which should be run once the boundary
+        conditions have converged.
+
+        """
+
+        self.q_h = q_h
+        self.y0 = np.array([self.T_h, self.q_h])
+
+        self.y = self.get_y(self.get_dTq_dx_lean, self.get_jacobian_lean)
+
+        self.T_x = self.y[:, 0]
+        self.q_x = self.y[:, 1]
+
+        self.T_c = self.T_x[-1]
+        self.q_c = self.q_x[-1]
+
+    def set_leg_values(self):
+
+        """Sets leg results from integrated state array self.y.
+
+        self.y has columns T, q, Vs, V, and R_internal and can come
+        from either self.solve_leg_once or a fused integration of
+        several legs such as te_pair.TE_Pair.solve_te_pair_once.
+
+        """
+
+        self.T_x = self.y[:, 0]
+        self.q_x = self.y[:, 1]
+        self.Vs_x = self.y[:, 2]
+        self.V_x = self.y[:, 3]
+        self.R_int_x = self.y[:, 4]
+
+        self.T_c = self.T_x[-1]
+        self.q_c = self.q_x[-1]
+        
+        self.Vs = self.Vs_x[0] - self.Vs_x[-1]
+        self.V = self.V_x[0] - self.V_x[-1]
+        self.R_internal = self.R_int_x[-1]
+
+        self.P_flux = self.J * self.V
+        self.P = self.P_flux * self.area
+        # Power for the entire leg (W)
+
+        self.eta = self.P / (self.q_h * self.area)
+        # Efficiency of leg
+        self.R_load = self.V / self.I
+
+        # Sanity check.  q_h - q_c should be nearly equal but not
+        # exactly equal to P.  It is not exact because of spatial
+        # asymmetry in electrical resistivity along the leg.  I
+        # imported assert_approx_equal in the front matter to make
+        # this print an error if there is too much disagreement.
+
+        self.P_from_heat = (self.q_h - self.q_c) * self.area
+
+        sig_figs = 3
+        # tolerance in number of sig figs that agree.  Higher number
+        # is stricter aka tighter tolerance.  This may need to be
+        # reduced if you know the code is correct and it is still
+        # printing the error statement.
+
+        try:
+            assert_approx_equal(self.P, self.P_from_heat, sig_figs)
+        except AssertionError:
+            print "\nPower from q_h - q_c and I  **  2 * R disagree."
+            print "Consider reducing sig_figs under solve_leg_once"
+            print "in leg.py if you think this is an error."
+
+    def set_q_guess(self):
+
+        """Sets guess for q_c to be used by iterative solutions.
+
+        Methods:
+
+        self.set_TEproperties(T_props)
+
+        """
+
+        self.T_props = 0.5 * (self.T_h + self.T_c)
+        self.set_TEproperties(T_props=self.T_props)
         delta_T = self.T_h - self.T_c
         self.q_c = - (
             self.alpha * self.T_c * self.J - delta_T / self.length *
@@ -243,6 +956,56 @@ class Leg(object):
         self.q_h_guess = self.q_h
         self.q_guess = self.q_h
 
+    def get_T_c_error(self, q_h):
+
+        """Returns error in cold side temperature (K).
+
+        Inputs:
+
+        q_h : hot side heat flux (W / m^2)
+
+        Methods:
+
+        self.solve_leg_lean
+
+        """
+
+        self.solve_leg_lean(q_h)
+        self.nfev += 1
+
+        return self.T_c - self.T_c_goal
+
+    def solve_leg_bracket(self, q_h_guess, T_tol):
+
+        """Finds q_h for which T_c is self.T_c_goal.
+
+        Inputs:
+
+        q_h_guess : guess of hot side heat flux (W / m^2)
+        T_tol : tolerance (K) of T_c, converted to a tolerance of q_h
+        with k / length
+
+        Methods:
+
+        leg.get_root
+        self.get_T_c_error
+
+        Uses self.T_h.  Cold side temperature decreases as q_h
+        increases, and the slope for the first step is -length / k
+        from conduction alone.  Leaves T_x, q_x, T_c, and q_c from
+        solve_leg_lean at the root and increments self.nfev by the
+        number of integrations.
+
+        """
+
+        self.set_TEproperties(0.5 * (self.T_h + self.T_c_goal))
+        q_h = get_root(
+            self.get_T_c_error, q_h_guess, - self.length / self.k,
+            T_tol * self.k / self.length
+            )
+        if q_h != self.q_h:
+            self.get_T_c_error(q_h)
+
     def solve_leg_anal(self):
 
         """Analytically solves the leg based on lumped properties.
@@ -251,7 +1014,10 @@ class Leg(object):
 
         self.set_TEproperties
 
-        No iteration is needed.
+        No iteration is needed.  Properties are evaluated at the mean
+        of self.T_h and self.T_c.  Signs of current and heat flux
+        follow solve_leg_once, so that q_h, q_c, and P match the
+        numerical solution for constant properties.
 
         """
 
@@ -261,29 +1027,152 @@ class Leg(object):
 
         delta_T = self.T_h - self.T_c
         self.q_h = (
-            self.alpha * self.T_h * self.J - delta_T / self.length *
-            self.k + self.J ** 2. * self.length * self.rho / 2.
+            self.alpha * self.T_h * self.J + delta_T / self.length *
+            self.k - self.J ** 2. * self.length * self.rho / 2.
             )
         self.q_c = (
-            self.alpha * self.T_c * self.J - delta_T / self.length *
-            self.k - self.J ** 2 * self.length * self.rho
+            self.alpha * self.T_c * self.J + delta_T / self.length *
+            self.k + self.J ** 2 * self.length * self.rho / 2.
             )
 
-        self.P_flux = (
-            (self.alpha * delta_T * self.J + self.rho * self.J ** 2 *
-             self.length)
-            )
+        self.T_x = np.linspace(self.T_h, self.T_c, self.nodes)
+        # approximate temperature profile
+
+        self.Vs = self.alpha * delta_T
+        self.V = self.Vs - self.rho * self.J * self.length
+        self.R_internal = self.rho * self.length / self.area
+
+        self.P_flux = self.J * self.V
         self.P = self.P_flux * self.area
         self.eta = self.P / (self.q_h * self.area)
-        self.eta_check = (
-            (self.J * self.alpha * delta_T + self.rho * self.J **
-            2. * self.length) / (self.alpha * self.T_h * self.J -
-            delta_T / self.length * self.k + self.J ** 2 * self.length
-            * self.rho / 2.)
-            )
-        self.V = -self.P / np.abs(self.I)
-        self.R_internal = self.rho * self.length / self.area
-        self.R_load = - self.V / self.I
+        self.R_load = self.V / self.I
+
+    def solve_leg_kirchhoff(self):
+
+        """Solves the leg semi-analytically from property integrals.
+
+        Methods:
+
+        self.get_property_integrals_key
+        self.set_property_integrals
+        self.set_TEproperties
+        self.set_TEproperty_derivs
+
+        Like solve_leg_anal, this needs self.T_h and self.T_c rather
+        than q_h, and no iteration or ODE integration is needed.
+        Unlike solve_leg_anal, properties enter through their
+        integrals over [T_c, T_h] rather than values at the mean
+        temperature.
+
+        With c = -k dT/dx the conductive heat flux, the leg equations
+        give dc/dx = rho J^2 - J T dalpha/dT dT/dx.  Integrating twice
+        and using the Kirchhoff transform, integral of c dx = integral
+        of k dT, gives c at the hot side.  The Joule and Thomson
+        source terms are weighted assuming a linear temperature
+        profile, which is the only approximation.  The Seebeck voltage
+        is exact.
+
+        Beyond the ends of the integral tables, self.T_int_table, the
+        integrals are extrapolated linearly from the last table
+        interval rather than held constant, so that the convection BC
+        errors of solve_te_pair_kirchhoff keep changing with trial
+        temperatures.  Differences of the tables lose precision when
+        T_h - T_c spans only a few table intervals, so spans under ten
+        intervals use properties and derivatives at the mean
+        temperature instead.  This gives the conduction-free limit
+        when T_h equals T_c.
+
+        The tables are rebuilt whenever the material, property_interp,
+        T_int, or property fit differs from when they were built.
+
+        """
+
+        try:
+            int_key = self.int_key
+        except AttributeError:
+            int_key = None
+        if int_key != self.get_property_integrals_key():
+            self.set_property_integrals()
+
+        T_int = self.T_int_table
+
+        def get_int(table, T):
+            if T < T_int[0]:
+                return table[0] + (T - T_int[0]) * (
+                    (table[1] - table[0]) / (T_int[1] - T_int[0])
+                    )
+            if T > T_int[-1]:
+                return table[-1] + (T - T_int[-1]) * (
+                    (table[-1] - table[-2]) / (T_int[-1] - T_int[-2])
+                    )
+            return np.interp(T, T_int, table)
+
+        T_h = self.T_h
+        T_c = self.T_c
+        J = self.J
+        L = self.length
+        delta_T = T_h - T_c
+
+        self.set_TEproperties(T_props=T_h)
+        alpha_h = self.alpha
+
+        if abs(delta_T) < 10. * (T_int[1] - T_int[0]):
+            T_mean = 0.5 * (T_h + T_c)
+            self.set_TEproperties(T_props=T_mean)
+            self.set_TEproperty_derivs(T_mean)
+            self.Vs = self.alpha * delta_T
+            rho_bar = self.rho
+            c_h = (
+                self.k * delta_T / L - 0.5 * J ** 2. * L * rho_bar - 0.5 *
+                J * T_mean * self.dalpha_dT * delta_T
+                )
+            # conductive heat flux (W/m^2) at hot side with the
+            # property integrals expanded about T_mean
+
+        else:
+            self.Vs = (
+                get_int(self.alpha_int, T_h) - get_int(self.alpha_int, T_c)
+                )
+            k_bar = (get_int(self.k_int, T_h) - get_int(self.k_int, T_c))
+            # integral of k dT (W/m)
+            rho_bar = (
+                (get_int(self.rho_int, T_h) - get_int(self.rho_int, T_c)) /
+                delta_T
+                )
+            # mean of rho over the linear profile (Ohm-m)
+            rho_moment = (
+                get_int(self.rhoT_int, T_h) - get_int(self.rhoT_int, T_c) -
+                T_c * rho_bar * delta_T
+                )
+            # integral of (T - T_c) * rho dT
+            thomson = (
+                get_int(self.alphaT_int, T_h) - get_int(self.alphaT_int, T_c)
+                - T_h * alpha_h * delta_T - (get_int(self.alpha_int2, T_h) -
+                get_int(self.alpha_int2, T_c)) + get_int(self.alpha_int, T_h)
+                * delta_T
+                )
+            # integral over [T_c, T_h] of the integral of T dalpha/dT
+            # from T_h to T
+
+            c_h = (
+                (k_bar - J ** 2. * L ** 2. / delta_T ** 2. * rho_moment + J
+                 * L / delta_T * thomson) / L
+                )
+            # conductive heat flux (W/m^2) at hot side
+
+        self.q_h = J * T_h * alpha_h + c_h
+        self.q_c = self.q_h + J ** 2. * L * rho_bar - J * self.Vs
+
+        self.T_x = np.linspace(T_h, T_c, self.nodes)
+        # approximate temperature profile
+
+        self.V = self.Vs - J * L * rho_bar
+        self.R_internal = rho_bar * L / self.area
+
+        self.P_flux = self.J * self.V
+        self.P = self.P_flux * self.area
+        self.eta = self.P / (self.q_h * self.area)
+        self.R_load = self.V / self.I
 
     def set_ZT(self):
 
@@ -309,66 +1198,121 @@ class Leg(object):
 
     def solve_leg_transient(self):
 
-        """Solves leg based on array of transient BC's."""
+        """Solves leg based on array of transient BC's.
 
-        self.delta_x = self.x[1] - self.x[0]
+        Methods:
 
-        self.y0 = self.T_x
+        self.get_dTx_dt
 
-        try: 
-            self.T_xt
+        Integrates the method of lines system from the last stored
+        temperature profile, or from self.T_x on the first call, over
+        self.t_array with an implicit BDF method.  Each node depends
+        only on its two neighbors on either side, so the Jacobian is
+        estimated with a banded sparsity pattern.
+
+        Results are appended to a history buffer that grows by
+        self.t_chunk rows at a time.  self.T_xt is a view of the
+        filled rows with shape (times, nodes) and self.t_xt holds the
+        corresponding elapsed time (s), accumulated over calls.  Delete
+        self.T_xt_buffer to start a new history.
+
+        """
+
+        self.delta_x = self.x[1] - self.x[0]
+
+        try:
+            self.T_xt_buffer
 
         except AttributeError:
-            self.odeint_output = odeint(
-                self.get_dTx_dt, y0=self.y0, t=self.t_array,
-                full_output=1 
-                )
-            self.T_xt = self.odeint_output[0]
+            self.y0 = self.T_x
+            self.T_xt_buffer = np.zeros((self.t_chunk, self.nodes))
+            self.t_xt_buffer = np.zeros(self.t_chunk)
+            self.t_rows = 0
+            t_offset = 0.
 
         else:
-            self.y0 = self.T_xt[-1,:]
-            self.odeint_output = odeint(
-                self.get_dTx_dt, y0=self.y0, t=self.t_array,
-                full_output=1 
+            self.y0 = self.T_xt[-1, :]
+            t_offset = self.t_xt[-1] - self.t_array[0]
+
+        jac_sparsity = diags(
+            np.ones((5, self.nodes)), np.arange(-2, 3),
+            shape=(self.nodes, self.nodes)
+            )
+
+        self.ivp_output = solve_ivp(
+            lambda t, T: self.get_dTx_dt(T, t),
+            (self.t_array[0], self.t_array[-1]), self.y0, method='BDF',
+            t_eval=self.t_array, jac_sparsity=jac_sparsity,
+            vectorized=True, rtol=self.transient_tol,
+            atol=self.transient_tol
+            )
+
+        rows = self.t_array.size
+        if self.t_rows + rows > self.T_xt_buffer.shape[0]:
+            chunks = (
+                (self.t_rows + rows - self.T_xt_buffer.shape[0]) /
+                self.t_chunk + 1
+                )
+            self.T_xt_buffer = np.concatenate(
+                (self.T_xt_buffer, np.zeros((chunks * self.t_chunk,
+                self.nodes)))
+                )
+            self.t_xt_buffer = np.concatenate(
+                (self.t_xt_buffer, np.zeros(chunks * self.t_chunk))
                 )
-            self.T_xt = np.concatenate((self.T_xt, self.odeint_output[0]))
+
+        self.T_xt_buffer[self.t_rows:self.t_rows + rows] = (
+            self.ivp_output.y.T
+            )
+        self.t_xt_buffer[self.t_rows:self.t_rows + rows] = (
+            self.ivp_output.t + t_offset
+            )
+        self.t_rows += rows
+
+        self.T_xt = self.T_xt_buffer[:self.t_rows]
+        self.t_xt = self.t_xt_buffer[:self.t_rows]
 
     def get_dTx_dt(self, T, t):
 
         """Returns derivative of array of T wrt time.
+
+        Inputs:
+
+        T : array of node temperatures (K) with shape (nodes,) or
+        (nodes, columns) for vectorized evaluation
+        t : time (s)
+
+        Methods:
+
+        self.set_TEproperties(T_props)
+        self.set_ZT
+
+        Properties for all nodes are evaluated in one call.
+
         """
 
-        self.dT_dt = np.zeros(T.size)
-        self.q0 = np.zeros(T.size)
-        self.dq_dx_ss = np.zeros(T.size)
-        self.dq_dx = np.zeros(T.size)
-        self.dT_dx = np.zeros(T.size)
+        self.set_TEproperties(T)
+        self.set_ZT()
 
-        self.dT_dx[1:-1] = 0.5 * (T[2:] - T[:-2]) / self.delta_x  
+        self.dT_dx = np.zeros(T.shape)
+        self.dT_dx[1:-1] = 0.5 * (T[2:] - T[:-2]) / self.delta_x
         self.dT_dx[0] = (T[1] - T[0]) / self.delta_x
         self.dT_dx[-1] = (T[-1] - T[-2]) / self.delta_x
 
-        for i in range(self.nodes):
-
-            T_props = T[i]  # i for central differencing
-            self.set_TEproperties(T_props)
-            self.set_ZT()
-
-            self.q0[i] = (
-                self.J * T[i] * self.alpha - self.k * self.dT_dx[i]
-                ) 
+        self.q0 = self.J * T * self.alpha - self.k * self.dT_dx
 
-            self.dq_dx_ss[i] = (
-                (self.rho * self.J ** 2. * (1. + self.ZT)) - self.J *
-                self.alpha * self.q0[i] / self.k
-                )
+        self.dq_dx_ss = (
+            (self.rho * self.J ** 2. * (1. + self.ZT)) - self.J *
+            self.alpha * self.q0 / self.k
+            )
 
         # hot side BC, q_h
-        self.q0[0] = self.U_hot * (self.T_h_conv - T[0]) 
+        self.q0[0] = self.U_hot * (self.T_h_conv - T[0])
 
-        # cold side BC, q_c 
+        # cold side BC, q_c
         self.q0[-1] = self.U_cold * (T[-1] - self.T_c_conv)
 
+        self.dq_dx = np.zeros(T.shape)
         self.dq_dx[1:-1] = (
             (self.q0[2:] - self.q0[:-2]) / (2. * self.delta_x)
             )
@@ -379,14 +1323,305 @@ class Leg(object):
             (self.q0[-1] - self.q0[-2]) / self.delta_x
             )
 
-        for i in range(self.nodes):
+        self.dT_dt = 1. / self.C * (-self.dq_dx + self.dq_dx_ss)
+
+        return self.dT_dt
+
+
+class BatchLeg(Leg):
+
+    """Class for integrating many independent TE legs at once.
+
+    Every attribute that is a scalar for Leg (T_h, q_h, J, length,
+    area) may be an array here with one entry per leg.  All legs must
+    be the same material, although each leg may have its own property
+    fit coefficients through self.ensemble_params.  The legs are
+    integrated in a single odeint call over a normalized coordinate,
+    xi = x / length, so that legs of different length share one
+    integration grid.
+
+    Methods:
+
+    __init__
+    get_dTq_dxi
+    get_dTq_dxi_lean
+    set_constants
+    set_leg_properties
+    set_leg_values
+    solve_leg_lean
+    solve_leg_once
+
+    """
 
-            T_props = T[i]  # i for central differencing
-            self.set_TEproperties(T_props)
-            self.set_ZT()
+    def __init__(self):
 
-            self.dT_dt[i] = (
-                1. / self.C * (-self.dq_dx[i] + self.dq_dx_ss[i])
+        """Sets constants and binds methods.
+
+        Methods:
+
+        Leg.__init__
+
+        Binds the following methods:
+
+        mat_prop.set_ensemble_properties
+
+        """
+
+        self.J = 0.5 / (3.e-3) ** 2.
+        # current density (A/m^2) equal to the Leg default
+        self.ensemble_params = None
+        # optional array of shape (3, legs, degree + 1) from
+        # mat_prop.get_property_ensemble giving each leg its own
+        # property fit coefficients
+
+        super(BatchLeg, self).__init__()
+
+        self.set_ensemble_properties = (
+            types.MethodType(mat_prop.set_ensemble_properties, self)
+            )
+
+    def set_constants(self):
+
+        """Broadcasts leg inputs to arrays and sets grids.
+
+        self.J, self.length, and self.area may be scalars or arrays.
+        self.I is derived from self.J rather than the other way around
+        as in Leg.
+
+        """
+
+        self.J, self.length, self.area = [
+            np.array(arr, dtype=float) for arr in np.broadcast_arrays(
+                np.atleast_1d(self.J), np.atleast_1d(self.length),
+                np.atleast_1d(self.area)
                 )
+            ]
+        if self.ensemble_params is not None:
+            self.J, self.length, self.area = [
+                arr * np.ones(self.ensemble_params.shape[1]) for arr in
+                [self.J, self.length, self.area]
+                ]
+        self.legs = self.J.size
+        # number of legs integrated together
 
-        return self.dT_dt
+        self.I = self.J * self.area  # current (A) in each leg
+
+        self.xi = np.linspace(0., 1., self.nodes)
+        # normalized location along each leg
+        self.x = self.xi[:, np.newaxis] * self.length
+        # location (m) along each leg with shape (nodes, legs)
+
+    def set_leg_properties(self, T, xi):
+
+        """Sets properties of every leg.
+
+        Inputs:
+
+        T : temperature (K) of each leg
+        xi : normalized location along legs
+
+        Methods:
+
+        self.set_TEproperties(T)
+        self.set_ensemble_properties(T)
+
+        Uses self.set_ensemble_properties if self.ensemble_params is
+        set.
+
+        """
+
+        if self.ensemble_params is None:
+            self.set_TEproperties(T)
+        else:
+            self.set_ensemble_properties(T)
+
+    def get_dTq_dxi(self, Tq, xi):
+
+        """Returns derivatives of all legs w.r.t. normalized location.
+
+        Inputs:
+
+        Tq : flattened state array of shape (legs * 5) ordered leg by
+        leg as T, q, Vs, V, R
+        xi : normalized location along legs
+
+        Methods:
+
+        self.set_leg_properties(T, xi)
+        self.set_ZT
+
+        Properties are evaluated for every leg in one call with an
+        array of temperatures.  The derivatives match
+        Leg.get_dTq_dx multiplied by each leg length.
+
+        """
+
+        Tq = Tq.reshape(self.legs, 5)
+        T = Tq[:, 0]
+        q = Tq[:, 1]
+
+        self.set_leg_properties(T, xi)
+        self.set_ZT()
+
+        dTq_dxi = np.empty((self.legs, 5))
+
+        dT_dx = (self.J * T * self.alpha - q) / self.k
+
+        dTq_dxi[:, 0] = dT_dx
+        dTq_dxi[:, 1] = (
+            (self.rho * self.J ** 2. * (1. + self.ZT)) - self.J *
+            self.alpha * q / self.k
+            )
+        dTq_dxi[:, 2] = self.alpha * dT_dx
+        dTq_dxi[:, 3] = self.alpha * dT_dx + self.rho * self.J
+        dTq_dxi[:, 4] = self.rho / self.area
+
+        dTq_dxi *= self.length[:, np.newaxis]
+
+        return dTq_dxi.ravel()
+
+    def get_dTq_dxi_lean(self, Tq, xi):
+
+        """Returns derivatives of T and q only for all legs.
+
+        Inputs:
+
+        Tq : flattened state array of shape (legs * 2) ordered leg by
+        leg as T, q
+        xi : normalized location along legs
+
+        Methods:
+
+        self.set_leg_properties(T, xi)
+
+        Batch counterpart of Leg.get_dTq_dx_lean.
+
+        """
+
+        Tq = Tq.reshape(self.legs, 2)
+        T = Tq[:, 0]
+        q = Tq[:, 1]
+
+        self.set_leg_properties(T, xi)
+
+        dTq_dxi = np.empty((self.legs, 2))
+        dTq_dxi[:, 0] = (self.J * T * self.alpha - q) / self.k
+        dTq_dxi[:, 1] = (
+            self.rho * self.J ** 2. + self.J * self.alpha * dTq_dxi[:, 0]
+            )
+
+        dTq_dxi *= self.length[:, np.newaxis]
+
+        return dTq_dxi.ravel()
+
+    def solve_leg_lean(self, q_h):
+
+        """Solves T and q in all legs once based on hot side heat flux.
+
+        Inputs:
+
+        q_h - hot side heat flux (W / m^2), scalar or array with one
+        entry per leg
+
+        Methods:
+
+        self.get_dTq_dxi_lean
+
+        Sets only self.T_x, self.q_x, self.T_c, and self.q_c, as
+        Leg.solve_leg_lean does.  The Jacobian is passed to odeint as
+        banded with 1 sub and super diagonal.
+
+        """
+
+        self.q_h = np.ones(self.legs) * q_h
+        self.T_h = np.ones(self.legs) * self.T_h
+
+        self.y0 = np.zeros((self.legs, 2))
+        self.y0[:, 0] = self.T_h
+        self.y0[:, 1] = self.q_h
+
+        self.y = odeint(
+            self.get_dTq_dxi_lean, y0=self.y0.ravel(), t=self.xi, ml=1, mu=1
+            ).reshape(self.nodes, self.legs, 2)
+
+        self.T_x = self.y[:, :, 0]
+        self.q_x = self.y[:, :, 1]
+
+        self.T_c = self.T_x[-1]
+        self.q_c = self.q_x[-1]
+
+    def solve_leg_once(self, q_h):
+
+        """Solves all legs once based on hot side heat flux.
+
+        Inputs:
+
+        q_h - hot side heat flux (W / m^2), scalar or array with one
+        entry per leg
+
+        Methods:
+
+        self.get_dTq_dxi
+        self.set_leg_values
+
+        The Jacobian of the flattened system is block diagonal, so it
+        is passed to odeint as banded with 4 sub and super diagonals.
+
+        """
+
+        self.q_h = np.ones(self.legs) * q_h
+        self.T_h = np.ones(self.legs) * self.T_h
+
+        self.y0 = np.zeros((self.legs, 5))
+        self.y0[:, 0] = self.T_h
+        self.y0[:, 1] = self.q_h
+
+        self.y = odeint(
+            self.get_dTq_dxi, y0=self.y0.ravel(), t=self.xi, ml=4, mu=4
+            )
+
+        self.set_leg_values()
+
+    def set_leg_values(self):
+
+        """Sets results for all legs from integrated state self.y.
+
+        Arrays ending in _x have shape (nodes, legs).  All other
+        results have one entry per leg.
+
+        """
+
+        self.y = self.y.reshape(self.nodes, self.legs, 5)
+
+        self.T_x = self.y[:, :, 0]
+        self.q_x = self.y[:, :, 1]
+        self.Vs_x = self.y[:, :, 2]
+        self.V_x = self.y[:, :, 3]
+        self.R_int_x = self.y[:, :, 4]
+
+        self.T_c = self.T_x[-1]
+        self.q_c = self.q_x[-1]
+
+        self.Vs = self.Vs_x[0] - self.Vs_x[-1]
+        self.V = self.V_x[0] - self.V_x[-1]
+        self.R_internal = self.R_int_x[-1]
+
+        self.P_flux = self.J * self.V
+        self.P = self.P_flux * self.area
+        # Power for each leg (W)
+
+        self.eta = self.P / (self.q_h * self.area)
+        self.R_load = self.V / self.I
+
+        # Same sanity check as Leg.set_leg_values, applied to all legs
+        # at once.
+        self.P_from_heat = (self.q_h - self.q_c) * self.area
+
+        sig_figs = 3
+        disagree = (
+            np.abs(self.P - self.P_from_heat) > 10. ** -sig_figs *
+            np.abs(self.P)
+            )
+        if disagree.any():
+            print "\nPower from q_h - q_c and I  **  2 * R disagree for",
+            print disagree.sum(), "of", self.legs, "legs."
@@ -1,7 +1,142 @@
 """Module containing set properties function."""
 
 
+import os
+import hashlib
 import numpy as np
+from scipy.integrate import cumtrapz
+
+
+try:
+    data_dir
+except NameError:
+    data_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), os.pardir, 'MatData'
+        )
+    # directory with one raw property data file per fitted material,
+    # named after the material, e.g. 'HMS.csv'.  Adding a file here
+    # makes a new material available without code changes.
+    fit_cache_dir = os.path.join(data_dir, 'fit_cache')
+    # directory in which fitted coefficients are cached.  Both
+    # directories are kept through reload(mat_prop).
+
+
+def get_data_file(material):
+
+    """Returns path of the raw property data file for material.
+
+    npz files take precedence over csv files.  Returns None if there
+    is no data file.
+
+    Inputs:
+
+    material : material name
+
+    """
+
+    for extension in ['.npz', '.csv']:
+        path = os.path.join(data_dir, material + extension)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_raw_property_data(path):
+
+    """Returns raw property data and fit type from a data file.
+
+    csv files have a line 'property,T (K),value' for every data point,
+    where property is alpha (uV/K), k (W/m-K), or sigma (S/cm), and a
+    comment line '# fit: poly <degree>'.  Other lines starting with
+    '#' are comments.  npz files hold arrays alpha_raw, k_raw, and
+    sigma_raw with columns of temperature and value, and a string
+    fit.
+
+    Inputs:
+
+    path : path of data file
+
+    Returns a dict of raw data arrays keyed by property name and the
+    fit type string.
+
+    """
+
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            raw = dict(
+                (prop, data[prop + '_raw']) for prop in ['alpha', 'k', 'sigma']
+                )
+            fit = str(data['fit'])
+
+    else:
+        rows = {'alpha': [], 'k': [], 'sigma': []}
+        fit = 'poly 3'
+        with open(path) as data:
+            for line in data:
+                if line.startswith('#'):
+                    if line[1:].strip().startswith('fit:'):
+                        fit = line.split(':', 1)[1].strip()
+                    continue
+                fields = line.split(',')
+                if fields[0] in rows:
+                    rows[fields[0]].append(
+                        [float(fields[1]), float(fields[2])]
+                        )
+        raw = dict((prop, np.array(rows[prop])) for prop in rows)
+
+    return raw, fit
+
+
+def get_fit_params(raw, fit):
+
+    """Returns fit coefficients for raw data, using a disk cache.
+
+    Cached coefficients are stored in fit_cache_dir in a file named
+    after a hash of the raw data and the fit type, so editing a data
+    file or its fit type triggers a new fit.  If the cache cannot be
+    written, the fit is still returned.
+
+    Inputs:
+
+    raw : dict of raw data arrays from load_raw_property_data
+    fit : fit type.  Only 'poly <degree>' is supported.
+
+    Returns a dict of np.polyfit coefficients keyed by property name.
+
+    """
+
+    props = ['alpha', 'k', 'sigma']
+
+    key = hashlib.sha1(fit.encode())
+    for prop in props:
+        key.update(prop.encode())
+        key.update(np.ascontiguousarray(raw[prop], dtype=float).tobytes())
+    path = os.path.join(fit_cache_dir, key.hexdigest() + '.npz')
+
+    if os.path.isfile(path):
+        with np.load(path) as cached:
+            return dict((prop, cached[prop + '_params']) for prop in props)
+
+    fit_type = fit.split()
+    if len(fit_type) != 2 or fit_type[0] != 'poly':
+        raise ValueError("Unsupported fit type '" + fit + "'")
+    poly_deg = int(fit_type[1])
+
+    params = dict(
+        (prop, np.polyfit(raw[prop][:, 0], raw[prop][:, 1], poly_deg))
+        for prop in props
+        )
+
+    try:
+        if not os.path.isdir(fit_cache_dir):
+            os.makedirs(fit_cache_dir)
+        np.savez(
+            path, **dict((prop + '_params', params[prop]) for prop in props)
+            )
+    except (IOError, OSError):
+        pass
+
+    return params
 
 
 def import_raw_property_data(self):
@@ -10,406 +145,512 @@ def import_raw_property_data(self):
     of temperature.  These values come from literature, and they may
     come from experiments or curve fitting in the future.
 
+    Raw data is read from the data file for self.material in
+    data_dir, and fits come from get_fit_params.
+
     """
 
     print "running import_raw_property_data"
 
-    if self.material == "marlow p-type":
-        # added on 10/03/2012
-        # we measured Seebeck coefficient for n and p-type
-        # sigma and k are from literature right now
-        # sigma and k are better performance than actual Marlow
-        poly_deg = 3
-        
-        self.alpha_raw = np.array([[305.88834, 184.4201],
-                                   [315.955, 180.9814],
-                                   [325.96334, 183.9347],
-                                   [335.91166, 187.8893],
-                                   [346.045, 184.0316],
-                                   [356.065, 185.297],
-                                   [365.95001, 188.8359],
-                                   [375.9667, 182.5712],
-                                   [385.95, 187.3913],
-                                   [396.0383, 185.5793],
-                                   [405.9867, 179.1448],
-                                   [415.9667, 178.0592],
-                                   [426.0117, 180.6971],
-                                   [435.995, 170.9204],
-                                   [446.0167, 175.7425],
-                                   [455.95, 165.7763],
-                                   [465.9333, 165.8615],
-                                   [476.0367, 158.0667],
-                                   [485.955, 145.0191],
-                                   [495.885, 144.997],
-                                   [505.9884, 133.7025],
-                                   [515.995, 125.7248],
-                                   [525.9117, 122.7499],
-                                   [535.98, 115.2979],
-                                   [545.935, 105.3918],
-                                   [555.855, 104.7148],
-                                   [565.9833, 101.7378],
-                                   [575.9683, 95.72422]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
+    path = get_data_file(self.material)
+    if path is None:
+        raise IOError(
+            "No raw property data file for '" + self.material + "' in " +
+            data_dir
             )
 
-        self.k_raw = np.array([[299.5228426396, 1.3873417722],
-                          [321.8578680203, 1.3265822785],
-                          [345.5888324873, 1.3164556962],
-                          [369.3197969543, 1.3569620253],
-                          [391.654822335, 1.3873417722],
-                          [416.781725888, 1.4683544304],
-                          [440.512690355, 1.6],
-                          [462.847715736, 1.7620253165],
-                          [474.015228426, 1.8329113924],
-                          [497.746192893, 2.035443038],
-                          [522.873096447, 2.2075949367]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
-            )
+    raw, self.fit = load_raw_property_data(path)
+    self.alpha_raw = raw['alpha']
+    self.k_raw = raw['k']
+    self.sigma_raw = raw['sigma']
 
-        self.sigma_raw = np.array([[299.4305754926, 9.746835443],
-                              [323.4029100874, 8.6835443038],
-                              [344.5312214537, 7.5443037975],
-                              [369.9479968681, 6.7088607595],
-                              [392.5476641, 6.0253164557],
-                              [416.58280047, 5.4936708861],
-                              [440.626908521, 5.0379746835],
-                              [463.271434164, 4.7341772152],
-                              [473.158227848, 4.4303797468],
-                              [497.229250946, 4.2025316456],
-                              [522.744714864, 4.2025316456]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+    params = get_fit_params(raw, self.fit)
+    self.alpha_params = params['alpha']
+    self.k_params = params['k']
+    self.sigma_params = params['sigma']
 
-    if self.material == "marlow n-type":
-        # added on 10/03/2012
-        # we measured Seebeck coefficient for n and p-type
-        # sigma and k are from literature right now
-        # sigma and k are better performance than actual Marlow
-        poly_deg = 3
-
-        self.alpha_raw = np.array([[305.88834, 184.4201],
-                                   [316.02167, -174.2899],
-                                   [325.995, -169.4341],
-                                   [335.97834, -168.759],
-                                   [346.02834, -170.3785],
-                                   [355.98333, -172.1414],
-                                   [365.98334, -174.0112],
-                                   [375.9, -169.3056],
-                                   [385.9517, -171.4511],
-                                   [395.9383, -165.3796],
-                                   [405.905, -163.3501],
-                                   [415.95, -159.9725],
-                                   [425.9117, -161.7775],
-                                   [435.9783, -151.9636],
-                                   [445.9483, -156.6737],
-                                   [455.9667, -146.8893],
-                                   [465.905, -142.9715],
-                                   [475.9833, -135.9831],
-                                   [485.8583, -133.8981],
-                                   [496.005, -130.982],
-                                   [505.8667, -127.4579],
-                                   [515.9284, -121.2369],
-                                   [525.9783, -118.1372],
-                                   [535.915, -109.9285],
-                                   [545.955, -105.78],
-                                   [555.9167, -105.4163],
-                                   [565.905, -100.953],
-                                   [575.9317, -96.50673],
-                                   [575.9384, -97.34524]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
 
-        self.k_raw = np.array([[299.5228426396, 1.3873417722],
-                               [321.8578680203, 1.3265822785],
-                               [345.5888324873, 1.3164556962],
-                               [369.3197969543, 1.3569620253],
-                               [391.654822335, 1.3873417722],
-                               [416.781725888, 1.4683544304],
-                               [440.512690355, 1.6],
-                               [462.847715736, 1.7620253165],
-                               [474.015228426, 1.8329113924],
-                               [497.746192893, 2.035443038],
-                               [522.873096447, 2.2075949367]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
-            )
+class PropertyFit(object):
 
-        self.sigma_raw = np.array([[299.4305754926, 9.746835443],
-                                   [323.4029100874, 8.6835443038],
-                                   [344.5312214537, 7.5443037975],
-                                   [369.9479968681, 6.7088607595],
-                                   [392.5476641, 6.0253164557],
-                                   [416.58280047, 5.4936708861],
-                                   [440.626908521, 5.0379746835],
-                                   [463.271434164, 4.7341772152],
-                                   [473.158227848, 4.4303797468],
-                                   [497.229250946, 4.2025316456],
-                                   [522.744714864, 4.2025316456]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+    """Polynomial property fits for one material.
 
-    if self.material == "BiTe variable n-type":
-        poly_deg = 3
-
-        self.alpha_raw = np.array([[112.301006188, -43.0457272427],
-                              [137.129765223, -53.5256743351],
-                              [156.431574472, -62.2549482734],
-                              [179.857338561, -73.5981860267],
-                              [210.184704048, -87.5634182059],
-                              [239.165761255, -98.9227171808],
-                              [272.270773301, -112.895979971],
-                              [308.195946903, -124.275355473],
-                              [339.954650668, -135.642685058],
-                              [373.158864377, -143.544806084]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
+    Created once per material per process by get_property_fit and
+    shared by every leg of that material.  Coefficient arrays are
+    made read-only so that sharing is safe.
 
-        self.k_raw = np.array([[100, 29.467689848],
-                          [130, 27.8005198844],
-                          [160, 26.4696917156],
-                          [190, 24.9615826351],
-                          [220, 23.1842086837],
-                          [250, 21.0620306825],
-                          [280, 18.4187680451],
-                          [310, 14.8860234335],
-                          [340, 9.7526188408],
-                          [370, 1.6249327924]])
-        self.k_params = np.polyfit(self.k_raw[:, 0], self.k_raw[:, 1], poly_deg)
-
-        self.sigma_raw = np.array([[109.722222222, 64.802436126],
-                              [125, 59.3315508021],
-                              [138.888888889, 52.8995840761],
-                              [158.333333333, 46.7825311943],
-                              [179.166666667, 41.3057040998],
-                              [201.388888889, 36.1482471777],
-                              [229.166666667, 30.3431372549],
-                              [259.722222222, 25.4976232917],
-                              [284.722222222, 22.2623291741],
-                              [309.722222222, 19.3478906714],
-                              [336.111111111, 16.7528223411],
-                              [359.722222222, 15.1232917409],
-                              [376.388888889, 13.8220439691]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+    Methods:
 
-    if self.material == "BiTe variable p-type":
-        # properties trial 2 - need to add a comment
-        poly_deg = 3
-
-        self.alpha_raw = np.array([[112.301006188, 43.0457272427],
-                              [137.129765223, 53.5256743351],
-                              [156.431574472, 62.2549482734],
-                              [179.857338561, 73.5981860267],
-                              [210.184704048, 87.5634182059],
-                              [239.165761255, 98.9227171808],
-                              [272.270773301, 112.895979971],
-                              [308.195946903, 124.275355473],
-                              [339.954650668, 135.642685058],
-                              [373.158864377, 143.544806084]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
+    check_range
+    get_fit_values
+    get_table_derivs
+    get_table_values
+    set_table_error
+    set_tables
 
-        self.k_raw = np.array([[100, 29.467689848],
-                          [130, 27.8005198844],
-                          [160, 26.4696917156],
-                          [190, 24.9615826351],
-                          [220, 23.1842086837],
-                          [250, 21.0620306825],
-                          [280, 18.4187680451],
-                          [310, 14.8860234335],
-                          [340, 9.7526188408],
-                          [370, 1.6249327924]])
-        self.k_params = np.polyfit(self.k_raw[:, 0], self.k_raw[:, 1], poly_deg)
-
-        self.sigma_raw = np.array([[109.722222222, 64.802436126],
-                              [125, 59.3315508021],
-                              [138.888888889, 52.8995840761],
-                              [158.333333333, 46.7825311943],
-                              [179.166666667, 41.3057040998],
-                              [201.388888889, 36.1482471777],
-                              [229.166666667, 30.3431372549],
-                              [259.722222222, 25.4976232917],
-                              [284.722222222, 22.2623291741],
-                              [309.722222222, 19.3478906714],
-                              [336.111111111, 16.7528223411],
-                              [359.722222222, 15.1232917409],
-                              [376.388888889, 13.8220439691]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+    """
 
-    if self.material == "typical BiTe n-type":
-        # Extracted from Bed Poudel et al, Science 320, 634 (2008)
-        # This was the properties used for first trial of validation
-        # process.
-        poly_deg = 3
-
-        self.alpha_raw = np.array([[297.3450032873, -213.717948718],
-                              [321.1747205786, -223.974358974],
-                              [343.6845825115, -227.820512821],
-                              [367.6137409599, -231.025641026],
-                              [391.61522025, -229.102564103],
-                              [414.22452334, -225.897435897],
-                              [439.726660092, -217.564102564],
-                              [462.462524655, -205.384615385],
-                              [472.47896121, -195.128205128],
-                              [496.72452334, -175.897435897],
-                              [522.425542406, -153.46153846]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
+    def __init__(self, material):
 
-        self.k_raw = np.array([[299.5228426396, 1.3873417722],
-                          [321.8578680203, 1.3265822785],
-                          [345.5888324873, 1.3164556962],
-                          [369.3197969543, 1.3569620253],
-                          [391.654822335, 1.3873417722],
-                          [416.781725888, 1.4683544304],
-                          [440.512690355, 1.6],
-                          [462.847715736, 1.7620253165],
-                          [474.015228426, 1.8329113924],
-                          [497.746192893, 2.035443038],
-                          [522.873096447, 2.2075949367]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
-            )
+        """Fits raw data and finds derivative coefficients.
 
-        self.sigma_raw = np.array([[299.4305754926, 9.746835443],
-                              [323.4029100874, 8.6835443038],
-                              [344.5312214537, 7.5443037975],
-                              [369.9479968681, 6.7088607595],
-                              [392.5476641, 6.0253164557],
-                              [416.58280047, 5.4936708861],
-                              [440.626908521, 5.0379746835],
-                              [463.271434164, 4.7341772152],
-                              [473.158227848, 4.4303797468],
-                              [497.229250946, 4.2025316456],
-                              [522.744714864, 4.2025316456]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+        Inputs:
 
-    if self.material == "typical BiTe p-type":
-
-        poly_deg = 3
-        # Extracted from Bed Poudel et al, Science 320, 634 (2008)
-        # This was the properties used for first trial of validation
-        # process.
-        self.alpha_raw = np.array([[297.3450032873, 213.717948718],
-                              [321.1747205786, 223.974358974],
-                              [343.6845825115, 227.820512821],
-                              [367.6137409599, 231.025641026],
-                              [391.61522025, 229.102564103],
-                              [414.22452334, 225.897435897],
-                              [439.726660092, 217.564102564],
-                              [462.462524655, 205.384615385],
-                              [472.47896121, 195.128205128],
-                              [496.72452334, 175.897435897],
-                              [522.425542406, 153.46153846]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
+        material : material name as used by set_TEproperties
 
-        self.k_raw = np.array([[299.5228426396, 1.3873417722],
-                          [321.8578680203, 1.3265822785],
-                          [345.5888324873, 1.3164556962],
-                          [369.3197969543, 1.3569620253],
-                          [391.654822335, 1.3873417722],
-                          [416.781725888, 1.4683544304],
-                          [440.512690355, 1.6],
-                          [462.847715736, 1.7620253165],
-                          [474.015228426, 1.8329113924],
-                          [497.746192893, 2.035443038],
-                          [522.873096447, 2.2075949367]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
-            )
+        Methods:
 
-        self.sigma_raw = np.array([[299.4305754926, 9.746835443],
-                              [323.4029100874, 8.6835443038],
-                              [344.5312214537, 7.5443037975],
-                              [369.9479968681, 6.7088607595],
-                              [392.5476641, 6.0253164557],
-                              [416.58280047, 5.4936708861],
-                              [440.626908521, 5.0379746835],
-                              [463.271434164, 4.7341772152],
-                              [473.158227848, 4.4303797468],
-                              [497.229250946, 4.2025316456],
-                              [522.744714864, 4.2025316456]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
-            )
+        self.set_tables
+        self.set_table_error
 
-    if self.material == "HMS":
-        # Raw data taken from Luo et al. HMS is p-type
-        poly_deg = 3
-        # print "Curve fitting for HMS"
-
-        self.alpha_raw = np.array([[296.89119171, 138.265544041],
-                              [380.829015544, 140.620466321],
-                              [561.139896373, 176.845854922],
-                              [701.03626943, 206.270725389],
-                              [806.735751295, 217.652849741],
-                              [900., 205.769430052]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
-            )
+        """
 
-        self.k_raw = np.array([[300, 2.40620446533],
-                          [485.869565217, 2.20460634548],
-                          [593.47826087, 2.1252173913],
-                          [707.608695652, 2.07168037603],
-                          [815.217391304, 2.09607520564],
-                          [900.0, 2.12944770858]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
-            )
+        self.material = material
+        import_raw_property_data(self)
 
-        self.sigma_raw = np.array([[283.888641142, 6.55346563038],
-                              [396.056571319, 6.22507485507],
-                              [573.510861948, 4.86979996178],
-                              [786.035548194, 3.5398961585],
-                              [856.520354208, 3.34810791871],
-                              [901.20405173, 3.34610116583]])
-        self.sigma_params = np.polyfit(
-            self.sigma_raw[:, 0], self.sigma_raw[:, 1], poly_deg
+        self.alpha_dparams = np.polyder(self.alpha_params)
+        self.k_dparams = np.polyder(self.k_params)
+        self.sigma_dparams = np.polyder(self.sigma_params)
+        self.params = np.vstack(
+            [self.alpha_params, self.k_params, self.sigma_params]
+            )
+        # coefficients of all three fits, one row per property, for
+        # fused evaluation with get_polyvals
+        self.dparams = np.vstack(
+            [self.alpha_dparams, self.k_dparams, self.sigma_dparams]
+            )
+        # derivative coefficients, one row per property
+
+        for params in [
+            self.alpha_params, self.k_params, self.sigma_params,
+            self.alpha_dparams, self.k_dparams, self.sigma_dparams,
+            self.params, self.dparams
+            ]:
+            params.flags.writeable = False
+
+        self.T_raw_min = max(
+            self.alpha_raw[:, 0].min(), self.k_raw[:, 0].min(),
+            self.sigma_raw[:, 0].min()
             )
+        self.T_raw_max = min(
+            self.alpha_raw[:, 0].max(), self.k_raw[:, 0].max(),
+            self.sigma_raw[:, 0].max()
+            )
+        # temperature range (K) covered by raw data for all three
+        # properties
+        self.out_of_range = False
+        # True once properties have been evaluated outside of
+        # T_raw_min to T_raw_max
+        self.T_out_min = np.inf
+        self.T_out_max = -np.inf
+        # lowest and highest temperatures (K) of evaluations that were
+        # out of range
+
+        self.T_table = np.linspace(100., 1500., 2801)
+        # uniform grid of temperatures (K) for property tables.
+        # Outside of it, get_table_values evaluates the fits.
+
+        self.set_tables()
+        self.set_table_error()
+
+    def set_tables(self):
 
-    if self.material == "MgSi":
-        # Raw data comes from Gao et al. MgSi is n-type
-        poly_deg = 2
-        # print "Curve fitting for MgSi"
-
-        self.alpha_raw = np.array([[311.289993567, -111.872146119],
-                              [464.006967001, -141.552511416],
-                              [644.121200709, -184.931506849],
-                              [777.984904831, -207.762557078]])
-        self.alpha_params = np.polyfit(
-            self.alpha_raw[:, 0], self.alpha_raw[:, 1], poly_deg
+        """Tabulates properties and derivatives on self.T_table.
+
+        Sets self.table with shape (3, 3, self.T_table.size).  The
+        first index is the order of the derivative with respect to
+        temperature.  The second index is alpha (V/K), k (W/m-K), and
+        rho (Ohm-m).
+
+        """
+
+        T = self.T_table
+        self.T_table_min = T[0]
+        self.dT_table = T[1] - T[0]
+
+        d2params = np.vstack(
+            [np.polyder(params, 2) for params in self.params]
             )
+        alpha, k, sigma = get_polyvals(self.params, T)
+        dalpha, dk, dsigma = get_polyvals(self.dparams, T)
+        d2alpha, d2k, d2sigma = get_polyvals(d2params, T)
+
+        rho = 1.e-4 / sigma
+        drho = - dsigma / sigma * rho
+        d2rho = (2. * dsigma ** 2. / sigma ** 2. - d2sigma / sigma) * rho
+
+        self.table = np.array([
+            [alpha * 1.e-6, k, rho],
+            [dalpha * 1.e-6, dk, drho],
+            [d2alpha * 1.e-6, d2k, d2rho]
+            ])
+        self.table.flags.writeable = False
+        self.table_rows = [
+            [tuple(row) for row in self.table[order].T]
+            for order in range(3)
+            ]
+        # self.table as lists of (alpha, k, rho) tuples for fast
+        # scalar lookup in get_table_values
+
+    def get_table_values(self, T, interp, order=0):
+
+        """Returns alpha, k, and rho interpolated from self.table.
+
+        Inputs:
+
+        T : temperature (K), scalar or array
+        interp : 'linear' or 'cubic'.  'cubic' is Hermite
+        interpolation using the tabulated derivatives.
+        order : 0 for properties or 1 for their derivatives
+
+        The table interval is found by index arithmetic rather than
+        searching.  Returns an array of shape (3,) + np.shape(T), or
+        a tuple of three floats if T is a scalar, in which case no
+        numpy operations are used for temperatures within
+        self.T_table.  Outside of it, values come from get_fit_values,
+        because extrapolating the end intervals drifts away from the
+        fits, e.g. to negative rho.
+
+        """
+
+        if np.ndim(T) == 0:
+            u = (T - self.T_table_min) / self.dT_table
+            if u < 0. or u > self.T_table.size - 1:
+                return tuple(self.get_fit_values(T, order))
+            i = min(int(u), self.T_table.size - 2)
+            t = u - i
+            rows = self.table_rows[order]
+            y0 = rows[i]
+            y1 = rows[i + 1]
+            if interp == 'linear':
+                return tuple(
+                    y0[j] + t * (y1[j] - y0[j]) for j in range(3)
+                    )
+            rows = self.table_rows[order + 1]
+            h = self.dT_table
+            m0 = rows[i]
+            m1 = rows[i + 1]
+            return tuple(
+                y0[j] + t * (h * m0[j] + t * (
+                    3. * (y1[j] - y0[j]) - h * (2. * m0[j] + m1[j]) + t *
+                    (2. * (y0[j] - y1[j]) + h * (m0[j] + m1[j]))
+                    ))
+                for j in range(3)
+                )
+
+        T = np.asarray(T, dtype=float)
+        u = (T - self.T_table_min) / self.dT_table
+        i = np.clip(u.astype(int), 0, self.T_table.size - 2)
+        t = u - i
+
+        y = self.table[order]
+        y0 = y[:, i]
+        y1 = y[:, i + 1]
+
+        if interp == 'linear':
+            values = y0 + t * (y1 - y0)
+
+        else:
+            m = self.table[order + 1] * self.dT_table
+            m0 = m[:, i]
+            m1 = m[:, i + 1]
+            values = (
+                y0 + t * (m0 + t * (3. * (y1 - y0) - 2. * m0 - m1 + t *
+                (2. * (y0 - y1) + m0 + m1)))
+                )
+
+        outside = (u < 0.) | (u > self.T_table.size - 1)
+        if outside.any():
+            values[:, outside] = self.get_fit_values(T[outside], order)
+
+        return values
+
+    def get_fit_values(self, T, order=0):
+
+        """Returns alpha, k, and rho evaluated from the fits.
+
+        Inputs:
+
+        T : temperature (K), scalar or array
+        order : 0 for properties or 1 for their derivatives
+
+        Returns an array of shape (3,) + np.shape(T) in the units of
+        self.table.  Used by get_table_values outside of
+        self.T_table.
+
+        """
+
+        alpha, k, sigma = get_polyvals(self.params, T)
+        rho = 1.e-4 / sigma
+
+        if order == 0:
+            return np.array([alpha * 1.e-6, k, rho])
+
+        dalpha, dk, dsigma = get_polyvals(self.dparams, T)
+        return np.array([dalpha * 1.e-6, dk, - dsigma / sigma * rho])
+
+    def get_table_derivs(self, T, interp):
+
+        """Returns derivatives of alpha, k, and rho from self.table.
+
+        See get_table_values.
+
+        """
 
-        self.k_raw = np.array([[291.236965464, 2.80871520138],
-                          [472.020791479, 2.62097005644],
-                          [725.982971396, 2.38897924041],
-                          [576.615963519, 2.50282215632]])
-        self.k_params = np.polyfit(
-            self.k_raw[:, 0], self.k_raw[:, 1], poly_deg
+        return self.get_table_values(T, interp, order=1)
+
+    def set_table_error(self):
+
+        """Sets maximum deviation of table interpolation from fits.
+
+        Sets self.table_error, a dict keyed by 'linear' and 'cubic'
+        of arrays holding the maximum deviation of alpha, k, and rho
+        relative to their largest magnitude.  Deviation is checked at
+        ten points per table interval between self.T_raw_min and
+        self.T_raw_max.
+
+        """
+
+        T = np.linspace(
+            self.T_raw_min, self.T_raw_max,
+            10 * int((self.T_raw_max - self.T_raw_min) / self.dT_table) + 1
             )
+        alpha, k, sigma = get_polyvals(self.params, T)
+        exact = np.array([alpha * 1.e-6, k, 1.e-4 / sigma])
+        scale = np.abs(exact).max(axis=1)
+
+        self.table_error = {}
+        for interp in ['linear', 'cubic']:
+            deviation = np.abs(self.get_table_values(T, interp) - exact)
+            self.table_error[interp] = deviation.max(axis=1) / scale
+
+    def check_range(self, T):
+
+        """Flags evaluation outside of the raw data range.
+
+        Prints a warning the first time that this material is
+        evaluated outside of T_raw_min to T_raw_max and keeps track of
+        the extremes in T_out_min and T_out_max.
+
+        Inputs:
+
+        T : temperature (K), scalar or array
+
+        """
+
+        if np.ndim(T) == 0:
+            T_min = T_max = T
+        else:
+            T_min = np.min(T)
+            T_max = np.max(T)
+        if T_min < self.T_raw_min or T_max > self.T_raw_max:
+            if self.out_of_range == False:
+                print (
+                    "Warning: " + self.material + " properties evaluated "
+                    "outside of raw data range " + str(self.T_raw_min) +
+                    " to " + str(self.T_raw_max) + " K"
+                    )
+            self.out_of_range = True
+            if T_min < self.T_raw_min:
+                self.T_out_min = min(self.T_out_min, T_min)
+            if T_max > self.T_raw_max:
+                self.T_out_max = max(self.T_out_max, T_max)
+
+
+try:
+    fit_registry
+except NameError:
+    fit_registry = {}
+    # PropertyFit instances keyed by material name.  Kept through
+    # reload(mat_prop) so that fits are done once per process.
+
+
+def get_property_fit(material):
+
+    """Returns PropertyFit for material, fitting it on first use.
+
+    Inputs:
+
+    material : name of material with polynomial curve fits
+
+    """
+
+    try:
+        return fit_registry[material]
+    except KeyError:
+        fit = PropertyFit(material)
+        fit_registry[material] = fit
+        return fit
+
+
+def get_polyvals(params, T):
+
+    """Evaluates several polynomials of equal degree at once.
+
+    Horner's method is applied to all rows of params in one pass so
+    that the loop over coefficients is shared.
+
+    Inputs:
+
+    params : array of polynomial coefficients, one polynomial per
+    row, highest power first as in np.polyfit
+    T : array of any shape at which to evaluate the polynomials
+
+    Returns an array of shape (params.shape[0],) + T.shape.
+
+    """
+
+    T = np.asarray(T, dtype=float)
+    shape = (params.shape[0],) + (1,) * T.ndim
+    values = np.empty((params.shape[0],) + T.shape)
+    values[...] = params[:, 0].reshape(shape)
+    for i in range(1, params.shape[1]):
+        values *= T
+        values += params[:, i].reshape(shape)
+    return values
+
+
+class PropertyState(object):
+
+    """Holds properties set by the evaluators in property_setters.
+
+    Used by get_properties in place of a Leg.
+
+    """
+
+    def __init__(self, material):
+
+        """Sets material."""
+
+        self.material = material
+
+
+def get_properties(material, T_array, interp=None):
+
+    """Returns TE properties of material without setting attributes.
+
+    Inputs:
+
+    material : any material name handled by set_TEproperties
+    T_array : temperatures (K) of any shape
+    interp : None to evaluate polynomial fits together with
+    get_polyvals, or 'linear' or 'cubic' to interpolate from the
+    fit's uniform grid tables
+
+    Returns alpha (V/K), k (W/m-K), rho (Ohm-m), sigma (S/m), and ZT
+    as arrays with the shape of T_array.
+
+    """
+
+    T = np.asarray(T_array, dtype=float)
+
+    if get_property_setter(material) is set_properties_v_temp:
+        fit = get_property_fit(material)
+        fit.check_range(T)
+        if interp is None:
+            alpha, k, sigma = get_polyvals(fit.params, T)
+            alpha = alpha * 1.e-6
+            sigma = sigma * 1.e4
+            rho = 1. / sigma
+        else:
+            alpha, k, rho = fit.get_table_values(T, interp)
+            sigma = 1. / rho
+
+    else:
+        state = PropertyState(material)
+        get_property_setter(material)(state, T)
+        ones = np.ones(T.shape)
+        alpha = state.alpha * ones
+        k = state.k * ones
+        rho = state.rho * ones
+        sigma = 1. / rho
+
+    ZT = alpha ** 2. * T / (k * rho)
+
+    return alpha, k, rho, sigma, ZT
+
+
+def get_property_ensemble(
+    material, realizations, rel_std=0.05, sampling='perturb', seed=None
+    ):
+
+    """Returns fit coefficients refit to resampled raw data.
+
+    Inputs:
+
+    material : name of material with a raw data file
+    realizations : number of ensemble members
+    rel_std : relative standard deviation of the multiplicative
+    Gaussian noise applied to every raw data value for 'perturb'
+    sampling
+    sampling : 'perturb' to perturb raw values, or 'bootstrap' to
+    resample raw data points with replacement
+    seed : seed for np.random.RandomState
+
+    Returns an array of shape (3, realizations, degree + 1) with the
+    same rows and units as PropertyFit.params.  Perturbed data are
+    refit for all realizations at once with a single np.polyfit call
+    per property.  Bootstrap samples without enough distinct
+    temperatures for the fit degree are redrawn.
+
+    """
+
+    fit = get_property_fit(material)
+    poly_deg = fit.alpha_params.size - 1
+    random = np.random.RandomState(seed)
+
+    params = np.empty((3, realizations, poly_deg + 1))
+    for row, raw in enumerate([fit.alpha_raw, fit.k_raw, fit.sigma_raw]):
+        if sampling == 'perturb':
+            values = raw[:, 1:2] * (
+                1. + rel_std * random.standard_normal(
+                    (raw.shape[0], realizations)
+                    )
+                )
+            params[row] = np.polyfit(raw[:, 0], values, poly_deg).T
+
+        elif sampling == 'bootstrap':
+            for i in range(realizations):
+                sample = random.randint(raw.shape[0], size=raw.shape[0])
+                while np.unique(raw[sample, 0]).size <= poly_deg:
+                    sample = random.randint(raw.shape[0], size=raw.shape[0])
+                params[row, i] = np.polyfit(
+                    raw[sample, 0], raw[sample, 1], poly_deg
+                    )
+
+        else:
+            raise ValueError("Unknown sampling '" + sampling + "'")
+
+    return params
 
-        self.sigma_raw = np.array([[307.385007162, 13.156135604],
-                              [456.638548464, 9.79627566449],
-                              [574.442145472, 8.21502466974],
-                              [722.524271845, 7.17849753303]])
-        self.sigma_params = np.polyfit(self.sigma_raw[:, 0], self.sigma_raw[:, 1],
-                              poly_deg)
+
+def set_ensemble_properties(self, T_props):
+
+    """Sets properties from per-leg fit coefficients.
+
+    Used by leg.BatchLeg in place of set_TEproperties when
+    self.ensemble_params, from get_property_ensemble, is set.  Leg j
+    uses coefficients self.ensemble_params[:, j].
+
+    Inputs:
+
+    T_props : temperature (K) of each leg
+
+    """
+
+    params = self.ensemble_params
+    values = params[:, :, 0] * np.ones(np.shape(T_props))
+    for i in range(1, params.shape[2]):
+        values = values * T_props + params[:, :, i]
+
+    self.T_props = T_props
+    self.alpha = values[0] * 1.e-6
+    # Seebeck coefficient (V/K)
+    self.k = values[1]
+    # thermal conductivity (W/m-K)
+    self.sigma = values[2] * 1.e4
+    # electrical conductivity (S/m)
+    self.rho = 1. / self.sigma
+    # electrical resistivity (Ohm-m)
 
 
 def set_properties_v_temp(self, T_props):
@@ -418,7 +659,10 @@ def set_properties_v_temp(self, T_props):
 
     Used by set_TEproperties to set the temperature-dependent
     properties of materials for which polynomial curve fits have been
-    done.
+    done.  Fits come from get_property_fit so they are only done once
+    per material.  If self.property_interp is 'linear' or 'cubic',
+    properties are interpolated from the fit's uniform grid tables
+    rather than evaluated with np.polyval.
 
     This may need to changed to spline fitting at some point for a
     more accurate fit.
@@ -428,178 +672,392 @@ def set_properties_v_temp(self, T_props):
     T_props : temperature (K) at which properties are to be evaluated
 
     """
-    try:
-        self.alpha_params
-    except AttributeError:
-        self.import_raw_property_data()
-    self.alpha = (np.polyval(self.alpha_params, T_props) * 1.e-6)
+
+    fit = get_property_fit(self.material)
+    fit.check_range(T_props)
+
+    if self.property_interp is None:
+        self.alpha = (np.polyval(fit.alpha_params, T_props) * 1.e-6)
+        # Seebeck coefficient (V/K)
+        self.k = np.polyval(fit.k_params, T_props)
+        # thermal conductivity (W/m-K)
+        self.sigma = np.polyval(fit.sigma_params, T_props) * 1.e4
+        # electrical conductivity (S/m)
+        self.rho = 1. / self.sigma
+        # electrical resistivity (Ohm-m)
+
+    else:
+        self.alpha, self.k, self.rho = (
+            fit.get_table_values(T_props, self.property_interp)
+            )
+        self.sigma = 1. / self.rho
+
+
+def set_property_derivs_v_temp(self, T_props):
+
+    """Sets temperature derivatives of polynomial fit properties.
+
+    Used by set_TEproperty_derivs for materials with polynomial curve
+    fits.  Derivative coefficients come from get_property_fit.
+
+    Inputs:
+
+    T_props : temperature (K) at which derivatives are to be evaluated
+
+    """
+
+    fit = get_property_fit(self.material)
+
+    if self.property_interp is None:
+        self.dalpha_dT = np.polyval(fit.alpha_dparams, T_props) * 1.e-6
+        # (V/K^2)
+        self.dk_dT = np.polyval(fit.k_dparams, T_props)
+        # (W/m-K^2)
+        sigma = np.polyval(fit.sigma_params, T_props) * 1.e4
+        dsigma_dT = np.polyval(fit.sigma_dparams, T_props) * 1.e4
+        self.drho_dT = - dsigma_dT / sigma ** 2.
+        # (Ohm-m/K)
+
+    else:
+        self.dalpha_dT, self.dk_dT, self.drho_dT = (
+            fit.get_table_derivs(T_props, self.property_interp)
+            )
+
+
+# Materials with properties that are dependent on temperature by some
+# convenient function, from CRC TE Handbook Table 12.1
+
+def set_ex1_n_properties(self, T_props):
+    """Sets properties of 'ex1 n-type'."""
+    self.k = 54. / T_props * 100.
+    # thermal conductivity (W/m-K)
+    self.alpha = (0.268 * T_props - 329.) * 1.e-6
     # Seebeck coefficient (V/K)
-    self.k = np.polyval(self.k_params, T_props)
+    self.sigma = (T_props - 310.) / 0.1746
+    # electrical conductivity (S/cm)
+    self.rho = 1. / self.sigma / 100.
+    # electrical resistivity (Ohm-m)
+
+
+def set_ex1_p_properties(self, T_props):
+    """Sets properties of 'ex1 p-type'."""
+    self.k = 3.194 / T_props * 100.
     # thermal conductivity (W/m-K)
-    self.sigma = np.polyval(self.sigma_params, T_props) * 1.e4
-    # electrical conductivity (S/m)
-    self.rho = 1. / self.sigma
+    self.alpha = (0.150 * T_props + 211.) * 1.e-6
+    # Seebeck coefficient (V/K)
+    self.sigma = 25.
+    # electrical conductivity (S/cm)
+    self.rho = 1. / self.sigma / 100.
     # electrical resistivity (Ohm-m)
 
 
-def set_TEproperties(self, T_props):
+def set_ex2_n_properties(self, T_props):
+    """Sets properties of 'ex2 n-type'."""
+    self.k = 3. / T_props * 100.
+    # thermal conductivity (W/m-K)
+    self.alpha = (0.20 * T_props - 400.) * 1.e-6
+    # Seebeck coefficient (V/K)
+    self.sigma = 1.e5 / T_props
+    # electrical conductivity (S/cm)
+    self.rho = 1. / self.sigma / 100.
+    # electrical resistivity (Ohm-m)
 
-    """Sets TE properties
+
+def set_ex2_p_properties(self, T_props):
+    """Sets properties of 'ex2 p-type' and 'ex3 p-type'."""
+    self.k = 10. / T_props * 100.
+    # thermal conductivity (W/m-K)
+    self.alpha = (200.) * 1.e-6
+    # Seebeck coefficient (V/K)
+    self.sigma = T_props
+    # electrical conductivity (S/cm)
+    self.rho = 1. / self.sigma / 100.
+    # electrical resistivity (Ohm-m)
+
+
+def set_ex3_n_properties(self, T_props):
+    """Sets properties of 'ex3 n-type'."""
+    self.k = 3. / T_props * 100.
+    # thermal conductivity (W/m-K)
+    self.alpha = 0.20 * T_props * 1.e-6
+    # Seebeck coefficient (V/K)
+    self.sigma = 1000.
+    # electrical conductivity (S/cm)
+    self.rho = 1. / self.sigma / 100.
+    # electrical resistivity (Ohm-m)
+
+
+def set_ex1_n_property_derivs(self, T_props):
+    """Sets property derivatives of 'ex1 n-type'."""
+    self.dk_dT = - 54. / T_props ** 2. * 100.
+    self.dalpha_dT = 0.268 * 1.e-6
+    sigma = (T_props - 310.) / 0.1746
+    self.drho_dT = - 1. / 0.1746 / sigma ** 2. / 100.
+
+
+def set_ex1_p_property_derivs(self, T_props):
+    """Sets property derivatives of 'ex1 p-type'."""
+    self.dk_dT = - 3.194 / T_props ** 2. * 100.
+    self.dalpha_dT = 0.150 * 1.e-6
+    self.drho_dT = 0.
+
+
+def set_ex2_n_property_derivs(self, T_props):
+    """Sets property derivatives of 'ex2 n-type'."""
+    self.dk_dT = - 3. / T_props ** 2. * 100.
+    self.dalpha_dT = 0.20 * 1.e-6
+    self.drho_dT = 1.e-5 / 100.
+
+
+def set_ex2_p_property_derivs(self, T_props):
+    """Sets property derivatives of 'ex2 p-type' and 'ex3 p-type'."""
+    self.dk_dT = - 10. / T_props ** 2. * 100.
+    self.dalpha_dT = 0.
+    self.drho_dT = - 1. / T_props ** 2. / 100.
+
+
+def set_ex3_n_property_derivs(self, T_props):
+    """Sets property derivatives of 'ex3 n-type'."""
+    self.dk_dT = - 3. / T_props ** 2. * 100.
+    self.dalpha_dT = 0.20 * 1.e-6
+    self.drho_dT = 0.
+
+
+constant_properties = {
+    # From CRC TE Handbook Table 27.7
+    'constant BiTe n-type': (1.5, -206.e-6, 8.89 * 1.e-6),
+    'constant BiTe p-type': (1.5, 206.e-6, 8.89 * 1.e-6),
+    # Alumina with pure conduction.  k needs to be updated to what it
+    # actually is and rho is a dummy value.
+    'alumina': (1.5, 1.e-9, 1.),
+    # Direct contact between hot and cold side.  k is really high so
+    # that resistance is zero.
+    'none': (1.e9, 1.e-9, 1.)
+    }
+# (thermal conductivity (W/m-K), Seebeck coefficient (V/K), electrical
+# resistivity (Ohm-m)) for materials with constant properties
+
+
+def set_constant_properties(self, T_props):
+    """Sets properties of materials in constant_properties."""
+    self.k, self.alpha, self.rho = constant_properties[self.material]
+
+
+def set_constant_property_derivs(self, T_props):
+    """Sets zero property derivatives."""
+    self.dk_dT = 0.
+    self.dalpha_dT = 0.
+    self.drho_dT = 0.
+
+
+poly_materials = []
+# materials with polynomial curve fits from data files, added by
+# get_property_setter as they are first used
+
+property_setters = dict(
+    (material, set_constant_properties) for material in constant_properties
+    )
+property_setters.update({
+    'ex1 n-type': set_ex1_n_properties,
+    'ex1 p-type': set_ex1_p_properties,
+    'ex2 n-type': set_ex2_n_properties,
+    'ex2 p-type': set_ex2_p_properties,
+    'ex3 n-type': set_ex3_n_properties,
+    'ex3 p-type': set_ex2_p_properties
+    })
+# evaluators used by set_TEproperties, keyed by material name.
+# Materials with data files are added by get_property_setter.
+
+property_deriv_setters = {
+    'ex1 n-type': set_ex1_n_property_derivs,
+    'ex1 p-type': set_ex1_p_property_derivs,
+    'ex2 n-type': set_ex2_n_property_derivs,
+    'ex2 p-type': set_ex2_p_property_derivs,
+    'ex3 n-type': set_ex3_n_property_derivs,
+    'ex3 p-type': set_ex2_p_property_derivs
+    }
+# evaluators used by set_TEproperty_derivs, keyed by material name.
+# Materials not listed have constant properties.
+
+
+def get_property_setter(material):
+
+    """Returns the evaluator in property_setters for material.
+
+    A material that is not yet in property_setters but has a data
+    file in data_dir is added to poly_materials, property_setters,
+    and property_deriv_setters.  Only the existence of the file is
+    checked here.  It is read when the material's fit is first
+    needed.
 
     Inputs:
 
-    T_props : temperature (K) at which properties are to be evaluated
+    material : material name
 
-    This method exists to separater materials with constant properties
-    from materials with temperature dependent properties.  It uses
-    set_properties_v_temp for the latter type of materials.  
+    """
+
+    try:
+        return property_setters[material]
+    except KeyError:
+        if get_data_file(material) is None:
+            raise KeyError(
+                "Unknown material '" + material + "' with no data file in "
+                + data_dir
+                )
+        poly_materials.append(material)
+        property_setters[material] = set_properties_v_temp
+        property_deriv_setters[material] = set_property_derivs_v_temp
+        return set_properties_v_temp
+
+
+def get_materials():
+
+    """Returns sorted names of all materials known to mat_prop.
+
+    Includes materials with data files in data_dir that have not been
+    used yet.
 
     """
 
-    self.T_props = T_props
+    materials = set(property_setters)
+    if os.path.isdir(data_dir):
+        for name in os.listdir(data_dir):
+            root, extension = os.path.splitext(name)
+            if extension in ['.csv', '.npz']:
+                materials.add(root)
+    return sorted(materials)
 
-    # Materials with tabulated properties
-    if self.material == 'HMS':
-        self.set_properties_v_temp(T_props)
 
-    elif self.material == 'MgSi':
-        self.set_properties_v_temp(T_props)
+def print_table_errors():
 
-    elif self.material == 'BiTe variable n-type':
-        self.set_properties_v_temp(T_props)
+    """Prints maximum table interpolation error of fitted materials.
 
-    elif self.material == 'BiTe variable p-type':
-        self.set_properties_v_temp(T_props)
+    Errors are relative deviations from the polynomial fits, as set
+    by PropertyFit.set_table_error, for every material in
+    fit_registry.
 
-    elif self.material == 'typical BiTe n-type':
-        self.set_properties_v_temp(T_props)
+    """
 
-    elif self.material == 'typical BiTe p-type':
-        self.set_properties_v_temp(T_props)
+    for material in sorted(fit_registry):
+        fit = fit_registry[material]
+        print material, "(" + str(fit.T_raw_min), "to", str(fit.T_raw_max), "K)"
+        for interp in ['linear', 'cubic']:
+            print "  ", interp, "alpha, k, rho:", fit.table_error[interp]
+        if fit.out_of_range == True:
+            print "   evaluated out of range from", fit.T_out_min, "to", fit.T_out_max, "K"
 
-    elif self.material == 'marlow p-type':
-        self.set_properties_v_temp(T_props)
 
-    elif self.material == 'marlow n-type':
-        self.set_properties_v_temp(T_props)
+def set_TEproperty_derivs(self, T_props):
 
-    # Material properties for validation trial. These properties are
-    # for typical BiTe materials at 423 K. The properties for a range
-    # of temperature are given above as a poly curve.
-    elif self.material == 'BiTe variable n-type':
-        self.k = 1.54  # Thermal conductivity (W/m-K)
-        self.alpha = -150.e-6  # Seebeck coefficient (V/K)
-        # I made this negative even though it's for a p-type
-        # material.  This is just for a hypothetical model.
-        self.rho = 9.0909 * 1.e-6
-        # electrical resistivity (Ohm-m)
+    """Sets temperature derivatives of TE properties
 
-    elif self.material == 'BiTe variable p-type':
-        self.k = 1.54  # Thermal conductivity (W/m-K)
-        self.alpha = 150.e-6  # Seebeck coefficient (V/K)
-        self.rho = 9.0909 * 1.e-6
-        # electrical resistivity (Ohm-m)
+    Inputs:
 
-    # Materials with properties that are either constant or dependent
-    # on temperature by some convenient function.
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex1 n-type':
-        self.k = 54. / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = (0.268 * T_props - 329.) * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = (T_props - 310.) / 0.1746
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
+    T_props : temperature (K) at which derivatives are to be evaluated
 
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex1 p-type':
-        self.k = 3.194 / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = (0.150 * T_props + 211.) * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = 25.
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
+    Sets self.dalpha_dT, self.dk_dT, and self.drho_dT for every
+    material handled by set_TEproperties.  Materials with constant
+    properties get derivatives of zero.
 
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex2 n-type':
-        self.k = 3. / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = (0.20 * T_props - 400.) * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = 1.e5 / T_props
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
+    """
 
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex2 p-type':
-        self.k = 10. / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = (200.) * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = T_props
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
+    try:
+        setter = property_deriv_setters[self.material]
+    except KeyError:
+        get_property_setter(self.material)
+        setter = property_deriv_setters.get(
+            self.material, set_constant_property_derivs
+            )
+    setter(self, T_props)
 
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex3 n-type':
-        self.k = 3. / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = 0.20 * T_props * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = 1000.
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
 
-    # from CRC TE Handbook Table 12.1
-    elif self.material == 'ex3 p-type':
-        self.k = 10. / T_props * 100.
-        # thermal conductivity (W/m-K)
-        self.alpha = 200. * 1.e-6
-        # Seebeck coefficient (V/K)
-        self.sigma = T_props
-        # electrical conductivity (S/cm)
-        self.rho = 1. / self.sigma / 100.
-        # electrical resistivity (Ohm-m)
+def get_property_integrals_key(self):
 
-    # From CRC TE Handbook Table 27.7
-    elif self.material == 'constant BiTe n-type':
-        self.k = 1.5  # Thermal conductivity (W/m-K)
-        self.alpha = -206.e-6  # Seebeck coefficient (V/K)
-        # I made this negative even though it's for a p-type
-        # material.  This is just for a hypothetical model.
-        self.rho = 8.89 * 1.e-6
-        # electrical resistivity (Ohm-m)
+    """Returns settings that the property integrals of self depend on.
 
-    # From CRC TE Handbook Table 27.7
-    elif self.material == 'constant BiTe p-type':
-        self.k = 1.5  # Thermal conductivity (W/m-K)
-        self.alpha = 206.e-6  # Seebeck coefficient (V/K)
-        self.rho = 8.89 * 1.e-6
-        # electrical resistivity (Ohm-m)
+    Returns a tuple of self.material, self.property_interp, self.T_int
+    as a tuple, or None, and the PropertyFit of the material, or None
+    for materials without fits.  set_property_integrals stores it in
+    self.int_key, and Leg.solve_leg_kirchhoff rebuilds the tables
+    when it changes.
 
-    # Alumina with pure conduction
-    elif self.material == 'alumina':
-        self.k = 1.5  # Thermal conductivity (W/m-K) this needs to be
-                     # updated to what it actually is
-        self.alpha = 1.e-9  # Seebeck coefficient (V/K)
-        # I made this negative even though it's for a p-type
-        # material.  This is just for a hypothetical model.
-        self.rho = 1.
-        # dummy value since I don't know what it
-        # actually is and it doesn't matter.
-        # electrical resistivity (Ohm-m)
+    """
+
+    fit = None
+    if get_property_setter(self.material) is set_properties_v_temp:
+        fit = get_property_fit(self.material)
+
+    T_int = self.T_int
+    if T_int is not None:
+        T_int = tuple(np.asarray(T_int, dtype=float))
+
+    return (self.material, self.property_interp, T_int, fit)
+
+
+def set_property_integrals(self):
+
+    """Sets cumulative temperature integrals of TE properties.
+
+    Used by Leg.solve_leg_kirchhoff.  Integrals are tabulated with
+    the trapezoid rule on self.T_int, or, if it is
+    None, on PropertyFit.T_table for fitted materials and 100 to 1500
+    K otherwise.  They start from the first temperature and are later
+    evaluated by linear interpolation.
+
+    Sets:
+
+    self.T_int_table : temperatures (K) of the tables
+    self.k_int : integral of k dT (W/m)
+    self.alpha_int : integral of alpha dT (V)
+    self.rho_int : integral of rho dT (Ohm-m-K)
+    self.rhoT_int : integral of rho T dT (Ohm-m-K^2)
+    self.alphaT_int : integral of alpha T dT (V-K)
+    self.alpha_int2 : integral of self.alpha_int dT (V-K)
+    self.int_key : get_property_integrals_key at tabulation
+
+    """
+
+    T_int = self.T_int
+    if T_int is None:
+        if get_property_setter(self.material) is set_properties_v_temp:
+            T_int = get_property_fit(self.material).T_table
+        else:
+            T_int = np.linspace(100., 1500., 2801)
+    self.T_int_table = T_int
+
+    self.set_TEproperties(T_int)
+    k = self.k * np.ones(T_int.size)
+    alpha = self.alpha * np.ones(T_int.size)
+    rho = self.rho * np.ones(T_int.size)
 
-    # Direct contact between hot and cold side
-    elif self.material == 'none':
-        self.k = 1.e9  # really high thermal condutivity (W/m-K) so
-                      # that resistance is zero
-        self.alpha = 1.e-9  # dummy value
-        self.rho = 1.
-        # dummy value
+    self.k_int = cumtrapz(k, T_int, initial=0.)
+    self.alpha_int = cumtrapz(alpha, T_int, initial=0.)
+    self.rho_int = cumtrapz(rho, T_int, initial=0.)
+    self.rhoT_int = cumtrapz(rho * T_int, T_int, initial=0.)
+    self.alphaT_int = cumtrapz(alpha * T_int, T_int, initial=0.)
+    self.alpha_int2 = cumtrapz(self.alpha_int, T_int, initial=0.)
+
+    self.int_key = self.get_property_integrals_key()
+
+
+def set_TEproperties(self, T_props):
+
+    """Sets TE properties
+
+    Inputs:
+
+    T_props : temperature (K) at which properties are to be evaluated
+
+    This method exists to separater materials with constant properties
+    from materials with temperature dependent properties.  It looks up
+    the evaluator for self.material in property_setters, which uses
+    set_properties_v_temp for the latter type of materials.
+
+    """
+
+    self.T_props = T_props
+    try:
+        setter = property_setters[self.material]
+    except KeyError:
+        setter = get_property_setter(self.material)
+    setter(self, T_props)
@@ -0,0 +1,251 @@
+"""Contains PairScreen class for screening N/P material pairs."""
+
+# Distribution modules
+
+import numpy as np
+
+# User defined modules
+import mat_prop
+reload(mat_prop)
+
+
+class PairScreen(object):
+
+    """Class for ranking n-type / p-type material pairs.
+
+    Every n-type x p-type combination of registered materials is
+    evaluated over a grid of hot and cold side temperatures in one
+    broadcast computation.  Properties are evaluated at the average
+    temperature, as in TE_Pair.set_eta_max.
+
+    Methods:
+
+    __init__
+    print_table
+    screen
+    set_materials
+    set_properties
+    set_table
+
+    """
+
+    def __init__(self):
+
+        """Sets default temperature grids and ranking."""
+
+        self.T_h = np.linspace(500., 800., 7)
+        # hot side temperatures (K)
+        self.T_c = np.linspace(300., 400., 3)
+        # cold side temperatures (K)
+        self.n_materials = None
+        self.p_materials = None
+        # lists of n-type and p-type material names.  If None, all
+        # materials from mat_prop.get_materials are sorted by the sign
+        # of their Seebeck coefficient.
+        self.alpha_min = 1.e-6
+        # materials with smaller Seebeck coefficient magnitude (V/K),
+        # e.g. 'alumina' and 'none', are left out of the screening
+        self.rank_by = 'eta_max'
+        # column by which the table is ranked, highest first
+
+    def set_materials(self):
+
+        """Sets n-type and p-type material lists.
+
+        Sets self.n_materials and self.p_materials from
+        mat_prop.get_materials, unless they were already set.
+        Materials are classified by the sign of their Seebeck
+        coefficient at the mean grid temperature.
+
+        """
+
+        if self.n_materials is not None and self.p_materials is not None:
+            return
+
+        T_mean = 0.5 * (self.T_h.mean() + self.T_c.mean())
+        n_materials = []
+        p_materials = []
+        for material in mat_prop.get_materials():
+            alpha = mat_prop.get_properties(material, T_mean)[0]
+            if alpha < -self.alpha_min:
+                n_materials.append(material)
+            elif alpha > self.alpha_min:
+                p_materials.append(material)
+
+        if self.n_materials is None:
+            self.n_materials = n_materials
+        if self.p_materials is None:
+            self.p_materials = p_materials
+
+    def set_properties(self):
+
+        """Sets property arrays for all materials on the grid.
+
+        self.T_props has shape (T_h.size, T_c.size).  Property arrays
+        such as self.alpha_n and self.k_p have shape
+        (n materials, 1, T_h.size, T_c.size) and
+        (1, p materials, T_h.size, T_c.size) so that they broadcast
+        over all pairs.
+
+        self.in_range_n and self.in_range_p are True for materials
+        whose raw data cover every evaluated temperature.
+
+        """
+
+        self.T_props = 0.5 * (self.T_h[:, np.newaxis] + self.T_c)
+
+        for leg_type, materials in [
+            ('n', self.n_materials), ('p', self.p_materials)
+            ]:
+            props = np.array(
+                [mat_prop.get_properties(material, self.T_props)[:3]
+                 for material in materials]
+                )
+            # shape (materials, 3, T_h.size, T_c.size)
+            if leg_type == 'n':
+                props = props[:, np.newaxis]
+            else:
+                props = props[np.newaxis]
+            alpha, k, rho = np.rollaxis(props, -3)
+            setattr(self, 'alpha_' + leg_type, alpha)
+            setattr(self, 'k_' + leg_type, k)
+            setattr(self, 'rho_' + leg_type, rho)
+
+            in_range = np.ones(len(materials), dtype=bool)
+            for i, material in enumerate(materials):
+                if material in mat_prop.poly_materials:
+                    fit = mat_prop.get_property_fit(material)
+                    in_range[i] = (
+                        self.T_props.min() >= fit.T_raw_min and
+                        self.T_props.max() <= fit.T_raw_max
+                        )
+            setattr(self, 'in_range_' + leg_type, in_range)
+
+    def screen(self):
+
+        """Evaluates all pairs on the temperature grid.
+
+        Methods:
+
+        self.set_materials
+        self.set_properties
+        self.set_table
+
+        Sets arrays of shape (n materials, p materials, T_h.size,
+        T_c.size):
+
+        self.ZT : pair figure of merit as in TE_Pair.set_ZT
+        self.eta_max : maximum efficiency as in TE_Pair.set_eta_max
+        self.A_opt : Ntype / Ptype area ratio for max efficiency as
+        in TE_Pair.set_A_opt
+        self.power_factor : (alpha_p - alpha_n) ** 2 / (rho_p + rho_n)
+        (W/m-K^2), which sets maximum power for legs of equal
+        geometry
+
+        Grid points with T_c >= T_h are nan.
+
+        """
+
+        self.set_materials()
+        self.set_properties()
+
+        delta_T = self.T_h[:, np.newaxis] - self.T_c
+        delta_T = np.where(delta_T > 0., delta_T, np.nan)
+        T_h = self.T_h[:, np.newaxis]
+        delta_alpha = self.alpha_p - self.alpha_n
+
+        with np.errstate(invalid='ignore'):
+            self.ZT = (
+                (delta_alpha / (np.sqrt(self.rho_p * self.k_p) +
+                np.sqrt(self.rho_n * self.k_n))) ** 2. * self.T_props
+                )
+            root = np.sqrt(1. + self.ZT)
+            self.eta_max = (
+                delta_T / T_h * (root - 1.) / (root + (T_h - delta_T) /
+                T_h)
+                )
+            self.A_opt = np.sqrt(
+                self.rho_n * self.k_p / (self.rho_p * self.k_n)
+                )
+        self.power_factor = delta_alpha ** 2. / (self.rho_p + self.rho_n)
+
+        invalid = np.isnan(delta_T)
+        self.ZT = np.where(invalid, np.nan, self.ZT)
+        self.A_opt = np.where(invalid, np.nan, self.A_opt)
+        self.power_factor = np.where(invalid, np.nan, self.power_factor)
+
+        self.set_table()
+
+    def set_table(self):
+
+        """Sets self.table, a ranked record array with one row per pair.
+
+        Columns are the n and p material names, the mean over the
+        temperature grid of ZT, eta_max, A_opt, and power_factor, the
+        highest eta_max with the T_h and T_c (K) at which it occurs,
+        and in_range, which is False if either material was evaluated
+        outside of its raw data range.  Rows are sorted by
+        self.rank_by, highest first, with nan last.
+
+        """
+
+        n_count = len(self.n_materials)
+        p_count = len(self.p_materials)
+        grid = self.eta_max.reshape(n_count, p_count, -1)
+        with np.errstate(invalid='ignore'):
+            best = np.nanargmax(
+                np.where(np.isnan(grid), -np.inf, grid), axis=-1
+                )
+        i_h, i_c = np.unravel_index(best, self.eta_max.shape[2:])
+
+        def mean(values):
+            values = values.reshape(n_count, p_count, -1)
+            count = (~np.isnan(values)).sum(axis=-1)
+            return np.where(
+                count > 0, np.nansum(values, axis=-1) / np.maximum(count, 1),
+                np.nan
+                )
+
+        columns = [
+            ('n', np.repeat(self.n_materials, p_count)),
+            ('p', np.tile(self.p_materials, n_count)),
+            ('ZT', mean(self.ZT)),
+            ('eta_max', mean(self.eta_max)),
+            ('A_opt', mean(self.A_opt)),
+            ('power_factor', mean(self.power_factor)),
+            ('eta_peak', np.take_along_axis(grid, best[..., np.newaxis], -1)),
+            ('T_h', self.T_h[i_h]),
+            ('T_c', self.T_c[i_c]),
+            ('in_range', self.in_range_n[:, np.newaxis] & self.in_range_p)
+            ]
+        table = np.rec.fromarrays(
+            [np.ravel(values) for name, values in columns],
+            names=[name for name, values in columns]
+            )
+        key = np.where(
+            np.isnan(table[self.rank_by]), -np.inf, table[self.rank_by]
+            )
+        self.table = table[np.argsort(-key, kind='mergesort')]
+
+    def print_table(self, rows=None):
+
+        """Prints the ranked table.
+
+        Inputs:
+
+        rows : number of rows to print.  All rows if None.
+
+        """
+
+        print (
+            "%-22s %-22s %6s %8s %6s %12s %8s %6s %6s %s" %
+            ('n-type', 'p-type', 'ZT', 'eta_max', 'A_opt',
+             'PF (W/m-K^2)', 'eta_pk', 'T_h', 'T_c', 'in range')
+            )
+        for row in self.table[:rows]:
+            print (
+                "%-22s %-22s %6.3f %8.4f %6.3f %12.4e %8.4f %6.0f %6.0f %s" %
+                (row.n, row.p, row.ZT, row.eta_max, row.A_opt,
+                 row.power_factor, row.eta_peak, row.T_h, row.T_c,
+                 row.in_range)
+                )
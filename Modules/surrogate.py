@@ -0,0 +1,425 @@
+"""Contains PairSurrogate class for interpolating TE pair solutions."""
+
+# Distribution modules
+
+import numpy as np
+import time
+
+# User defined modules
+import te_pair
+reload(te_pair)
+
+
+def get_halton(samples, dims):
+
+    """Returns Halton sequence points in the unit hypercube.
+
+    Inputs:
+
+    samples : number of points
+    dims : number of dimensions, at most 12
+
+    Returns an array with shape (samples, dims).  The first point of
+    the sequence, which lies on the origin, is skipped.
+
+    """
+
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37][:dims]
+    points = np.zeros([samples, dims])
+
+    for j, base in enumerate(primes):
+        for i in range(samples):
+            n = i + 1
+            f = 1.
+            while n > 0:
+                f = f / base
+                points[i, j] += f * (n % base)
+                n = n // base
+
+    return points
+
+
+class PairSurrogate(object):
+
+    """Class for an offline surrogate of te_pair.TE_Pair.solve_te_pair.
+
+    Exact pair solutions for one n-type / p-type material pair are
+    sampled on a Halton sequence over the box self.bounds of the
+    inputs in self.inputs and interpolated with cubic radial basis
+    functions plus a linear polynomial.  The leave-one-out error of
+    every training point is found in closed form (Rippa 1999) from
+    the same linear system and serves as the error estimate of
+    queries near that point.
+
+    Current enters as the P-type current density, J = I /
+    Ptype.area, and power as the power flux, P_flux, so a surrogate
+    applies to any P-type leg area.  Settings of the pair that are
+    not inputs, e.g. method or leg segments, are stored by build in
+    self.config, and the surrogate applies only to pairs with the
+    same settings.
+
+    Methods:
+
+    __init__
+    build
+    fit
+    get_config
+    get_inputs
+    load
+    query
+    save
+    set_te_pair_values
+
+    """
+
+    def __init__(self):
+
+        """Sets defaults."""
+
+        self.inputs = [
+            'T_h_conv', 'T_c_conv', 'U_hot', 'U_cold', 'J', 'length',
+            'fill_fraction', 'leg_area_ratio'
+            ]
+        # names of surrogate inputs.  J is Ptype.J (A/m^2) and the
+        # rest are te_pair.TE_Pair attributes.
+        self.outputs = [
+            'q_h', 'q_c', 'T_h', 'T_c', 'P_flux', 'eta', 'Ntype_q_h',
+            'Ptype_q_h'
+            ]
+        # names of surrogate outputs.  Ntype_q_h and Ptype_q_h (W/m^2)
+        # are the leg hot side heat fluxes, needed by hx.HX.warm_start.
+        self.bounds = np.array([
+            [500., 900.],
+            [280., 380.],
+            [0.1, 2.],
+            [2., 10.],
+            [1.e5, 5.e6],
+            [1.e-4, 2.e-3],
+            [0.01, 0.1],
+            [0.5, 2.]
+            ])
+        # lower and upper bound of each input
+        self.samples = 1000
+        # number of exact pair solutions used by build
+        self.neighbors = 4
+        # number of nearest training points whose largest
+        # leave-one-out error is the error estimate of a query
+        self.tol = 1.e-3
+        # largest error estimate, relative to the training range of
+        # each output, for which set_te_pair_values uses the surrogate
+        self.Ntype_material = 'MgSi'
+        self.Ptype_material = 'HMS'
+        self.config_names = [
+            'method', 'integrator', 'property_interp', 'nodes'
+            ] + [
+            leg_name + '.' + name for leg_name in ['Ntype', 'Ptype']
+            for name in [
+                'material', 'segments', 'R_interface', 'rho_interface',
+                'interface_thickness'
+                ]
+            ]
+        # names of te_pair.TE_Pair.get_settings entries that are
+        # fixed during training
+        self.config = None
+        # training values of self.config_names, set by build.  If
+        # None, set_te_pair_values never uses the surrogate.
+
+    def get_config(self, pair):
+
+        """Returns training configuration of a te_pair.TE_Pair instance.
+
+        Inputs:
+
+        pair : te_pair.TE_Pair instance
+
+        Returns a dict of repr strings of the pair.get_settings
+        entries named in self.config_names, so that configurations
+        with array or list values compare with ==.
+
+        """
+
+        settings = pair.get_settings()
+
+        return dict(
+            (name, repr(settings[name])) for name in self.config_names
+            )
+
+    def get_inputs(self, pair):
+
+        """Returns surrogate input array of a te_pair.TE_Pair instance.
+
+        Inputs:
+
+        pair : te_pair.TE_Pair instance
+
+        """
+
+        return np.array([
+            pair.T_h_conv, pair.T_c_conv, pair.U_hot, pair.U_cold,
+            pair.I / pair.Ptype.area, pair.length, pair.fill_fraction,
+            pair.leg_area_ratio
+            ])
+
+    def build(self, pair=None):
+
+        """Solves exact pairs at sampled inputs and fits them.
+
+        Inputs:
+
+        pair : optional te_pair.TE_Pair instance whose settings in
+        self.config_names and Ptype.area are used for the exact
+        solutions.  Its materials replace self.Ntype_material and
+        self.Ptype_material.
+
+        Methods:
+
+        self.fit
+        self.get_config
+
+        Samples that do not converge are left out.  Sets self.config
+        from the training pair and self.build_nfev, the total number
+        of pair residual evaluations of the exact solutions.
+
+        """
+
+        train_pair = te_pair.TE_Pair()
+        if pair is not None:
+            self.Ntype_material = pair.Ntype.material
+            self.Ptype_material = pair.Ptype.material
+            settings = pair.get_settings()
+            train_pair.set_settings(
+                dict((name, settings[name]) for name in self.config_names)
+                )
+            train_pair.Ptype.area = pair.Ptype.area
+        train_pair.Ntype.material = self.Ntype_material
+        train_pair.Ptype.material = self.Ptype_material
+        self.config = self.get_config(train_pair)
+
+        lower = self.bounds[:, 0]
+        upper = self.bounds[:, 1]
+        X = lower + get_halton(self.samples, len(self.inputs)) * (
+            upper - lower
+            )
+        Y = np.zeros([self.samples, len(self.outputs)])
+        converged = np.zeros(self.samples, dtype=bool)
+        self.build_nfev = 0
+
+        for i in range(self.samples):
+            (train_pair.T_h_conv, train_pair.T_c_conv, train_pair.U_hot,
+             train_pair.U_cold, J, train_pair.length,
+             train_pair.fill_fraction, train_pair.leg_area_ratio) = X[i]
+            train_pair.I = J * train_pair.Ptype.area
+            train_pair.set_constants()
+            train_pair.knob_guess = None
+            train_pair.solve_te_pair()
+            self.build_nfev += np.nan_to_num(train_pair.nfev)
+
+            Y[i] = [
+                train_pair.q_h, train_pair.q_c, train_pair.T_h,
+                train_pair.T_c, train_pair.P_flux, train_pair.eta,
+                train_pair.Ntype.q_h, train_pair.Ptype.q_h
+                ]
+            converged[i] = (
+                train_pair.solve_ier == 1 and np.isfinite(Y[i]).all()
+                )
+
+        self.X = X[converged]
+        self.Y = Y[converged]
+        self.fit()
+
+    def fit(self):
+
+        """Fits the surrogate to training inputs self.X and outputs
+        self.Y.
+
+        Inputs are scaled to the unit hypercube by self.bounds.  Sets
+        self.weights, the RBF and polynomial coefficients of every
+        output, self.scale, the training range of every output, and
+        self.loo_error, the leave-one-out error of every training
+        point relative to self.scale, with its largest value over
+        outputs in self.loo_error_max.
+
+        """
+
+        lower = self.bounds[:, 0]
+        upper = self.bounds[:, 1]
+        self.centers = (self.X - lower) / (upper - lower)
+
+        points = self.centers.shape[0]
+        poly = np.hstack([np.ones([points, 1]), self.centers])
+        dist = np.sqrt(
+            ((self.centers[:, None, :] - self.centers[None, :, :]) ** 2.)
+            .sum(axis=2)
+            )
+
+        system = np.zeros([points + poly.shape[1]] * 2)
+        system[:points, :points] = dist ** 3.
+        system[:points, points:] = poly
+        system[points:, :points] = poly.T
+        rhs = np.zeros([system.shape[0], self.Y.shape[1]])
+        rhs[:points] = self.Y
+
+        system_inv = np.linalg.inv(system)
+        self.weights = np.dot(system_inv, rhs)
+
+        self.scale = self.Y.max(axis=0) - self.Y.min(axis=0)
+        self.scale[self.scale == 0.] = 1.
+        self.loo_error = np.abs(
+            self.weights[:points] / np.diag(system_inv)[:points, None]
+            ) / self.scale
+        self.loo_error_max = self.loo_error.max(axis=1)
+
+    def query(self, x):
+
+        """Returns interpolated outputs and their error estimate.
+
+        Inputs:
+
+        x : array of inputs ordered as self.inputs
+
+        Returns an array of outputs ordered as self.outputs and the
+        largest leave-one-out error, relative to self.scale, of the
+        self.neighbors nearest training points.  Outside self.bounds,
+        the outputs are None and the error estimate is np.inf.
+
+        """
+
+        lower = self.bounds[:, 0]
+        upper = self.bounds[:, 1]
+        if (x < lower).any() or (x > upper).any():
+            return None, np.inf
+
+        x_unit = (x - lower) / (upper - lower)
+        dist = np.sqrt(((self.centers - x_unit) ** 2.).sum(axis=1))
+        points = self.centers.shape[0]
+
+        y = (
+            np.dot(dist ** 3., self.weights[:points]) +
+            self.weights[points] + np.dot(x_unit, self.weights[points + 1:])
+            )
+        nearest = np.argsort(dist)[:self.neighbors]
+        error = self.loo_error_max[nearest].max()
+
+        return y, error
+
+    def set_te_pair_values(self, pair):
+
+        """Sets solution of pair from the surrogate if it applies.
+
+        Inputs:
+
+        pair : te_pair.TE_Pair instance with set constants and
+        convection BCs, as in hx.HX.solve_node
+
+        Methods:
+
+        self.get_config
+        self.get_inputs
+        self.query
+        pair.set_bc_error
+
+        Returns False, leaving pair unchanged, if self.config is None
+        or differs from the configuration of pair, e.g. in materials,
+        method, or segments, if its inputs are outside self.bounds, or
+        if the error estimate exceeds self.tol.
+        Otherwise sets the heat fluxes, temperatures, power, and
+        efficiency of pair and of its legs as solve_te_pair would,
+        sets pair.error from the convection BCs, sets the solver
+        telemetry of pair as solve_te_pair would, with no residual
+        evaluations or integrations, and returns True.  Voltages and
+        resistances of pair are not set.
+
+        """
+
+        t0 = time.time()
+        if self.config is None or self.get_config(pair) != self.config:
+            return False
+
+        y, self.error = self.query(self.get_inputs(pair))
+        if self.error > self.tol:
+            return False
+
+        values = dict(zip(self.outputs, y))
+
+        pair.set_knobs(
+            [values['Ntype_q_h'], values['Ptype_q_h'], values['T_h']]
+            )
+        pair.T_c = values['T_c']
+        pair.Ntype.T_c = pair.T_c
+        pair.Ptype.T_c = pair.T_c
+        pair.q_h = values['q_h']
+        pair.q_c = values['q_c']
+        pair.h_eff = pair.q_h / (pair.T_h - pair.T_c)
+        pair.R_thermal = 1. / pair.h_eff
+        pair.P_flux = values['P_flux']
+        pair.P = pair.P_flux * pair.area
+        pair.eta = values['eta']
+        pair.set_bc_error()
+        pair.nfev = 0
+        pair.njev = 0
+        pair.leg_integrations = 0
+        pair.rhs_calls = 0
+        pair.solve_ier = 1
+        pair.solve_mesg = 'Surrogate used.'
+        pair.fallback_level = 0
+        pair.fidelity = 'surrogate'
+        pair.solve_time = time.time() - t0
+        pair.error_norm = np.abs(pair.error).max()
+
+        return True
+
+    def save(self, path):
+
+        """Saves bounds, configuration, training data, and fit to an
+        npz file.
+
+        Inputs:
+
+        path : file name
+
+        """
+
+        config = []
+        if self.config is not None:
+            config = sorted(self.config.items())
+
+        np.savez(
+            path, inputs=self.inputs, outputs=self.outputs,
+            bounds=self.bounds, X=self.X, Y=self.Y,
+            materials=[self.Ntype_material, self.Ptype_material],
+            config=np.array(config, dtype=str).reshape(-1, 2),
+            centers=self.centers, weights=self.weights, scale=self.scale,
+            loo_error=self.loo_error
+            )
+
+    def load(self, path):
+
+        """Loads a surrogate saved by self.save.
+
+        Inputs:
+
+        path : file name
+
+        Files without a configuration, e.g. from before it was saved,
+        load with self.config set to None.
+
+        """
+
+        with np.load(path) as data:
+            self.inputs = [str(name) for name in data['inputs']]
+            self.outputs = [str(name) for name in data['outputs']]
+            self.Ntype_material, self.Ptype_material = [
+                str(name) for name in data['materials']
+                ]
+            self.config = None
+            if 'config' in data.files and data['config'].size > 0:
+                self.config = dict(
+                    (str(name), str(value)) for name, value in data['config']
+                    )
+            for name in [
+                'bounds', 'X', 'Y', 'centers', 'weights', 'scale',
+                'loo_error'
+                ]:
+                setattr(self, name, data[name])
+
+        self.loo_error_max = self.loo_error.max(axis=1)
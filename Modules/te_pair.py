@@ -2,11 +2,39 @@
 
 import numpy as np
 import time
-from scipy.optimize import fsolve
+import multiprocessing
+from scipy.integrate import odeint, solve_bvp
+from scipy.optimize import fsolve, fmin
 
 # User defined modules
 import leg
 reload(leg)
+from leg import rk4, get_root
+
+
+def get_path_segment(args):
+
+    """Returns optimal parameters along one segment of a path.
+
+    Inputs:
+
+    args : tuple of settings, from TE_Pair.get_settings, and
+    conditions, an array of T_h_conv, T_c_conv, U_hot, and U_cold at
+    successive points
+
+    A module function, so that TE_Pair.optimize_path can pass it to
+    multiprocessing.Pool.  Returns the output of
+    TE_Pair.optimize_path_segment for a new TE_Pair set up with
+    TE_Pair.set_settings.
+
+    """
+
+    settings, conditions = args
+
+    pair = TE_Pair()
+    pair.set_settings(settings)
+
+    return pair.optimize_path_segment(conditions)
 
 
 class TE_Pair(object):
@@ -15,17 +43,47 @@ class TE_Pair(object):
     Methods:
 
     __init__
+    get_bvp_bc
+    get_bvp_dy_dxi
+    get_dTq_dx
+    get_dTq_dx_lean
+    get_dTq_dx_sens
     get_error
+    get_error_anal
+    get_error_cold
+    get_error_hot
+    get_error_jacobian
+    get_error_kirchhoff
+    get_fsolve_knobs
+    get_jacobian
+    get_jacobian_lean
+    get_settings
+    get_y
+    optimize_path
+    optimize_path_segment
     set_A_opt
     set_TEproperties
     set_ZT
     set_area
+    set_bc_error
     set_constants
     set_eta_max
+    set_flux_values
+    set_integrator_error
+    set_knobs
     set_power_max
+    set_power_values
     set_q_c_guess
+    set_settings
     solve_te_pair
+    solve_te_pair_anal
+    solve_te_pair_bvp
+    solve_te_pair_decoupled
+    solve_te_pair_fallback
+    solve_te_pair_kirchhoff
+    solve_te_pair_lean
     solve_te_pair_once
+    solve_te_pairs
 
     """
 
@@ -67,6 +125,64 @@ class TE_Pair(object):
         #  number of nodes for which the temperature values are
         #  returned by odeint.  This does not affect the actual
         #  calculation, only the values for which results are stored.
+        self.use_jacobian = False
+        # if True, odeint uses the analytic Jacobian of both legs
+        self.use_sensitivity = False
+        # if True, fsolve in solve_te_pair uses the exact Jacobian of
+        # get_error from get_error_jacobian rather than finite
+        # differences.  Not used if self.cache is set or either leg is
+        # segmented.  This pays off for cold starts and with the 'rk4'
+        # integrator.  Close to the root, the odeint error noise in
+        # get_error keeps fsolve iterating, so warm starts from
+        # hx.HX.warm_start are usually faster without it.
+        self.sens_rtol = 1.e-3
+        # odeint relative tolerance for sensitivities in
+        # get_error_jacobian.  This affects only the fsolve step, not
+        # the converged solution.
+        self.jac_knobs = None
+        # knobs at which get_error_jacobian last integrated
+        self.integrator = 'odeint'
+        # 'odeint' or 'rk4'.  See leg.Leg.integrator.
+        self.property_interp = 'cubic'
+        # 'cubic', 'linear', or None.  See leg.Leg.property_interp.
+        self.cache = None
+        # optional leg.LegCache instance shared by both legs.  When
+        # set, legs are integrated one at a time so that each leg
+        # integration can be reused.
+        self.method = 'numerical'
+        # solution method used by solve_te_pair, from lowest to
+        # highest fidelity.  'analytical' uses lumped properties at
+        # the mean temperature with no ODE integration, 'kirchhoff'
+        # uses property integrals with no ODE integration,
+        # 'numerical' uses fsolve with odeint shooting, 'bvp' uses
+        # collocation with solve_bvp, and 'decoupled' uses nested
+        # bracketed 1-D root finding with one leg integration at a
+        # time.  The last three solve the same equations.
+        self.bvp_tol = 1.e-6
+        # tolerance passed to solve_bvp
+        self.bracket_xtol = 1.e-4
+        # tolerance (K) of T_h for method 'decoupled'.  T_c and the
+        # leg cold side temperatures are solved 10 and 100 times more
+        # tightly.
+        self.fallbacks = ['analytic', 'decoupled', 'reduced_step']
+        # levels tried in order when fsolve does not converge in the
+        # 'numerical' method.  See solve_te_pair_fallback.  An empty
+        # list disables the fallbacks.
+        self.fallback_factor = 0.1
+        # fsolve initial step bound of the 'reduced_step' fallback.
+        # The fsolve default is 100.
+        self.opt_simplex_min = 0.01
+        # smallest initial simplex size, relative to each parameter,
+        # of the fmin corrector in optimize_path_segment
+        self.opt_xtol = 1.e-4
+        # relative parameter tolerance of the fmin corrector in
+        # optimize_path_segment
+        self.knob_guess = None
+        # optional array of Ntype q_h, Ptype q_h, and T_h used instead
+        # of the lumped analytic guess, e.g. the converged knobs of the
+        # previous HX node, as the fsolve starting point of the
+        # 'numerical' method and the starting values of the 'decoupled'
+        # method.  See hx.HX.warm_start.
 
         self.set_constants()
 
@@ -86,6 +202,14 @@ class TE_Pair(object):
         self.Ptype.length = self.length
         self.Ptype.nodes = self.nodes
         self.Ntype.nodes = self.nodes
+        self.Ptype.use_jacobian = self.use_jacobian
+        self.Ntype.use_jacobian = self.use_jacobian
+        self.Ptype.integrator = self.integrator
+        self.Ntype.integrator = self.integrator
+        self.Ptype.property_interp = self.property_interp
+        self.Ntype.property_interp = self.property_interp
+        self.Ptype.cache = self.cache
+        self.Ntype.cache = self.cache
         self.Ptype.I = self.I
         # Current must have same sign as heat flux for p-type
         # material. Heat flux is negative because temperature gradient
@@ -96,19 +220,304 @@ class TE_Pair(object):
         self.Ntype.set_constants()
         self.Ptype.set_constants()
 
+    def get_dTq_dx(self, Tq, x):
+
+        """Returns derivatives of both legs as one array.
+
+        Inputs:
+
+        Tq : state array with Ntype T, q, Vs, V, R followed by Ptype
+        T, q, Vs, V, R
+        x : location (m) along legs
+
+        Methods:
+
+        self.Ntype.get_dTq_dx
+        self.Ptype.get_dTq_dx
+
+        Lets odeint advance both legs as a single 10 state system.
+        Both legs must share length and nodes, which set_constants
+        guarantees.
+
+        """
+
+        dTq_dx = np.empty(10)
+        dTq_dx[:5] = self.Ntype.get_dTq_dx(Tq[:5], x)
+        dTq_dx[5:] = self.Ptype.get_dTq_dx(Tq[5:], x)
+
+        return dTq_dx
+
+    def get_jacobian(self, Tq, x):
+
+        """Returns block diagonal Jacobian of self.get_dTq_dx.
+
+        Methods:
+
+        self.Ntype.get_jacobian
+        self.Ptype.get_jacobian
+
+        """
+
+        jac = np.zeros((10, 10))
+        jac[:5, :5] = self.Ntype.get_jacobian(Tq[:5], x)
+        jac[5:, 5:] = self.Ptype.get_jacobian(Tq[5:], x)
+
+        return jac
+
+    def get_dTq_dx_lean(self, Tq, x):
+
+        """Returns derivatives of T and q only for both legs.
+
+        Inputs:
+
+        Tq : array of Ntype T, q followed by Ptype T, q
+        x : location (m) along legs
+
+        Methods:
+
+        self.Ntype.get_dTq_dx_lean
+        self.Ptype.get_dTq_dx_lean
+
+        """
+
+        dTq_dx = np.empty(4)
+        dTq_dx[:2] = self.Ntype.get_dTq_dx_lean(Tq[:2], x)
+        dTq_dx[2:] = self.Ptype.get_dTq_dx_lean(Tq[2:], x)
+
+        return dTq_dx
+
+    def get_jacobian_lean(self, Tq, x):
+
+        """Returns block diagonal Jacobian of self.get_dTq_dx_lean.
+
+        Methods:
+
+        self.Ntype.get_jacobian_lean
+        self.Ptype.get_jacobian_lean
+
+        """
+
+        jac = np.zeros((4, 4))
+        jac[:2, :2] = self.Ntype.get_jacobian_lean(Tq[:2], x)
+        jac[2:, 2:] = self.Ptype.get_jacobian_lean(Tq[2:], x)
+
+        return jac
+
+    def get_dTq_dx_sens(self, y, x):
+
+        """Returns derivatives of T, q, and sensitivities of both legs.
+
+        Inputs:
+
+        y : array of Ntype T, q, and sensitivities followed by the
+        same for Ptype.  See leg.Leg.get_dTq_dx_sens.
+        x : location (m) along legs
+
+        Methods:
+
+        self.Ntype.get_dTq_dx_sens
+        self.Ptype.get_dTq_dx_sens
+
+        """
+
+        dy_dx = np.empty(12)
+        dy_dx[:6] = self.Ntype.get_dTq_dx_sens(y[:6], x)
+        dy_dx[6:] = self.Ptype.get_dTq_dx_sens(y[6:], x)
+
+        return dy_dx
+
+    def get_error_jacobian(self, knob_arr):
+
+        """Returns exact Jacobian of self.get_error w.r.t. knob_arr.
+
+        Inputs:
+
+        knob_arr : array of Ntype q_h, Ptype q_h, and T_h
+
+        Methods:
+
+        self.set_knobs
+        self.get_dTq_dx_sens
+
+        Both legs are integrated once together with their forward
+        sensitivity equations, so no extra pair integrations are
+        needed for finite differences.  odeint error control is
+        relaxed for the sensitivities with self.sens_rtol so that
+        the step size is set by T and q alone.  Used as fprime for
+        fsolve in solve_te_pair when self.use_sensitivity is True.
+        fsolve checks fprime at the initial guess before iterating,
+        so the Jacobian is stored with self.jac_knobs and returned
+        without integration if knob_arr is unchanged.
+
+        """
+
+        if (self.jac_knobs is not None and
+            np.array_equal(knob_arr, self.jac_knobs)):
+            return self.error_jac
+
+        self.set_knobs(knob_arr)
+        self.Ntype.integrations += 1
+        self.Ptype.integrations += 1
+
+        S0 = np.eye(2).flatten()
+        y0 = np.concatenate((
+                [self.Ntype.T_h, self.Ntype.q_h], S0,
+                [self.Ptype.T_h, self.Ptype.q_h], S0
+                ))
+
+        if self.integrator == 'rk4':
+            y_c = rk4(self.get_dTq_dx_sens, y0=y0, t=self.Ntype.x)[-1]
+
+        else:
+            tol = 1.49012e-8
+            # odeint default rtol and atol
+            rtol = np.array(2 * ([tol, tol] + 4 * [self.sens_rtol]))
+            y_c = odeint(
+                self.get_dTq_dx_sens, y0=y0, t=self.Ntype.x, rtol=rtol,
+                atol=tol
+                )[-1]
+
+        S_N = y_c[2:6].reshape(2, 2)
+        S_P = y_c[8:].reshape(2, 2)
+
+        # derivatives of cold side T and q of each leg w.r.t. knobs
+        dT_c_N = np.array([S_N[0, 1], 0., S_N[0, 0]])
+        dq_c_N = np.array([S_N[1, 1], 0., S_N[1, 0]])
+        dT_c_P = np.array([0., S_P[0, 1], S_P[0, 0]])
+        dq_c_P = np.array([0., S_P[1, 1], S_P[1, 0]])
+
+        jac = np.zeros((3, 3))
+        jac[0] = dT_c_N - dT_c_P
+        jac[1] = (
+            (dq_c_P * self.Ptype.area + dq_c_N * self.Ntype.area) /
+            self.area * 0.001 - self.U_cold * dT_c_N
+            )
+        jac[2] = [
+            self.Ntype.area / self.area * 0.001,
+            self.Ptype.area / self.area * 0.001, self.U_hot
+            ]
+
+        self.jac_knobs = np.array(knob_arr)
+        self.error_jac = jac
+
+        return jac
+
+    def solve_te_pair_lean(self):
+
+        """Solves T and q in both legs and combines heat fluxes.
+
+        Methods:
+
+        self.get_y
+        self.Ntype.solve_leg_lean
+        self.Ptype.solve_leg_lean
+        self.set_flux_values
+
+        Used by get_error during root finding.  Voltage, resistance,
+        and power are found afterwards by a single call to
+        solve_te_pair_once.
+
+        """
+
+        if (self.cache is not None or self.Ntype.segments is not None or
+            self.Ptype.segments is not None):
+            self.Ntype.solve_leg_lean(self.Ntype.q_h)
+            self.Ptype.solve_leg_lean(self.Ptype.q_h)
+
+        else:
+            self.y0 = np.array([
+                    self.Ntype.T_h, self.Ntype.q_h, self.Ptype.T_h,
+                    self.Ptype.q_h
+                    ])
+
+            self.y = self.get_y(self.get_dTq_dx_lean, self.get_jacobian_lean)
+
+            self.Ntype.T_x = self.y[:, 0]
+            self.Ntype.q_x = self.y[:, 1]
+            self.Ptype.T_x = self.y[:, 2]
+            self.Ptype.q_x = self.y[:, 3]
+
+            for leg in [self.Ntype, self.Ptype]:
+                leg.T_c = leg.T_x[-1]
+                leg.q_c = leg.q_x[-1]
+
+        self.set_flux_values()
+
     def solve_te_pair_once(self):
 
         """Solves legs and combines results of leg pair.
 
         Methods:
 
+        self.get_y
+        self.Ntype.set_leg_values
+        self.Ptype.set_leg_values
         self.Ntype.solve_leg_once
         self.Ptype.solve_leg_once
+        self.set_flux_values
+
+        Both legs are integrated in a single odeint call rather than
+        one call per leg, unless self.cache is set or either leg is
+        segmented.
 
         """
 
-        self.Ntype.solve_leg_once(self.Ntype.q_h)
-        self.Ptype.solve_leg_once(self.Ptype.q_h)
+        if (self.cache is not None or self.Ntype.segments is not None or
+            self.Ptype.segments is not None):
+            self.Ntype.solve_leg_once(self.Ntype.q_h)
+            self.Ptype.solve_leg_once(self.Ptype.q_h)
+
+        else:
+            self.Ntype.y0 = np.array(
+                [self.Ntype.T_h, self.Ntype.q_h, 0, 0, 0]
+                )
+            self.Ptype.y0 = np.array(
+                [self.Ptype.T_h, self.Ptype.q_h, 0, 0, 0]
+                )
+            self.y0 = np.concatenate((self.Ntype.y0, self.Ptype.y0))
+
+            self.y = self.get_y(self.get_dTq_dx, self.get_jacobian)
+
+            self.Ntype.y = self.y[:, :5]
+            self.Ptype.y = self.y[:, 5:]
+            self.Ntype.set_leg_values()
+            self.Ptype.set_leg_values()
+
+        self.set_flux_values()
+
+    def get_y(self, get_dy_dx, get_jac):
+
+        """Returns integration of get_dy_dx from self.y0 over legs.
+
+        Inputs:
+
+        get_dy_dx : derivative function for both legs
+        get_jac : Jacobian of get_dy_dx, used if self.use_jacobian
+
+        Uses self.integrator.
+
+        """
+
+        self.Ntype.integrations += 1
+        self.Ptype.integrations += 1
+
+        if self.integrator == 'rk4':
+            y = rk4(get_dy_dx, y0=self.y0, t=self.Ntype.x)
+
+        else:
+            if self.use_jacobian == True:
+                Dfun = get_jac
+            else:
+                Dfun = None
+
+            y = odeint(get_dy_dx, y0=self.y0, t=self.Ntype.x, Dfun=Dfun)
+
+        return y
+
+    def set_flux_values(self):
+
+        """Combines leg heat fluxes into area averaged pair values."""
+
         self.T_c = self.Ntype.T_c
 
         self.q_h = (
@@ -140,7 +549,25 @@ class TE_Pair(object):
 
         Methods:
 
-        self.solve_te_pair_once
+        self.set_knobs
+        self.solve_te_pair_lean
+        self.set_bc_error
+
+        """
+
+        self.set_knobs(knob_arr)
+        self.solve_te_pair_lean()
+        self.set_bc_error()
+
+        return self.error
+
+    def set_knobs(self, knob_arr):
+
+        """Sets hot side heat fluxes and temperature of both legs.
+
+        Inputs:
+
+        knob_arr : array of Ntype q_h, Ptype q_h, and T_h
 
         """
 
@@ -151,7 +578,9 @@ class TE_Pair(object):
         self.Ptype.T_h = self.T_h
         self.Ntype.T_h = self.T_h
 
-        self.solve_te_pair_once()
+    def set_bc_error(self):
+
+        """Sets errors in cold side temperature and convection BCs."""
 
         self.q_c_conv = self.U_cold * (self.T_c - self.T_c_conv)
         self.q_h_conv = self.U_hot * (self.T_h_conv - self.T_h)
@@ -162,8 +591,6 @@ class TE_Pair(object):
 
         self.error = np.array([T_c_error, q_c_error, q_h_error]).flatten()
 
-        return self.error
-
     def set_q_guess(self):
 
         """Sets cold side guess for both Ntype and Ptype legs.
@@ -184,23 +611,138 @@ class TE_Pair(object):
 
         Methods:
 
+        self.solve_te_pair_anal
         self.set_q_guess
+        self.get_error
+        self.set_knobs
+        self.solve_te_pair_once
+        self.set_bc_error
+        self.get_fsolve_knobs
+        self.solve_te_pair_fallback
+        self.solve_te_pair_bvp
+        self.solve_te_pair_decoupled
+        self.solve_te_pair_kirchhoff
+        self.set_power_values
+
+        Dispatches on self.method, which is stored in self.fidelity
+        with the results.  An unknown method raises ValueError, as do
+        'analytical', 'bvp', and 'kirchhoff' if either leg has
+        segments, because they would solve single material legs.  For
+        method 'numerical', uses fsolve on self.get_error.  fsolve
+        starts from self.knob_guess if it is set and otherwise from
+        the lumped analytic guess.  If fsolve does not converge from
+        self.knob_guess, it is restarted from the analytic guess.  If
+        that fails too, the levels of self.fallbacks are tried by
+        solve_te_pair_fallback, and the level used is stored in
+        self.fallback_level, which is 0 if no fallback was needed.
+        The number of fsolve residual evaluations is stored in
+        self.nfev and the number of exact Jacobian evaluations, which
+        are zero unless self.use_sensitivity is True, in self.njev.
+        Both are zero for 'bvp' and 'decoupled', which do not use
+        fsolve, and their work shows in self.rhs_calls and
+        self.leg_integrations.
+
+        Also sets solver telemetry for every method:
+
+        self.solve_ier : 1 if converged, otherwise the fsolve ier or
+        the solve_bvp status plus 1
+        self.solve_mesg : solver message
+        self.leg_integrations : number of single leg integrations,
+        counting a pair integration as two.  Zero for 'analytical',
+        'bvp', and 'kirchhoff'.
+        self.rhs_calls : number of leg derivative evaluations
+        self.solve_time : wall time (s)
+        self.error_norm : largest absolute entry of self.error
 
         """
 
-        self.Ptype.T_h = self.T_h_conv 
-        self.Ntype.T_h = self.T_h_conv
-        self.Ptype.T_c = self.T_c_conv
-        self.Ntype.T_c = self.T_c_conv
+        if (self.method in ['analytical', 'bvp', 'kirchhoff'] and
+            (self.Ntype.segments is not None or
+             self.Ptype.segments is not None)):
+            raise ValueError(
+                "Method '" + self.method + "' does not support segmented "
+                "legs"
+                )
+
+        t0 = time.time()
+        for leg_type in [self.Ntype, self.Ptype]:
+            leg_type.integrations = 0
+            leg_type.rhs_calls = 0
+        self.fallback_level = 0
+
+        if self.method == 'analytical':
+            self.solve_te_pair_anal()
+            self.nfev = self.anal_nfev
+            self.njev = 0
+            self.solve_ier = self.anal_ier
+            self.solve_mesg = self.anal_mesg
+
+        elif self.method == 'bvp':
+            self.solve_te_pair_bvp()
+            self.nfev = 0
+            self.njev = 0
+
+        elif self.method == 'kirchhoff':
+            self.solve_te_pair_kirchhoff()
+
+        elif self.method == 'decoupled':
+            self.solve_te_pair_decoupled()
+
+        elif self.method == 'numerical':
+            self.Ptype.T_h = self.T_h_conv 
+            self.Ntype.T_h = self.T_h_conv
+            self.Ptype.T_c = self.T_c_conv
+            self.Ntype.T_c = self.T_c_conv
+
+            self.Ptype.T_c_goal = None
+            self.Ntype.T_c_goal = None
+
+            if (self.use_sensitivity == True and self.cache is None and
+                self.Ntype.segments is None and self.Ptype.segments is
+                None):
+                fprime = self.get_error_jacobian
+            else:
+                fprime = None
+
+            self.nfev = 0
+            self.njev = 0
+            self.jac_knobs = None
+            self.fsolve_ier = 0
+
+            if self.knob_guess is not None:
+                knob_arr = self.get_fsolve_knobs(self.knob_guess, fprime)
+
+            if self.fsolve_ier != 1:
+                self.set_q_guess()
+                knob_arr0 = np.array([self.Ntype.q_h_guess,
+                self.Ptype.q_h_guess, self.T_h_conv])
+                knob_arr = self.get_fsolve_knobs(knob_arr0, fprime)
+
+            if self.fsolve_ier != 1 and len(self.fallbacks) > 0:
+                knob_arr = self.solve_te_pair_fallback(knob_arr, fprime)
+
+            # Full solution, including voltage and power, at the
+            # converged knobs.
+            self.set_knobs(knob_arr)
+            self.solve_te_pair_once()
+            self.set_bc_error()
 
-        self.set_q_guess()
-        knob_arr0 = np.array([self.Ntype.q_h_guess,
-        self.Ptype.q_h_guess, self.T_h_conv])
+        else:
+            raise ValueError("Unknown method '" + self.method + "'")
 
-        self.Ptype.T_c_goal = None
-        self.Ntype.T_c_goal = None
+        self.fidelity = self.method
+        self.set_power_values()
 
-        self.fsolve_output = fsolve(self.get_error, x0=knob_arr0)
+        self.leg_integrations = (
+            self.Ntype.integrations + self.Ptype.integrations
+            )
+        self.rhs_calls = self.Ntype.rhs_calls + self.Ptype.rhs_calls
+        self.solve_time = time.time() - t0
+        self.error_norm = np.abs(self.error).max()
+
+    def set_power_values(self):
+
+        """Sets power and voltage of pair from solved legs."""
 
         self.P = (self.Ntype.P + self.Ptype.P) * 0.001
         # power for the entire leg pair(kW). Negative sign makes this
@@ -215,6 +757,610 @@ class TE_Pair(object):
         self.R_internal = ( self.Ntype.R_internal +
         self.Ptype.R_internal )
 
+    def get_fsolve_knobs(self, knob_arr0, fprime=None, factor=100.):
+
+        """Returns knobs found by fsolve on self.get_error.
+
+        Inputs:
+
+        knob_arr0 : starting array of Ntype q_h, Ptype q_h, and T_h
+        fprime : optional Jacobian function passed to fsolve
+        factor : bound on the initial fsolve step, passed to fsolve
+
+        Adds the evaluations to self.nfev and self.njev and sets
+        self.fsolve_ier, self.solve_ier, self.solve_mesg, and
+        self.fsolve_norm, the largest absolute BC error at the
+        returned knobs.
+
+        """
+
+        knob_arr, fsolve_info, self.fsolve_ier, self.solve_mesg = fsolve(
+            self.get_error, x0=knob_arr0, fprime=fprime, factor=factor,
+            full_output=True
+            )
+        self.nfev += fsolve_info['nfev']
+        self.njev += fsolve_info.get('njev', 0)
+        self.solve_ier = self.fsolve_ier
+        self.fsolve_norm = np.abs(fsolve_info['fvec']).max()
+
+        return knob_arr
+
+    def solve_te_pair_fallback(self, knob_arr, fprime=None):
+
+        """Retries a non-converged fsolve with self.fallbacks.
+
+        Inputs:
+
+        knob_arr : knobs of the failed fsolve
+        fprime : optional Jacobian function passed to fsolve
+
+        Methods:
+
+        self.solve_te_pair_anal
+        self.get_fsolve_knobs
+        self.solve_te_pair_decoupled
+
+        Levels are tried in the order of self.fallbacks until one
+        converges:
+
+        'analytic' : fsolve from the knobs of solve_te_pair_anal,
+        which accounts for the convection resistances
+        'decoupled' : solve_te_pair_decoupled.  A failure to bracket
+        a root counts as not converged.
+        'reduced_step' : fsolve from the knobs of solve_te_pair_anal
+        with the initial step bound self.fallback_factor
+
+        Returns the knobs of the converged level, or, if none
+        converges, those with the smallest BC error, and sets
+        self.fallback_level to 1 plus the index in self.fallbacks of
+        the level that produced them.  self.solve_ier is not 1 if no
+        level converged.  self.nfev counts only fsolve evaluations.
+
+        """
+
+        best = (self.fsolve_norm, knob_arr, 0, self.solve_ier,
+                self.solve_mesg)
+        knob_anal = None
+
+        for level, fallback in enumerate(self.fallbacks):
+            if fallback in ['analytic', 'reduced_step'] and knob_anal is None:
+                self.solve_te_pair_anal()
+                knob_anal = np.array(
+                    [self.Ntype.q_h, self.Ptype.q_h, self.T_h]
+                    )
+
+            if fallback == 'analytic':
+                knob_arr = self.get_fsolve_knobs(knob_anal, fprime)
+                norm = self.fsolve_norm
+
+            elif fallback == 'reduced_step':
+                knob_arr = self.get_fsolve_knobs(
+                    knob_anal, fprime, factor=self.fallback_factor
+                    )
+                norm = self.fsolve_norm
+
+            elif fallback == 'decoupled':
+                nfev = self.nfev
+                try:
+                    self.solve_te_pair_decoupled()
+                except (ValueError, RuntimeError) as err:
+                    self.solve_ier = 0
+                    self.solve_mesg = str(err)
+                    norm = np.inf
+                    self.Ntype.T_c_goal = None
+                    self.Ptype.T_c_goal = None
+                else:
+                    norm = np.abs(self.error).max()
+                knob_arr = np.array(
+                    [self.Ntype.q_h, self.Ptype.q_h, self.T_h]
+                    )
+                self.nfev = nfev
+                self.njev = 0
+
+            else:
+                raise ValueError("Unknown fallback '" + fallback + "'")
+
+            if self.solve_ier == 1:
+                self.fallback_level = level + 1
+                return knob_arr
+
+            if norm < best[0]:
+                best = (norm, knob_arr, level + 1, self.solve_ier,
+                        self.solve_mesg)
+
+        (norm, knob_arr, self.fallback_level, self.solve_ier,
+         self.solve_mesg) = best
+
+        return knob_arr
+
+    def solve_te_pairs(self, bc_arrays):
+
+        """Solves many pairs like this one at once and returns them.
+
+        Inputs:
+
+        bc_arrays : dict of arrays, or scalars, keyed by any of
+        'T_h_conv', 'T_c_conv', 'U_hot', 'U_cold', and 'I'.  Entries
+        are broadcast together and flattened to one value per pair.
+        Missing entries take the values of self.
+
+        Methods:
+
+        BatchTE_Pair.set_constants
+        BatchTE_Pair.solve_te_pair
+
+        Returns a solved BatchTE_Pair instance with the materials,
+        geometry, and property_interp of self.  Its results, e.g. P,
+        eta, q_h, T_h, and converged, have one entry per pair and can
+        be reshaped to the broadcast shape, batch_pair.shape.  This
+        replaces loops over solve_te_pair, e.g. for maps of power
+        against current and hot side temperature.  Raises ValueError
+        if either leg has segments, which BatchTE_Pair does not
+        support.
+
+        """
+
+        if self.Ntype.segments is not None or self.Ptype.segments is not None:
+            raise ValueError("solve_te_pairs does not support segmented legs")
+
+        batch_pair = BatchTE_Pair()
+
+        batch_pair.length = self.length
+        batch_pair.leg_area_ratio = self.leg_area_ratio
+        batch_pair.fill_fraction = self.fill_fraction
+        batch_pair.nodes = self.nodes
+        batch_pair.property_interp = self.property_interp
+        batch_pair.Ptype.area = self.Ptype.area
+        batch_pair.Ntype.material = self.Ntype.material
+        batch_pair.Ptype.material = self.Ptype.material
+
+        names = ['T_h_conv', 'T_c_conv', 'U_hot', 'U_cold', 'I']
+        values = np.broadcast_arrays(*[
+            np.asarray(
+                bc_arrays[name] if name in bc_arrays else getattr(self, name),
+                dtype=float
+                )
+            for name in names
+            ])
+        batch_pair.shape = values[0].shape
+        for name, value in zip(names, values):
+            setattr(batch_pair, name, value.ravel())
+
+        batch_pair.set_constants()
+        batch_pair.solve_te_pair()
+
+        return batch_pair
+
+    def get_error_anal(self, T_arr):
+
+        """Returns convection BC error for solve_te_pair_anal.
+
+        Inputs:
+
+        T_arr : array of hot and cold side temperatures (K)
+
+        Methods:
+
+        self.Ntype.solve_leg_anal
+        self.Ptype.solve_leg_anal
+        self.set_flux_values
+        self.set_bc_error
+
+        """
+
+        self.T_h = T_arr[0]
+        for leg in [self.Ntype, self.Ptype]:
+            leg.T_h = T_arr[0]
+            leg.T_c = T_arr[1]
+            leg.solve_leg_anal()
+
+        self.set_flux_values()
+        self.set_bc_error()
+
+        return self.error[1:]
+
+    def solve_te_pair_anal(self):
+
+        """Solves leg pair with convection BCs from lumped properties.
+
+        Methods:
+
+        self.get_error_anal
+
+        As solve_te_pair_kirchhoff, but each leg is solved by
+        leg.Leg.solve_leg_anal with properties at the mean
+        temperature.  Used by solve_te_pair for method 'analytical'
+        and for the 'analytic' fallback.  Sets self.anal_nfev,
+        self.anal_ier, and self.anal_mesg from fsolve.
+
+        """
+
+        T_arr0 = np.array([
+                0.75 * self.T_h_conv + 0.25 * self.T_c_conv,
+                0.25 * self.T_h_conv + 0.75 * self.T_c_conv
+                ])
+
+        self.anal_output, fsolve_info, self.anal_ier, self.anal_mesg = (
+            fsolve(self.get_error_anal, x0=T_arr0, full_output=True)
+            )
+        self.anal_nfev = fsolve_info['nfev']
+        self.get_error_anal(self.anal_output)
+
+    def get_error_kirchhoff(self, T_arr):
+
+        """Returns convection BC error for solve_te_pair_kirchhoff.
+
+        Inputs:
+
+        T_arr : array of hot and cold side temperatures (K)
+
+        Methods:
+
+        self.Ntype.solve_leg_kirchhoff
+        self.Ptype.solve_leg_kirchhoff
+        self.set_flux_values
+        self.set_bc_error
+
+        """
+
+        self.T_h = T_arr[0]
+        for leg in [self.Ntype, self.Ptype]:
+            leg.T_h = T_arr[0]
+            leg.T_c = T_arr[1]
+            leg.solve_leg_kirchhoff()
+
+        self.set_flux_values()
+        self.set_bc_error()
+
+        return self.error[1:]
+
+    def solve_te_pair_kirchhoff(self):
+
+        """Solves leg pair with convection BCs from property integrals.
+
+        Methods:
+
+        self.get_error_kirchhoff
+
+        Both legs share T_h and T_c, so only the two convection BCs
+        are solved with fsolve and the cold side temperature error is
+        zero by construction.  Each residual evaluation is algebraic.
+
+        """
+
+        T_arr0 = np.array([
+                0.75 * self.T_h_conv + 0.25 * self.T_c_conv,
+                0.25 * self.T_h_conv + 0.75 * self.T_c_conv
+                ])
+
+        self.fsolve_output, fsolve_info, self.solve_ier, self.solve_mesg = (
+            fsolve(self.get_error_kirchhoff, x0=T_arr0, full_output=True)
+            )
+        self.fsolve_ier = self.solve_ier
+        self.nfev = fsolve_info['nfev']
+        self.njev = 0
+        self.get_error_kirchhoff(self.fsolve_output)
+
+    def get_error_cold(self, T_c):
+
+        """Returns cold side convection BC error for decoupled solve.
+
+        Inputs:
+
+        T_c : cold side temperature (K) of both legs
+
+        Methods:
+
+        self.Ntype.solve_leg_bracket
+        self.Ptype.solve_leg_bracket
+        self.set_flux_values
+
+        Each leg is solved on its own for the q_h that gives T_c at
+        the current T_h.  The guess is its q_h at the previous call
+        corrected for the change in T_h - T_c by conduction alone.
+
+        """
+
+        for leg in [self.Ntype, self.Ptype]:
+            q_h_guess = leg.q_h + leg.k / leg.length * (
+                (self.T_h - self.T_h_last) - (T_c - leg.T_c_goal)
+                )
+            leg.T_c_goal = T_c
+            leg.solve_leg_bracket(q_h_guess, 0.01 * self.bracket_xtol)
+
+        self.T_h_last = self.T_h
+        # T_h (K) at the last call
+        self.set_flux_values()
+
+        return self.q_c - self.U_cold * (T_c - self.T_c_conv)
+
+    def get_error_hot(self, T_h):
+
+        """Returns hot side convection BC error for decoupled solve.
+
+        Inputs:
+
+        T_h : hot side temperature (K) of both legs
+
+        Methods:
+
+        leg.get_root
+        self.get_error_cold
+
+        T_c is found at this T_h by bracketed root finding on
+        get_error_cold, starting from the previous T_c.
+
+        """
+
+        self.T_h = T_h
+        self.Ntype.T_h = T_h
+        self.Ptype.T_h = T_h
+
+        T_c = get_root(
+            self.get_error_cold, self.T_c, - (self.U_cold + self.K_legs),
+            0.1 * self.bracket_xtol
+            )
+        if T_c != self.Ntype.T_c_goal:
+            self.get_error_cold(T_c)
+
+        return self.q_h - self.U_hot * (self.T_h_conv - T_h)
+
+    def solve_te_pair_decoupled(self):
+
+        """Solves leg pair by nested bracketed 1-D root finding.
+
+        Methods:
+
+        leg.get_root
+        self.get_error_hot
+        self.set_q_guess
+        self.solve_te_pair_once
+        self.set_bc_error
+
+        The legs share only T_h and T_c.  For a trial T_h, each trial
+        T_c is matched by each leg independently through its q_h, and
+        T_c is found from the cold side convection BC.  T_h is then
+        found from the hot side convection BC.  Every level is a
+        scalar root bracketed by leg.get_root, so trial values stay
+        near physical ones even where fsolve on the three knobs
+        wanders.  Each level starts from the root of its previous
+        call.  Initial values come from self.knob_guess if it is
+        set and otherwise from a lumped thermal circuit.
+
+        Sets self.nfev and self.njev to zero, as there are no pair
+        residual evaluations.  Leg integrations are counted by
+        solve_te_pair in self.leg_integrations.  After the full
+        solution, self.error is converted to temperature errors (K)
+        in self.bracket_error by dividing the cold and hot side heat
+        flux errors by the lumped conductances of their convection
+        BCs, and self.solve_ier is 1 only if none exceeds
+        self.bracket_xtol.
+
+        """
+
+        for leg in [self.Ntype, self.Ptype]:
+            leg.T_h = self.T_h_conv
+            leg.T_c = self.T_c_conv
+            leg.set_TEproperties(0.5 * (leg.T_h + leg.T_c))
+        self.K_legs = (
+            (self.Ntype.k * self.Ntype.area + self.Ptype.k *
+            self.Ptype.area) / (self.area * self.length) * 0.001
+            )
+        # lumped thermal conductance (kW/m^2-K) of legs
+
+        if self.knob_guess is None:
+            q = (self.T_h_conv - self.T_c_conv) / (
+                1. / self.U_hot + 1. / self.K_legs + 1. / self.U_cold
+                )
+            T_h = self.T_h_conv - q / self.U_hot
+            self.T_c = self.T_c_conv + q / self.U_cold
+            for leg in [self.Ntype, self.Ptype]:
+                leg.T_h = T_h
+                leg.T_c = self.T_c
+                leg.set_q_guess()
+                leg.q_h = leg.q_h_guess
+
+        else:
+            self.Ntype.q_h = self.knob_guess[0]
+            self.Ptype.q_h = self.knob_guess[1]
+            T_h = self.knob_guess[2]
+            self.T_c = self.T_c_conv + (T_h - self.T_c_conv) * (
+                self.K_legs / (self.K_legs + self.U_cold)
+                )
+
+        self.T_h_last = T_h
+        self.Ntype.T_c_goal = self.T_c
+        self.Ptype.T_c_goal = self.T_c
+        self.Ntype.nfev = 0
+        self.Ptype.nfev = 0
+
+        K_hot = self.U_hot + 1. / (1. / self.K_legs + 1. / self.U_cold)
+        T_h = get_root(self.get_error_hot, T_h, K_hot, self.bracket_xtol)
+        if T_h != self.T_h:
+            self.get_error_hot(T_h)
+
+        self.nfev = 0
+        self.njev = 0
+
+        self.Ntype.T_c_goal = None
+        self.Ptype.T_c_goal = None
+
+        # Full solution, including voltage and power, at the
+        # converged knobs.
+        self.solve_te_pair_once()
+        self.set_bc_error()
+
+        self.bracket_error = np.abs(self.error) / np.array(
+            [1., self.U_cold + self.K_legs, K_hot]
+            )
+        if (self.bracket_error <= self.bracket_xtol).all():
+            self.solve_ier = 1
+            self.solve_mesg = 'Bracketed roots found.'
+        else:
+            self.solve_ier = 0
+            self.solve_mesg = (
+                'Bracketed roots found, but BC errors exceed bracket_xtol.'
+                )
+        # get_root raises ValueError if a root cannot be bracketed
+
+    def get_bvp_dy_dxi(self, xi, y):
+
+        """Returns derivatives of both legs for solve_bvp.
+
+        Inputs:
+
+        xi : array of normalized locations along legs
+        y : array of shape (10, xi.size) with Ntype T, q, Vs, V, R
+        followed by Ptype T, q, Vs, V, R
+
+        Methods:
+
+        self.Ntype.get_dTq_dx
+        self.Ptype.get_dTq_dx
+
+        Both legs have length self.length, so derivatives w.r.t. xi
+        are derivatives w.r.t. x multiplied by self.length.
+
+        """
+
+        dy_dxi = np.empty(y.shape)
+        dy_dxi[:5] = np.broadcast_arrays(*self.Ntype.get_dTq_dx(y[:5], xi))
+        dy_dxi[5:] = np.broadcast_arrays(*self.Ptype.get_dTq_dx(y[5:], xi))
+
+        return dy_dxi * self.length
+
+    def get_bvp_bc(self, y_h, y_c):
+
+        """Returns residuals of boundary conditions for solve_bvp.
+
+        Inputs:
+
+        y_h : state at hot side (xi = 0)
+        y_c : state at cold side (xi = 1)
+
+        Voltages and resistance start at zero, both legs share hot and
+        cold side temperatures, and area averaged heat flux matches
+        convection on both sides.
+
+        """
+
+        q_h = (
+            (y_h[6] * self.Ptype.area + y_h[1] * self.Ntype.area) /
+            self.area * 0.001
+            )
+        q_c = (
+            (y_c[6] * self.Ptype.area + y_c[1] * self.Ntype.area) /
+            self.area * 0.001
+            )
+
+        bc = np.array([
+                y_h[2], y_h[3], y_h[4], y_h[7], y_h[8], y_h[9],
+                y_h[0] - y_h[5],
+                y_c[0] - y_c[5],
+                (q_h - self.U_hot * (self.T_h_conv - y_h[0])) /
+                self.U_hot,
+                (q_c - self.U_cold * (y_c[0] - self.T_c_conv)) /
+                self.U_cold
+                ])
+
+        return bc
+
+    def solve_te_pair_bvp(self):
+
+        """Solves leg pair with convection BCs by collocation.
+
+        Methods:
+
+        self.set_q_guess
+        self.get_bvp_dy_dxi
+        self.get_bvp_bc
+        self.Ntype.set_leg_values
+        self.Ptype.set_leg_values
+        self.set_flux_values
+        self.set_bc_error
+
+        Both legs and both convection boundary conditions are posed
+        as one two-point boundary value problem for
+        scipy.integrate.solve_bvp, so no nested fsolve / odeint
+        iteration is needed.  The converged solution is kept in
+        self.bvp_sol, and its mesh and profiles are the initial guess
+        for the next call, e.g. the next node of an HX.  Delete
+        self.bvp_sol to start from the lumped analytic guess.
+
+        """
+
+        try:
+            self.bvp_sol
+        except AttributeError:
+            self.Ptype.T_h = self.T_h_conv 
+            self.Ntype.T_h = self.T_h_conv
+            self.Ptype.T_c = self.T_c_conv
+            self.Ntype.T_c = self.T_c_conv
+            self.set_q_guess()
+
+            xi = np.linspace(0., 1., self.nodes)
+            y = np.zeros((10, xi.size))
+            y[0] = self.T_h_conv + (self.T_c_conv - self.T_h_conv) * xi
+            y[5] = y[0]
+            y[1] = self.Ntype.q_h_guess
+            y[6] = self.Ptype.q_h_guess
+
+        else:
+            xi = self.bvp_sol.x
+            y = self.bvp_sol.y
+
+        self.bvp_sol = solve_bvp(
+            self.get_bvp_dy_dxi, self.get_bvp_bc, xi, y, tol=self.bvp_tol
+            )
+        self.y = self.bvp_sol.sol(np.linspace(0., 1., self.nodes))
+        self.solve_ier = self.bvp_sol.status + 1
+        self.solve_mesg = self.bvp_sol.message
+
+        if self.bvp_sol.status != 0:
+            print "\nsolve_bvp did not converge:", self.bvp_sol.message
+            del self.bvp_sol
+            # a failed solution is not reused as a guess
+
+        self.T_h = self.y[0, 0]
+        self.Ntype.T_h = self.T_h
+        self.Ptype.T_h = self.T_h
+        self.Ntype.q_h = self.y[1, 0]
+        self.Ptype.q_h = self.y[6, 0]
+
+        self.Ntype.y = self.y[:5].T
+        self.Ptype.y = self.y[5:].T
+        self.Ntype.set_leg_values()
+        self.Ptype.set_leg_values()
+
+        self.set_flux_values()
+        self.set_bc_error()
+
+    def set_integrator_error(self):
+
+        """Sets error of fixed step integration relative to odeint.
+
+        Methods:
+
+        self.Ntype.set_integrator_error
+        self.Ptype.set_integrator_error
+
+        Should be called after solve_te_pair.  Both legs are
+        integrated from the converged hot side state with 'rk4' and
+        'odeint'.  self.T_c_int_error (K) and self.P_int_error
+        (relative) are the larger of the two leg errors.
+
+        """
+
+        self.Ntype.set_integrator_error()
+        self.Ptype.set_integrator_error()
+
+        self.T_c_int_error = max(
+            self.Ntype.T_c_int_error, self.Ptype.T_c_int_error
+            )
+        self.P_int_error = max(
+            self.Ntype.P_int_error, self.Ptype.P_int_error
+            )
+
     def set_TEproperties(self, T_props):
 
         """Sets properties for both legs based on temperature.
@@ -400,3 +1546,551 @@ class TE_Pair(object):
         print "power flux:", self.P_flux, "kW/m^2"
 
         print """Elapsed time solving xmin1 =""", t1
+
+    def get_settings(self):
+
+        """Returns settings that define the model and solver of self.
+
+        Returns a dict keyed by attribute name of the geometry,
+        current, method, integrator, tolerance, fallback, cache, and
+        optimization settings of self, and of the material, area,
+        segment, interface, and property integral settings of both
+        legs, keyed by 'Ntype.<name>' and 'Ptype.<name>'.  Boundary
+        conditions and results are not included.  set_settings
+        applies the dict to another TE_Pair, which then solves the
+        same model, e.g. in another process.
+
+        """
+
+        settings = dict(
+            (name, getattr(self, name)) for name in [
+                'length', 'fill_fraction', 'I', 'leg_area_ratio', 'nodes',
+                'method', 'integrator', 'property_interp', 'use_jacobian',
+                'use_sensitivity', 'sens_rtol', 'cache', 'bvp_tol',
+                'bracket_xtol', 'fallbacks', 'fallback_factor',
+                'opt_simplex_min', 'opt_xtol', 'knob_guess'
+                ]
+            )
+        for leg_name in ['Ntype', 'Ptype']:
+            leg = getattr(self, leg_name)
+            for name in [
+                'material', 'area', 'segments', 'R_interface',
+                'rho_interface', 'interface_thickness', 'T_int'
+                ]:
+                settings[leg_name + '.' + name] = getattr(leg, name)
+
+        return settings
+
+    def set_settings(self, settings):
+
+        """Sets attributes of self and its legs from a settings dict.
+
+        Inputs:
+
+        settings : dict from get_settings
+
+        Methods:
+
+        self.set_constants
+
+        """
+
+        for name, value in settings.items():
+            if '.' in name:
+                leg_name, name = name.split('.')
+                setattr(getattr(self, leg_name), name, value)
+            else:
+                setattr(self, name, value)
+
+        self.set_constants()
+
+    def optimize_path(self, conditions, segments=1, processes=None):
+
+        """Minimizes self.get_minpar along a path of conditions.
+
+        Inputs:
+
+        conditions : array of shape (points, 4) of T_h_conv, T_c_conv,
+        U_hot, and U_cold at successive points of the path
+        segments : number of contiguous segments into which the path
+        is split.  Every segment starts from the current length,
+        fill_fraction, I, and leg_area_ratio of self.
+        processes : number of worker processes.  If None, segments
+        are solved one after another in this process.
+
+        Methods:
+
+        get_path_segment
+        self.get_settings
+
+        Segments are solved by module function get_path_segment on
+        a new TE_Pair with every setting of self from get_settings,
+        so that it solves the same model as self.optimize, and self
+        is left unchanged.  Sets arrays with one row per point:
+
+        self.path_xmin : optimal length (m), fill_fraction, I (A), and
+        leg_area_ratio, ordered as the apar of get_minpar
+        self.path_P_flux : optimal power flux (kW/m^2)
+        self.path_P : power (kW) at the optimum
+        self.path_nfev : number of get_minpar evaluations
+        self.path_time : wall time (s) of each optimization
+
+        and self.path_wall_time, the total wall time (s).
+
+        """
+
+        t0 = time.time()
+
+        settings = self.get_settings()
+
+        self.path_conditions = np.atleast_2d(conditions)
+        args = [
+            (settings, segment) for segment in
+            np.array_split(self.path_conditions, segments) if
+            segment.shape[0] > 0
+            ]
+
+        if processes is None:
+            results = map(get_path_segment, args)
+        else:
+            pool = multiprocessing.Pool(processes)
+            results = pool.map(get_path_segment, args)
+            pool.close()
+            pool.join()
+
+        (self.path_xmin, self.path_P_flux, self.path_P, self.path_nfev,
+         self.path_time) = [
+            np.concatenate([result[i] for result in results])
+            for i in range(5)
+            ]
+        self.path_wall_time = time.time() - t0
+
+    def optimize_path_segment(self, conditions):
+
+        """Minimizes self.get_minpar at successive conditions.
+
+        Inputs:
+
+        conditions : array of shape (points, 4) of T_h_conv, T_c_conv,
+        U_hot, and U_cold
+
+        Methods:
+
+        self.get_minpar
+
+        The first point starts from the current parameters of self.
+        Later points start from a secant predictor, the previous two
+        optima extrapolated linearly in the arc length of the
+        relative change of conditions, with the previous optimum used
+        instead wherever the prediction is not positive.  The fmin
+        corrector works in parameters relative to the prediction,
+        with tolerance self.opt_xtol, and starts from a simplex whose
+        size in each parameter is the relative predicted change, but
+        at least self.opt_simplex_min.  Each pair solve starts from
+        the knobs of the previous one.
+
+        Returns arrays of optimal parameters, power flux, power,
+        get_minpar evaluations, and wall time for every point.
+
+        """
+
+        points = conditions.shape[0]
+        xmin = np.zeros([points, 4])
+        P_flux = np.zeros(points)
+        P = np.zeros(points)
+        nfev = np.zeros(points)
+        wall_time = np.zeros(points)
+
+        s = np.concatenate((
+            [0.], np.cumsum(np.sqrt(
+                ((np.diff(conditions, axis=0) / conditions[0]) ** 2.)
+                .sum(axis=1)
+                ))
+            ))
+        # arc length of path in relative change of conditions
+
+        def get_minpar_warm(apar):
+            minpar = self.get_minpar(apar)
+            if self.solve_ier == 1:
+                self.knob_guess = np.array(
+                    [self.Ntype.q_h, self.Ptype.q_h, self.T_h]
+                    )
+            return minpar
+
+        x_prev = np.array(
+            [self.length, self.fill_fraction, self.I, self.leg_area_ratio]
+            )
+
+        for i in range(points):
+            t0 = time.time()
+            (self.T_h_conv, self.T_c_conv, self.U_hot, self.U_cold) = (
+                conditions[i]
+                )
+
+            x_pred = x_prev
+            if i > 1 and s[i - 1] > s[i - 2]:
+                x_pred = x_prev + (xmin[i - 1] - xmin[i - 2]) * (
+                    (s[i] - s[i - 1]) / (s[i - 1] - s[i - 2])
+                    )
+                x_pred = np.where(x_pred > 0., x_pred, x_prev)
+            if i == 0:
+                step = 0.05 * np.ones(4)
+                # fmin default
+            else:
+                step = np.maximum(
+                    np.abs(x_pred / x_prev - 1.), self.opt_simplex_min
+                    )
+            simplex = np.vstack((np.ones(4), 1. + np.diag(step)))
+
+            self.opt_iter = 0
+            u_min, fopt, n_iter, nfev[i], warnflag = fmin(
+                lambda u: get_minpar_warm(u * x_pred), np.ones(4),
+                xtol=self.opt_xtol, initial_simplex=simplex,
+                full_output=True, disp=False
+                )
+            xmin[i] = u_min * x_pred
+
+            self.get_minpar(xmin[i])
+            P_flux[i] = self.P_flux
+            P[i] = self.P
+            x_prev = xmin[i]
+            wall_time[i] = time.time() - t0
+
+        self.knob_guess = None
+
+        return xmin, P_flux, P, nfev, wall_time
+
+
+class BatchTE_Pair(TE_Pair):
+
+    """Class for solving many independent TE leg pairs at once.
+
+    T_h_conv, T_c_conv, U_hot, U_cold, I, and length may be arrays
+    with one entry per pair, and each leg may have per-pair property
+    fit coefficients through leg.BatchLeg.ensemble_params.  All pairs
+    are solved together by damped Newton iteration in which each
+    evaluation of the boundary condition errors is a single BatchLeg
+    integration per leg type.
+
+    Methods:
+
+    __init__
+    set_active
+    set_bc_error
+    set_constants
+    set_pair_arrays
+    set_pairs
+    solve_te_pair
+    solve_te_pair_lean
+    solve_te_pair_once
+
+    """
+
+    def __init__(self):
+
+        """Sets attributes and instantiates classes.
+
+        Class instances:
+
+        self.Ptype = leg.BatchLeg()
+        self.Ntype = leg.BatchLeg()
+
+        Methods:
+
+        TE_Pair.__init__
+        self.set_constants
+
+        """
+
+        super(BatchTE_Pair, self).__init__()
+
+        self.Ptype = leg.BatchLeg()
+        self.Ntype = leg.BatchLeg()
+        self.Ptype.material = 'HMS'
+        self.Ntype.material = 'MgSi'
+
+        self.newton_tol = 1.e-7
+        # convergence tolerance for the largest boundary condition
+        # error of each pair, scaled by T_h_conv - T_c_conv for
+        # temperature and U_hot * (T_h_conv - T_c_conv) for heat flux
+        self.newton_max_iter = 30
+        # maximum number of Newton iterations
+        self.newton_max_halvings = 8
+        # maximum number of step halvings per Newton iteration for
+        # pairs whose error grows
+        self.fd_step = 1.e-6
+        # relative knob perturbation for the finite difference Jacobian
+
+        self.set_constants()
+
+    def set_constants(self):
+
+        """Sets leg geometry and current density of both leg types.
+
+        Methods:
+
+        self.set_leg_areas
+        self.Ntype.set_constants
+        self.Ptype.set_constants
+
+        """
+
+        for leg_type in [self.Ntype, self.Ptype]:
+            leg_type.length = self.length
+            leg_type.nodes = self.nodes
+            leg_type.property_interp = self.property_interp
+
+        self.set_leg_areas()
+
+        self.Ptype.I = self.I
+        # Current must have same sign as heat flux for p-type
+        # material. Heat flux is negative because temperature gradient
+        # is positive.
+        self.Ntype.I = - self.I
+        self.Ptype.J = self.Ptype.I / self.Ptype.area
+        self.Ntype.J = self.Ntype.I / self.Ntype.area
+
+        self.Ntype.set_constants()
+        self.Ptype.set_constants()
+
+    def set_pairs(self):
+
+        """Sets number of pairs and broadcasts legs to match.
+
+        self.pairs is set from the sizes of both leg types and the
+        boundary condition inputs.  Legs with fewer entries are
+        broadcast to self.pairs.
+
+        """
+
+        self.pairs = np.broadcast(
+            np.ones(self.Ntype.legs), np.ones(self.Ptype.legs),
+            self.T_h_conv, self.T_c_conv, self.U_hot, self.U_cold
+            ).size
+
+        for leg_type in [self.Ntype, self.Ptype]:
+            if leg_type.legs != self.pairs:
+                leg_type.J = leg_type.J * np.ones(self.pairs)
+                leg_type.set_constants()
+
+    def solve_te_pair_lean(self):
+
+        """Solves T and q in all legs and combines heat fluxes.
+
+        Methods:
+
+        self.Ntype.solve_leg_lean
+        self.Ptype.solve_leg_lean
+        self.set_flux_values
+
+        """
+
+        self.Ntype.solve_leg_lean(self.Ntype.q_h)
+        self.Ptype.solve_leg_lean(self.Ptype.q_h)
+
+        self.set_flux_values()
+
+    def solve_te_pair_once(self):
+
+        """Solves all legs and combines results of leg pairs.
+
+        Methods:
+
+        self.Ntype.solve_leg_once
+        self.Ptype.solve_leg_once
+        self.set_flux_values
+
+        """
+
+        self.Ntype.solve_leg_once(self.Ntype.q_h)
+        self.Ptype.solve_leg_once(self.Ptype.q_h)
+
+        self.set_flux_values()
+
+    def set_pair_arrays(self):
+
+        """Stores every per-pair array of the pair and both legs.
+
+        Sets self.pair_arrays, a list of (instance, attribute name,
+        array) for set_active.  Scalar attributes are shared by all
+        pairs and are left out.
+
+        """
+
+        self.pair_arrays = []
+        for instance, names in [
+            (self, ['T_h_conv', 'T_c_conv', 'U_hot', 'U_cold', 'area']),
+            (self.Ntype, ['J', 'I', 'length', 'area', 'ensemble_params']),
+            (self.Ptype, ['J', 'I', 'length', 'area', 'ensemble_params'])
+            ]:
+            for name in names:
+                value = getattr(instance, name)
+                if np.ndim(value) > 0:
+                    self.pair_arrays.append((instance, name, value))
+
+    def set_active(self, active):
+
+        """Restricts per-pair arrays to a subset of pairs.
+
+        Inputs:
+
+        active : integer array of pair indices, or None to restore
+        all pairs
+
+        Arrays stored by set_pair_arrays are replaced by their entries
+        for active, so that get_error solves only those pairs.
+        ensemble_params is indexed along its second axis.
+
+        """
+
+        if active is None:
+            active = slice(None)
+            legs = self.pairs
+        else:
+            legs = active.size
+
+        for instance, name, value in self.pair_arrays:
+            if name == 'ensemble_params':
+                setattr(instance, name, value[:, active])
+            else:
+                setattr(instance, name, value[active])
+
+        self.Ntype.legs = legs
+        self.Ptype.legs = legs
+
+    def set_bc_error(self):
+
+        """Sets errors in cold side temperature and convection BCs.
+
+        self.error has shape (3, pairs).
+
+        """
+
+        self.q_c_conv = self.U_cold * (self.T_c - self.T_c_conv)
+        self.q_h_conv = self.U_hot * (self.T_h_conv - self.T_h)
+
+        T_c_error = self.Ntype.T_c - self.Ptype.T_c
+        q_c_error = self.q_c - self.q_c_conv
+        q_h_error = self.q_h - self.q_h_conv
+
+        self.error = np.array([T_c_error, q_c_error, q_h_error])
+
+    def solve_te_pair(self):
+
+        """Solves all pairs by batched damped Newton iteration.
+
+        Methods:
+
+        self.set_pairs
+        self.set_q_guess
+        self.set_pair_arrays
+        self.set_active
+        self.get_error
+        self.set_knobs
+        self.solve_te_pair_once
+        self.set_bc_error
+        self.set_power_values
+
+        The knobs of each pair are the same as for TE_Pair.  Because
+        pairs are independent, the Jacobian is block diagonal and
+        each 3 x 3 block is found by finite differences from three
+        batched error evaluations.  A pair whose scaled error grows
+        has its step halved.
+
+        Converged pairs are dropped from the active set, so each
+        evaluation integrates only the pairs that are still iterating,
+        and during step halving only the pairs whose step was
+        rejected.
+
+        Sets self.converged, a boolean array, self.newton_iter, the
+        number of Newton iterations used, and self.nfev, the number of
+        error evaluations of each pair.
+
+        """
+
+        self.set_pairs()
+        ones = np.ones(self.pairs)
+
+        for leg_type in [self.Ntype, self.Ptype]:
+            leg_type.T_h = self.T_h_conv * ones
+            leg_type.T_c = self.T_c_conv * ones
+
+        self.set_q_guess()
+        knobs = np.array([
+                self.Ntype.q_h_guess * ones, self.Ptype.q_h_guess * ones,
+                self.T_h_conv * ones
+                ])
+
+        delta_T = (self.T_h_conv - self.T_c_conv) * ones
+        scale = np.array([delta_T, self.U_hot * delta_T, self.U_hot *
+        delta_T])
+
+        self.set_pair_arrays()
+        self.nfev = np.ones(self.pairs)
+        error = self.get_error(knobs)
+        norm = np.abs(error / scale).max(axis=0)
+
+        self.newton_iter = 0
+        while self.newton_iter < self.newton_max_iter:
+            active = np.flatnonzero(norm >= self.newton_tol)
+            if active.size == 0:
+                break
+            self.newton_iter += 1
+
+            self.set_active(active)
+            knobs_active = knobs[:, active]
+            error_active = error[:, active]
+            norm_active = norm[active]
+            scale_active = scale[:, active]
+
+            jac = np.empty((active.size, 3, 3))
+            for k in range(3):
+                step = self.fd_step * np.maximum(np.abs(knobs_active[k]), 1.)
+                trial = knobs_active.copy()
+                trial[k] += step
+                jac[:, :, k] = (
+                    (self.get_error(trial) - error_active) / step
+                    ).T
+            self.nfev[active] += 3
+
+            dknobs = - np.linalg.solve(jac, error_active.T[:, :, np.newaxis])
+            dknobs = dknobs[:, :, 0].T
+
+            damping = np.ones(active.size)
+            trying = np.arange(active.size)
+            # indices within active of pairs whose step is not yet
+            # accepted
+            for halving in range(self.newton_max_halvings + 1):
+                self.set_active(active[trying])
+                trial = (
+                    knobs_active[:, trying] + damping[trying] *
+                    dknobs[:, trying]
+                    )
+                trial_error = self.get_error(trial)
+                trial_norm = np.abs(
+                    trial_error / scale_active[:, trying]
+                    ).max(axis=0)
+                self.nfev[active[trying]] += 1
+
+                worse = trial_norm > norm_active[trying]
+                if halving == self.newton_max_halvings:
+                    worse[:] = False
+                accepted = trying[~worse]
+                knobs[:, active[accepted]] = trial[:, ~worse]
+                error[:, active[accepted]] = trial_error[:, ~worse]
+                norm[active[accepted]] = trial_norm[~worse]
+
+                trying = trying[worse]
+                if trying.size == 0:
+                    break
+                damping[trying] *= 0.5
+
+        self.set_active(None)
+
+        self.converged = norm < self.newton_tol
+        self.knobs = knobs
+
+        self.set_knobs(knobs)
+        self.solve_te_pair_once()
+        self.set_bc_error()
+        self.set_power_values()
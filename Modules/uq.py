@@ -0,0 +1,310 @@
+"""Contains PropertyUQ class for material property uncertainty."""
+
+# Distribution modules
+
+import numpy as np
+
+# User defined modules
+import mat_prop
+reload(mat_prop)
+import te_pair
+reload(te_pair)
+
+
+class PropertyUQ(object):
+
+    """Class for propagating property fit uncertainty.
+
+    Raw property data of both TE materials are perturbed or resampled
+    and refit once per realization with
+    mat_prop.get_property_ensemble.  All realizations are then solved
+    together with te_pair.BatchTE_Pair, either for a single pair or
+    for every node of a heat exchanger, rather than in a loop over
+    full solutions.
+
+    Methods:
+
+    __init__
+    set_batch_pair
+    set_ensemble
+    set_stats
+    solve_hx
+    solve_te_pair
+
+    """
+
+    def __init__(self, hx):
+
+        """Sets defaults.
+
+        Inputs:
+
+        hx : hx.HX instance set up as for hx.solve_hx.  Its te_pair
+        supplies materials, geometry, current, and, for
+        solve_te_pair, boundary conditions.
+
+        """
+
+        self.hx = hx
+        self.realizations = 200
+        # number of property realizations
+        self.rel_std = 0.05
+        # relative standard deviation of raw data perturbation
+        self.sampling = 'perturb'
+        # 'perturb' or 'bootstrap'.  See
+        # mat_prop.get_property_ensemble.
+        self.seed = None
+        # seed for the random number generator
+        self.percentiles = [5., 50., 95.]
+        # percentiles reported by set_stats
+
+    def set_ensemble(self):
+
+        """Sets property fit coefficients for every realization.
+
+        Sets self.Ntype_params and self.Ptype_params with shape
+        (3, realizations, degree + 1).  The Ptype ensemble uses seed +
+        1 so that the two materials are sampled independently.
+
+        """
+
+        seeds = [None, None]
+        if self.seed is not None:
+            seeds = [self.seed, self.seed + 1]
+
+        for leg_name, seed in zip(['Ntype', 'Ptype'], seeds):
+            material = getattr(self.hx.te_pair, leg_name).material
+            setattr(
+                self, leg_name + '_params', mat_prop.get_property_ensemble(
+                    material, self.realizations, rel_std=self.rel_std,
+                    sampling=self.sampling, seed=seed
+                    )
+                )
+
+    def set_batch_pair(self):
+
+        """Sets self.batch_pair to match self.hx.te_pair.
+
+        Methods:
+
+        self.set_ensemble
+        self.batch_pair.set_constants
+
+        """
+
+        self.set_ensemble()
+
+        pair = self.hx.te_pair
+        self.batch_pair = te_pair.BatchTE_Pair()
+        batch_pair = self.batch_pair
+
+        batch_pair.I = pair.I
+        batch_pair.length = pair.length
+        batch_pair.leg_area_ratio = pair.leg_area_ratio
+        batch_pair.fill_fraction = pair.fill_fraction
+        batch_pair.nodes = pair.nodes
+        batch_pair.property_interp = pair.property_interp
+
+        batch_pair.Ptype.area = pair.Ptype.area
+        batch_pair.Ntype.material = pair.Ntype.material
+        batch_pair.Ptype.material = pair.Ptype.material
+        batch_pair.Ntype.ensemble_params = self.Ntype_params
+        batch_pair.Ptype.ensemble_params = self.Ptype_params
+
+        batch_pair.set_constants()
+
+    def solve_te_pair(self):
+
+        """Solves self.hx.te_pair for all realizations at once.
+
+        Methods:
+
+        self.set_batch_pair
+        self.batch_pair.solve_te_pair
+        self.set_stats
+
+        Uses T_h_conv, T_c_conv, U_hot, and U_cold of
+        self.hx.te_pair.  Sets self.P (kW), self.eta, and
+        self.converged with one entry per realization.
+
+        """
+
+        self.set_batch_pair()
+
+        pair = self.hx.te_pair
+        batch_pair = self.batch_pair
+        batch_pair.T_h_conv = pair.T_h_conv
+        batch_pair.T_c_conv = pair.T_c_conv
+        batch_pair.U_hot = pair.U_hot
+        batch_pair.U_cold = pair.U_cold
+
+        batch_pair.solve_te_pair()
+
+        self.P = batch_pair.P
+        self.eta = batch_pair.eta
+        self.converged = batch_pair.converged
+
+        self.set_stats(['P', 'eta'])
+
+    def solve_hx(self):
+
+        """Solves self.hx for all realizations at once.
+
+        Methods:
+
+        self.hx.init_arrays
+        self.hx.set_constants
+        self.hx.set_R_parasitic
+        self.hx.set_convection
+        self.set_batch_pair
+        self.batch_pair.solve_te_pair
+        self.set_stats
+
+        Follows hx.HX.solve_hx node by node, but exhaust and coolant
+        temperatures are arrays with one entry per realization.
+        Convection is found realization by realization because it
+        needs only algebra, while the TE pairs of all realizations
+        are solved by one batched call per node.  Minor losses of the
+        IdealFin enhancement are not included in the pumping power.
+
+        Sets arrays with one entry per realization:
+
+        self.power_total : TE power (kW) as hx.te_pair.power_total
+        self.Wdot_pumping : pumping power (kW)
+        self.power_net : net power (kW) as hx.power_net
+        self.effectiveness : as hx.effectiveness
+        self.converged : True if the pairs converged at every node,
+        as hx.converged
+
+        Node values such as self.power_nodes have shape
+        (nodes, realizations).
+
+        """
+
+        hx = self.hx
+        hx.init_arrays()
+        hx.set_constants()
+        hx.set_R_parasitic()
+        hx.exh.node_length = hx.node_length
+        hx.cool.node_length = hx.node_length
+
+        self.set_batch_pair()
+        batch_pair = self.batch_pair
+
+        ones = np.ones(self.realizations)
+        shape = (hx.nodes, self.realizations)
+        self.exh_T_nodes = np.zeros(shape)
+        self.cool_T_nodes = np.zeros(shape)
+        self.U_hot_nodes = np.zeros(shape)
+        self.U_cold_nodes = np.zeros(shape)
+        self.exh_C_nodes = np.zeros(shape)
+        self.cool_C_nodes = np.zeros(shape)
+        self.Wdot_nodes = np.zeros(shape)
+        self.Qdot_nodes = np.zeros(shape)
+        self.power_nodes = np.zeros(shape)
+        self.converged_nodes = np.zeros(shape, dtype=bool)
+
+        exh_T = hx.exh.T_inlet * ones
+        if hx.type == 'parallel':
+            cool_T = hx.cool.T_inlet * ones
+        elif hx.type == 'counter':
+            cool_T = hx.cool.T_outlet * ones
+
+        for i in np.arange(hx.nodes):
+            self.exh_T_nodes[i] = exh_T
+            self.cool_T_nodes[i] = cool_T
+
+            for j in range(self.realizations):
+                hx.exh.T = exh_T[j]
+                hx.cool.T = cool_T[j]
+                hx.set_convection()
+                self.U_hot_nodes[i, j] = hx.U_hot
+                self.U_cold_nodes[i, j] = hx.U_cold
+                self.exh_C_nodes[i, j] = hx.exh.C
+                self.cool_C_nodes[i, j] = hx.cool.C
+                self.Wdot_nodes[i, j] = (
+                    hx.exh.Wdot_pumping + hx.cool.Wdot_pumping
+                    )
+
+            batch_pair.T_h_conv = exh_T
+            batch_pair.T_c_conv = cool_T
+            batch_pair.U_hot = self.U_hot_nodes[i]
+            batch_pair.U_cold = self.U_cold_nodes[i]
+            batch_pair.solve_te_pair()
+
+            self.Qdot_nodes[i] = batch_pair.q_h * hx.area
+            self.power_nodes[i] = batch_pair.P * hx.leg_pairs
+            self.converged_nodes[i] = batch_pair.converged
+
+            # redefining temperatures (K) for next node
+            exh_T = exh_T - batch_pair.q_h * hx.area / self.exh_C_nodes[i]
+            if hx.type == 'parallel':
+                cool_T = (
+                    cool_T + batch_pair.q_c * hx.area / self.cool_C_nodes[i]
+                    )
+            elif hx.type == 'counter':
+                cool_T = (
+                    cool_T - batch_pair.q_c * hx.area / self.cool_C_nodes[i]
+                    )
+
+        self.exh_T_outlet = exh_T
+        if hx.type == 'parallel':
+            cool_T_inlet = hx.cool.T_inlet * ones
+        elif hx.type == 'counter':
+            cool_T_inlet = cool_T
+
+        self.Qdot_total = self.Qdot_nodes.sum(axis=0)
+        self.Qdot_max = (
+            self.exh_C_nodes.mean(axis=0) * (hx.exh.T_inlet - cool_T_inlet)
+            )
+        self.effectiveness = self.Qdot_total / self.Qdot_max
+
+        self.power_total = self.power_nodes.sum(axis=0)
+        self.Wdot_pumping = self.Wdot_nodes.sum(axis=0)
+        self.power_net = self.power_total - self.Wdot_pumping
+        self.converged = self.converged_nodes.all(axis=0)
+
+        self.set_stats(['power_net', 'power_total', 'effectiveness'])
+
+    def set_stats(self, names):
+
+        """Sets summary statistics of ensemble results.
+
+        Inputs:
+
+        names : list of names of result arrays, e.g. 'power_net'
+
+        Sets self.stats, a dict keyed by name of dicts with mean, std,
+        the values at self.percentiles, and the number of
+        realizations used.  Only realizations in self.converged are
+        used, and the number left out is set in self.unconverged.
+        Statistics are nan if no realization converged.
+
+        """
+
+        self.unconverged = (~self.converged).sum()
+        # number of realizations left out of self.stats
+        if self.unconverged > 0:
+            print (
+                "\nWarning: " + str(self.unconverged) + " of " +
+                str(self.converged.size) + " realizations did not "
+                "converge and are left out of the statistics."
+                )
+
+        self.stats = {}
+        for name in names:
+            values = getattr(self, name)[self.converged]
+            if values.size == 0:
+                self.stats[name] = {
+                    'mean': np.nan,
+                    'std': np.nan,
+                    'percentiles': np.nan * np.ones(len(self.percentiles)),
+                    'realizations': 0
+                    }
+                continue
+            self.stats[name] = {
+                'mean': values.mean(),
+                'std': values.std(),
+                'percentiles': np.percentile(values, self.percentiles),
+                'realizations': values.size
+                }